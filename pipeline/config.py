@@ -19,6 +19,15 @@ class Settings(BaseSettings):
     )
     log_level: str = "INFO"
 
+    # Shared HTTP client pool (spider + crawler)
+    http2_enabled: bool = True
+    http_max_connections_per_host: int = 8
+    http_keepalive_expiry_s: float = 60.0
+    # On-disk caches shared by workers on the same host (robots.txt, ...)
+    http_cache_dir: str = ".cache/pipeline"
+    # Keep per-source known-URL filters under http_cache_dir between runs
+    known_url_filter_persist: bool = True
+
 
 @lru_cache
 def get_settings() -> Settings:
@@ -3,93 +3,139 @@
 from __future__ import annotations
 
 import asyncio
-import random
-from urllib.parse import urljoin, urlparse
-from urllib.robotparser import RobotFileParser
+from dataclasses import dataclass
 
 import httpx
 
-from pipeline.spider.http import USER_AGENT
+from pipeline.http.body import DEFAULT_MAX_BODY_BYTES, BodyLimits
+from pipeline.http.clients import ClientPool, get_client_pool
+from pipeline.http.ratelimit import AdaptiveRateLimiter, RateLimiterRegistry, get_rate_limiters
+from pipeline.http.retry import RetryEngine, RetryPolicy, RetryStats
+from pipeline.http.robots import RobotsCache, get_robots_cache
+from pipeline.utils.url_normalizer import site_host
+
+
+@dataclass(frozen=True)
+class HostSettings:
+    """A source's politeness settings, applied to its host by ``configure_host``."""
+
+    crawl_delay_ms: int
+    max_concurrent: int
 
 
 class HTTPFetcher:
+    """Crawler fetches, paced per host.
+
+    Hosts set up with ``configure_host`` use their source's crawl delay and
+    concurrency. Any other host falls back to ``crawl_delay_ms`` /
+    ``max_concurrent_per_host`` (the ``Source`` column defaults), which never
+    override bounds a source already set for that host.
+    """
+
     def __init__(
         self,
         *,
         max_concurrent_per_host: int = 2,
-        delay_s: float = 0.5,
-        jitter_s: float = 0.2,
+        crawl_delay_ms: int = 2000,
         timeout_read_s: float = 60.0,
         verify_ssl: bool = True,
+        pool: ClientPool | None = None,
+        rate_limiters: RateLimiterRegistry | None = None,
+        retry_policy: RetryPolicy | None = None,
+        max_body_bytes: int = DEFAULT_MAX_BODY_BYTES,
+        robots: RobotsCache | None = None,
     ) -> None:
-        self._delay_s = delay_s
-        self._jitter_s = jitter_s
-        self._max_concurrent_per_host = max_concurrent_per_host
+        self._fallback = HostSettings(crawl_delay_ms, max_concurrent_per_host)
+        self._host_settings: dict[str, HostSettings] = {}
+        self._rate_limiters = rate_limiters or get_rate_limiters()
         self._semaphores: dict[str, asyncio.Semaphore] = {}
-        self._robots: dict[str, RobotFileParser | None] = {}
-        self._client = httpx.AsyncClient(
-            headers={"User-Agent": USER_AGENT},
-            timeout=httpx.Timeout(connect=15.0, read=timeout_read_s, write=10.0, pool=5.0),
-            follow_redirects=True,
-            verify=verify_ssl,
-        )
+        self._robots = robots or get_robots_cache()
+        self._timeout = httpx.Timeout(connect=15.0, read=timeout_read_s, write=10.0, pool=5.0)
+        self._verify_ssl = verify_ssl
+        self._pool = pool
+        self._retry = RetryEngine(retry_policy)
+        self._max_body_bytes = max_body_bytes
+        self._host_max_body_bytes: dict[str, int] = {}
+
+    @property
+    def pool(self) -> ClientPool:
+        if self._pool is None:
+            self._pool = get_client_pool()
+        return self._pool
+
+    @property
+    def retry_stats(self) -> RetryStats:
+        return self._retry.stats
 
     async def close(self) -> None:
-        await self._client.aclose()
+        """Pooled connections outlive this fetcher; see ``close_client_pool``."""
+
+    def configure_host(
+        self,
+        url: str,
+        *,
+        crawl_delay_ms: int | None = None,
+        max_concurrent: int | None = None,
+        max_body_bytes: int | None = None,
+    ) -> None:
+        """Per-source overrides, keyed by host (``www.`` ignored)."""
+        host = site_host(url)
+        if crawl_delay_ms is not None or max_concurrent is not None:
+            current = self._host_settings.get(host, self._fallback)
+            self._host_settings[host] = HostSettings(
+                crawl_delay_ms if crawl_delay_ms is not None else current.crawl_delay_ms,
+                max(1, max_concurrent or current.max_concurrent),
+            )
+        if max_body_bytes:
+            self._host_max_body_bytes[host] = max_body_bytes
+
+    def _limits_for(self, url: str, *, expect_text: bool) -> BodyLimits:
+        max_bytes = self._host_max_body_bytes.get(site_host(url), self._max_body_bytes)
+        return BodyLimits(max_bytes=max_bytes, expect_text=expect_text)
+
+    async def _get(self, url: str, body_limits: BodyLimits | None = None) -> httpx.Response:
+        return await self.pool.get(
+            url, verify_ssl=self._verify_ssl, timeout=self._timeout, body_limits=body_limits
+        )
+
+    def _settings_for(self, url: str) -> tuple[HostSettings, bool]:
+        """The host's settings, and whether they came from its source."""
+        settings = self._host_settings.get(site_host(url))
+        return (settings, True) if settings is not None else (self._fallback, False)
 
     def _semaphore_for(self, url: str) -> asyncio.Semaphore:
-        host = urlparse(url).netloc.lower() or "default"
+        # Same key as configure_host and the runner's host rotation (``www.`` ignored).
+        host = site_host(url) or "default"
         if host not in self._semaphores:
-            self._semaphores[host] = asyncio.Semaphore(self._max_concurrent_per_host)
+            settings, _ = self._settings_for(url)
+            self._semaphores[host] = asyncio.Semaphore(settings.max_concurrent)
         return self._semaphores[host]
 
-    async def _robots_for(self, url: str) -> RobotFileParser | None:
-        parsed = urlparse(url)
-        origin = f"{parsed.scheme}://{parsed.netloc}"
-        if origin in self._robots:
-            return self._robots[origin]
-
-        parser = RobotFileParser()
-        robots_url = urljoin(origin + "/", "robots.txt")
-        try:
-            response = await self._client.get(robots_url)
-            if response.status_code >= 400:
-                self._robots[origin] = None
-            else:
-                parser.parse(response.text.splitlines())
-                self._robots[origin] = parser
-        except Exception:
-            self._robots[origin] = None
-        return self._robots[origin]
+    def _limiter_for(self, url: str) -> AdaptiveRateLimiter:
+        settings, from_source = self._settings_for(url)
+        # Fallbacks never loosen bounds a source (e.g. via the spider) already set.
+        return self._rate_limiters.limiter_for(
+            url,
+            crawl_delay_ms=settings.crawl_delay_ms,
+            max_concurrent=settings.max_concurrent,
+            authoritative=from_source,
+        )
 
     async def can_fetch(self, url: str) -> bool:
-        parser = await self._robots_for(url)
-        if parser is None:
-            return True
-        return parser.can_fetch(USER_AGENT, url)
+        return await self._robots.can_fetch(url, verify_ssl=self._verify_ssl)
 
     async def fetch_text(self, url: str) -> tuple[str, str]:
         if not await self.can_fetch(url):
             raise PermissionError(f"Blocked by robots.txt: {url}")
-        response = await self.fetch(url)
+        response = await self.fetch(url, expect_text=True)
         return response.text, str(response.url)
 
-    async def fetch(self, url: str) -> httpx.Response:
-        async with self._semaphore_for(url):
-            await asyncio.sleep(self._delay_s + random.uniform(-self._jitter_s, self._jitter_s))
-            return await self._fetch_with_retry(url)
-
-    async def _fetch_with_retry(self, url: str, attempt: int = 0) -> httpx.Response:
-        try:
-            response = await self._client.get(url)
-            if response.status_code in (429, 503) and attempt < 4:
-                wait = int(response.headers.get("Retry-After", 2**attempt * 5))
-                await asyncio.sleep(wait)
-                return await self._fetch_with_retry(url, attempt + 1)
-            response.raise_for_status()
-            return response
-        except httpx.TransportError:
-            if attempt < 4:
-                await asyncio.sleep(2**attempt)
-                return await self._fetch_with_retry(url, attempt + 1)
-            raise
+    async def fetch(self, url: str, *, expect_text: bool = False) -> httpx.Response:
+        """Capped streaming fetch; ``expect_text`` refuses binary bodies before download."""
+        limits = self._limits_for(url, expect_text=expect_text)
+        return await self._retry.run(
+            url,
+            lambda: self._get(url, limits),
+            limiter=self._limiter_for(url),
+            semaphore=self._semaphore_for(url),
+        )
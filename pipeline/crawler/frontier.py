@@ -0,0 +1,295 @@
+"""Postgres-backed crawl frontier shared by crawler workers on any number of nodes.
+
+A worker claims a batch of uncrawled URLs by stamping ``claimed_by`` and
+``lease_expires_at`` on rows selected ``FOR UPDATE SKIP LOCKED``, so concurrent
+claims never overlap and never wait on each other. Finished URLs are acked
+(``crawled_at`` set, lease cleared) in one statement per batch; failed ones are
+released, optionally held back for a retry delay. A lease that runs out -- the
+worker crashed or stalled -- makes the row claimable again; a live run renews
+the leases of URLs it has not finished, however long its batch takes.
+
+Every claim counts as an attempt. A URL released after ``max_attempts`` claims,
+or failed with an error retrying cannot fix, is given up on: ``crawled_at`` is
+set with ``crawl_error`` saying why, so it never comes back to the frontier.
+
+Claims walk ``ix_discovered_urls_pending_priority`` (uncrawled rows only, in
+crawl order), so their cost follows the batch size and the number of leases in
+flight, not the size of the table.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import os
+import socket
+import uuid
+from collections.abc import AsyncIterator, Callable, Iterable, Mapping
+from contextlib import AbstractAsyncContextManager
+from datetime import timedelta
+
+from sqlalchemy import bindparam, case, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from pipeline.crawler.runner import (
+    DEFAULT_CONCURRENCY,
+    CrawlRunItem,
+    PendingCrawl,
+    crawl_pending,
+    pending_crawl,
+)
+from pipeline.db.models import DiscoveredUrl, Source
+from pipeline.db.session import get_session
+from pipeline.source_config import get_source_configs
+
+DEFAULT_LEASE_S = 600.0
+# Failed URLs wait this long before another worker may try them.
+DEFAULT_RETRY_AFTER_S = 900.0
+# Claims before a URL that keeps failing (or killing its worker) is given up on.
+DEFAULT_MAX_ATTEMPTS = 5
+EXHAUSTED_ERROR = "retries exhausted"
+# Results acked or released per UPDATE while a run is streaming.
+ACK_BATCH = 25
+
+SessionFactory = Callable[[], AbstractAsyncContextManager[AsyncSession]]
+
+logger = logging.getLogger(__name__)
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class CrawlFrontier:
+    """Lease-based claim / ack / release over ``discovered_urls``.
+
+    Every call runs in its own short transaction from ``session_factory``.
+    """
+
+    def __init__(
+        self,
+        session_factory: SessionFactory = get_session,
+        *,
+        worker_id: str | None = None,
+        lease_s: float = DEFAULT_LEASE_S,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ) -> None:
+        self._session_factory = session_factory
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_s = lease_s
+        self._lease = timedelta(seconds=lease_s)
+        self.max_attempts = max(1, max_attempts)
+
+    async def claim(self, limit: int, *, source_code: str | None = None) -> list[PendingCrawl]:
+        """Lease up to ``limit`` uncrawled URLs, highest priority first."""
+        candidates = (
+            select(DiscoveredUrl.id)
+            .join(Source, DiscoveredUrl.source_id == Source.id)
+            .where(
+                DiscoveredUrl.crawled_at.is_(None),
+                or_(
+                    DiscoveredUrl.lease_expires_at.is_(None),
+                    DiscoveredUrl.lease_expires_at < func.now(),
+                ),
+                DiscoveredUrl.crawl_attempts < self.max_attempts,
+                Source.is_active.is_(True),
+            )
+            .order_by(DiscoveredUrl.priority.desc(), DiscoveredUrl.discovered_at.asc())
+            .limit(limit)
+            .with_for_update(of=DiscoveredUrl, skip_locked=True)
+        )
+        if source_code:
+            candidates = candidates.where(Source.code == source_code.upper())
+        batch = candidates.cte("claim_batch")
+        stmt = (
+            update(DiscoveredUrl)
+            .where(DiscoveredUrl.id == batch.c.id)
+            .values(
+                claimed_by=self.worker_id,
+                lease_expires_at=func.now() + self._lease,
+                crawl_attempts=DiscoveredUrl.crawl_attempts + 1,
+            )
+            .returning(
+                DiscoveredUrl.id,
+                DiscoveredUrl.source_id,
+                DiscoveredUrl.normalized_url,
+                DiscoveredUrl.link_metadata,
+            )
+        )
+        async with self._session_factory() as session:
+            rows = (await session.execute(stmt)).all()
+            configs = get_source_configs()
+            pending: list[PendingCrawl] = []
+            for url_id, source_id, normalized_url, link_metadata in rows:
+                config = await configs.get(session, source_id)
+                if config is not None:
+                    pending.append(pending_crawl(config, url_id, normalized_url, link_metadata))
+        return pending
+
+    async def ack(self, url_ids: Iterable[uuid.UUID]) -> int:
+        """Mark leased URLs crawled. URLs whose lease was lost are left alone."""
+        ids = list(url_ids)
+        if not ids:
+            return 0
+        stmt = (
+            update(DiscoveredUrl)
+            .where(DiscoveredUrl.id.in_(ids), DiscoveredUrl.claimed_by == self.worker_id)
+            .values(crawled_at=func.now(), claimed_by=None, lease_expires_at=None)
+        )
+        async with self._session_factory() as session:
+            result = await session.execute(stmt)
+        return result.rowcount
+
+    async def release(self, url_ids: Iterable[uuid.UUID], *, retry_after_s: float = 0.0) -> int:
+        """Give leased URLs back, claimable again after ``retry_after_s``.
+
+        URLs already claimed ``max_attempts`` times are given up on instead.
+        """
+        ids = list(url_ids)
+        if not ids:
+            return 0
+        exhausted = DiscoveredUrl.crawl_attempts >= self.max_attempts
+        available_at = func.now() + timedelta(seconds=retry_after_s) if retry_after_s else None
+        stmt = (
+            update(DiscoveredUrl)
+            .where(DiscoveredUrl.id.in_(ids), DiscoveredUrl.claimed_by == self.worker_id)
+            .values(
+                claimed_by=None,
+                lease_expires_at=(
+                    case((exhausted, None), else_=available_at) if available_at is not None
+                    else None
+                ),
+                crawled_at=case((exhausted, func.now()), else_=DiscoveredUrl.crawled_at),
+                crawl_error=case((exhausted, EXHAUSTED_ERROR), else_=DiscoveredUrl.crawl_error),
+            )
+        )
+        async with self._session_factory() as session:
+            result = await session.execute(stmt)
+        return result.rowcount
+
+    async def fail(self, errors: Mapping[uuid.UUID, str]) -> int:
+        """Give up on leased URLs for good, recording each one's error."""
+        if not errors:
+            return 0
+        table = DiscoveredUrl.__table__
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("url_id"), table.c.claimed_by == self.worker_id)
+            .values(
+                crawled_at=func.now(),
+                claimed_by=None,
+                lease_expires_at=None,
+                crawl_error=bindparam("error"),
+            )
+        )
+        params = [{"url_id": url_id, "error": error} for url_id, error in errors.items()]
+        async with self._session_factory() as session:
+            await session.execute(stmt, params)
+        return len(params)
+
+    async def renew(self, url_ids: Iterable[uuid.UUID]) -> int:
+        """Push back the lease on URLs this worker still holds and is working on."""
+        ids = list(url_ids)
+        if not ids:
+            return 0
+        stmt = (
+            update(DiscoveredUrl)
+            .where(
+                DiscoveredUrl.id.in_(ids),
+                DiscoveredUrl.claimed_by == self.worker_id,
+                DiscoveredUrl.crawled_at.is_(None),
+            )
+            .values(lease_expires_at=func.now() + self._lease)
+        )
+        async with self._session_factory() as session:
+            result = await session.execute(stmt)
+        return result.rowcount
+
+    async def reclaim_expired(self) -> int:
+        """Clear leases that ran out (crashed workers); returns how many were cleared.
+
+        ``claim`` already takes expired rows, so this is housekeeping that keeps
+        ``claimed_by`` truthful for monitoring. Rows out of attempts -- their
+        worker died on them every time -- are given up on here.
+        """
+        exhausted = DiscoveredUrl.crawl_attempts >= self.max_attempts
+        stmt = (
+            update(DiscoveredUrl)
+            .where(
+                DiscoveredUrl.crawled_at.is_(None),
+                DiscoveredUrl.claimed_by.is_not(None),
+                DiscoveredUrl.lease_expires_at < func.now(),
+            )
+            .values(
+                claimed_by=None,
+                lease_expires_at=None,
+                crawled_at=case((exhausted, func.now()), else_=None),
+                crawl_error=case((exhausted, EXHAUSTED_ERROR), else_=DiscoveredUrl.crawl_error),
+            )
+        )
+        async with self._session_factory() as session:
+            result = await session.execute(stmt)
+        return result.rowcount
+
+
+async def iter_frontier_run(
+    frontier: CrawlFrontier,
+    *,
+    limit: int = 10,
+    source_code: str | None = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    retry_after_s: float = DEFAULT_RETRY_AFTER_S,
+) -> AsyncIterator[CrawlRunItem]:
+    """Claim up to ``limit`` URLs, crawl them, and ack, release or fail them in batches.
+
+    Expired leases are settled first, so URLs whose worker died on their last
+    attempt are given up on rather than left pending. Leases on claimed URLs not
+    yet finished are renewed every third of the lease while the run goes on, so
+    a slow batch is never claimed twice; a failed renewal is logged and retried
+    on the next tick. Results already in when the run stops early are still
+    settled; URLs not yet crawled keep their lease and are picked up by another
+    worker once it expires.
+    """
+    await frontier.reclaim_expired()
+    pending = await frontier.claim(limit, source_code=source_code)
+    outstanding = {item.url_id for item in pending if item.url_id is not None}
+    done: list[uuid.UUID] = []
+    failed: list[uuid.UUID] = []
+    given_up: dict[uuid.UUID, str] = {}
+
+    async def flush() -> None:
+        await frontier.ack(done)
+        await frontier.release(failed, retry_after_s=retry_after_s)
+        await frontier.fail(given_up)
+        outstanding.difference_update(done, failed, given_up)
+        done.clear()
+        failed.clear()
+        given_up.clear()
+
+    async def keep_leases() -> None:
+        while True:
+            await asyncio.sleep(frontier.lease_s / 3)
+            try:
+                await frontier.renew(list(outstanding))
+            except Exception:
+                logger.warning("Renewing %d crawl leases failed", len(outstanding), exc_info=True)
+
+    renewer = asyncio.ensure_future(keep_leases())
+    try:
+        async for result in crawl_pending(pending, concurrency=concurrency):
+            if result.url_id is not None:
+                if result.error is None:
+                    done.append(result.url_id)
+                elif result.permanent:
+                    given_up[result.url_id] = result.error
+                else:
+                    failed.append(result.url_id)
+            if len(done) + len(failed) + len(given_up) >= ACK_BATCH:
+                await flush()
+            yield result
+    finally:
+        renewer.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await renewer
+        await flush()
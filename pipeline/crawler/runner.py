@@ -1,13 +1,21 @@
 from __future__ import annotations
 
+import asyncio
+import uuid
+from collections import deque
+from collections.abc import AsyncIterator
 from dataclasses import dataclass
+from typing import Any
 
+import httpx
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from pipeline.crawler.fetcher.http import HTTPFetcher
-from pipeline.crawler.service import CrawlRequest, crawl_url
+from pipeline.crawler.service import CrawlRequest, FetcherLike, crawl_url
 from pipeline.db.models import DiscoveredUrl, Source
+from pipeline.http.body import UnexpectedContentTypeError
+from pipeline.source_config import SourceConfig, get_source_configs
 
 
 @dataclass
@@ -19,63 +27,256 @@ class CrawlRunItem:
     language: str
     title: str
     error: str | None = None
+    url_id: uuid.UUID | None = None
+    # The error will not go away on retry (gone page, binary body, robots ban)
+    permanent: bool = False
 
 
-async def run_crawler_once(
+# Pages fetched at once across all hosts unless the caller says otherwise.
+DEFAULT_CONCURRENCY = 8
+
+
+@dataclass
+class PendingCrawl:
+    request: CrawlRequest
+    host: str
+    # Pages from this source fetched at once (``Source.max_concurrent_requests``)
+    host_limit: int
+    max_body_bytes: int | None = None
+    url_id: uuid.UUID | None = None
+    # Minimum spacing between this source's fetches (``Source.crawl_delay_ms``)
+    crawl_delay_ms: int | None = None
+
+
+def pending_crawl(
+    config: SourceConfig,
+    url_id: uuid.UUID,
+    normalized_url: str,
+    link_metadata: dict[str, Any] | None,
+) -> PendingCrawl:
+    """Plain-data crawl item for one ``discovered_urls`` row of ``config``'s source."""
+    link_metadata = dict(link_metadata or {})
+    max_body_bytes = config.selectors.get("max_body_bytes")
+    return PendingCrawl(
+        request=CrawlRequest(
+            source_code=config.code,
+            source_url=config.url,
+            url=link_metadata.get("raw_url") or normalized_url,
+            link_metadata=link_metadata,
+        ),
+        host=config.host,
+        host_limit=config.max_concurrent_requests,
+        max_body_bytes=int(max_body_bytes) if max_body_bytes else None,
+        url_id=url_id,
+        crawl_delay_ms=config.crawl_delay_ms,
+    )
+
+
+async def load_pending_crawls(
     session: AsyncSession,
     *,
     limit: int = 10,
     source_code: str | None = None,
-) -> list[CrawlRunItem]:
+) -> list[PendingCrawl]:
+    """Uncrawled URLs in priority order, copied out of the ORM.
+
+    Commits before returning, so the caller can fetch with no connection held.
+    """
     stmt = (
         select(DiscoveredUrl, Source)
         .join(Source, DiscoveredUrl.source_id == Source.id)
         .where(DiscoveredUrl.crawled_at.is_(None), Source.is_active.is_(True))
-        .order_by(DiscoveredUrl.discovered_at.asc())
+        .order_by(DiscoveredUrl.priority.desc(), DiscoveredUrl.discovered_at.asc())
         .limit(limit)
     )
     if source_code:
         stmt = stmt.where(Source.code == source_code.upper())
 
-    rows = list((await session.execute(stmt)).all())
-    if not rows:
-        return []
+    configs = get_source_configs()
+    pending: list[PendingCrawl] = []
+    for discovered, source in (await session.execute(stmt)).all():
+        pending.append(
+            pending_crawl(
+                configs.put(source),
+                discovered.id,
+                discovered.normalized_url,
+                discovered.link_metadata,
+            )
+        )
+    await session.commit()
+    return pending
+
 
-    fetcher = HTTPFetcher()
+class _HostRoundRobin:
+    """Hands out pending crawls one host at a time, within each host's limit.
+
+    A worker asking for work gets the next host in rotation that has pages left
+    and a free slot, so one slow or busy host never holds up the others.
+    """
+
+    def __init__(self, pending: list[PendingCrawl]) -> None:
+        self._queues: dict[str, deque[PendingCrawl]] = {}
+        self._limits: dict[str, int] = {}
+        for item in pending:
+            self._queues.setdefault(item.host, deque()).append(item)
+            self._limits[item.host] = max(1, item.host_limit)
+        self._order = deque(self._queues)
+        self._active = dict.fromkeys(self._queues, 0)
+        self._changed = asyncio.Condition()
+
+    async def take(self) -> PendingCrawl | None:
+        """Next crawl to run, or ``None`` once every host is drained."""
+        async with self._changed:
+            while self._order:
+                for _ in range(len(self._order)):
+                    host = self._order[0]
+                    self._order.rotate(-1)
+                    if self._active[host] < self._limits[host]:
+                        self._active[host] += 1
+                        item = self._queues[host].popleft()
+                        if not self._queues[host]:
+                            self._order.remove(host)
+                        return item
+                await self._changed.wait()
+            return None
+
+    async def release(self, host: str) -> None:
+        async with self._changed:
+            self._active[host] -= 1
+            self._changed.notify_all()
+
+
+# HTTP statuses that mean the page is gone rather than temporarily unavailable.
+PERMANENT_STATUSES = frozenset({404, 410})
+
+
+def _is_permanent(exc: Exception) -> bool:
+    if isinstance(exc, (UnexpectedContentTypeError, PermissionError)):
+        return True
+    return (
+        isinstance(exc, httpx.HTTPStatusError)
+        and exc.response.status_code in PERMANENT_STATUSES
+    )
+
+
+async def _crawl_one(item: PendingCrawl, fetcher: FetcherLike) -> CrawlRunItem:
+    request = item.request
     try:
-        out: list[CrawlRunItem] = []
-        for discovered, source in rows:
-            fetch_url = (discovered.link_metadata or {}).get("raw_url") or discovered.normalized_url
-            req = CrawlRequest(
-                source_code=source.code,
-                source_url=source.url,
-                url=fetch_url,
-                link_metadata=discovered.link_metadata or {},
+        result = await crawl_url(request, fetcher)
+    except Exception as exc:
+        return CrawlRunItem(
+            source_code=request.source_code,
+            url=request.url,
+            extractor="error",
+            used_shadow=False,
+            language="",
+            title="",
+            error=f"{exc.__class__.__name__}: {exc}",
+            url_id=item.url_id,
+            permanent=_is_permanent(exc),
+        )
+    return CrawlRunItem(
+        source_code=request.source_code,
+        url=request.url,
+        extractor=result.extractor,
+        used_shadow=result.used_shadow,
+        language=result.content.language,
+        title=result.content.title,
+        url_id=item.url_id,
+    )
+
+
+async def iter_crawl_results(
+    pending: list[PendingCrawl],
+    fetcher: FetcherLike,
+    *,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> AsyncIterator[CrawlRunItem]:
+    """Crawl ``pending`` with up to ``concurrency`` pages in flight, yielding as each finishes.
+
+    Hosts are served round-robin and each stays within its own ``host_limit``,
+    so throughput grows with the number of distinct hosts in the batch.
+    """
+    if not pending:
+        return
+    dispatcher = _HostRoundRobin(pending)
+    results: asyncio.Queue[CrawlRunItem | None] = asyncio.Queue()
+
+    async def worker() -> None:
+        try:
+            while (item := await dispatcher.take()) is not None:
+                try:
+                    results.put_nowait(await _crawl_one(item, fetcher))
+                finally:
+                    await dispatcher.release(item.host)
+        finally:
+            results.put_nowait(None)
+
+    workers = [asyncio.ensure_future(worker()) for _ in range(max(1, concurrency))]
+    try:
+        remaining = len(workers)
+        while remaining:
+            item = await results.get()
+            if item is None:
+                remaining -= 1
+            else:
+                yield item
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+
+async def iter_crawler_run(
+    session: AsyncSession,
+    *,
+    limit: int = 10,
+    source_code: str | None = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> AsyncIterator[CrawlRunItem]:
+    """Load up to ``limit`` pending URLs, then crawl them concurrently, streaming results."""
+    pending = await load_pending_crawls(session, limit=limit, source_code=source_code)
+    async for result in crawl_pending(pending, concurrency=concurrency):
+        yield result
+
+
+async def crawl_pending(
+    pending: list[PendingCrawl], *, concurrency: int = DEFAULT_CONCURRENCY
+) -> AsyncIterator[CrawlRunItem]:
+    """``iter_crawl_results`` over a fetcher configured for ``pending``'s sources.
+
+    Each source's host is paced by its own crawl delay and concurrency before
+    the first fetch, so a slow source is never crawled at another's rate.
+    """
+    if not pending:
+        return
+    # The dispatcher enforces each source's limit; the fetcher's cap must not be lower.
+    fetcher = HTTPFetcher(max_concurrent_per_host=max(item.host_limit for item in pending))
+    try:
+        for item in pending:
+            fetcher.configure_host(
+                item.request.source_url,
+                crawl_delay_ms=item.crawl_delay_ms,
+                max_concurrent=item.host_limit,
+                max_body_bytes=item.max_body_bytes,
             )
-            try:
-                result = await crawl_url(req, fetcher)
-                out.append(
-                    CrawlRunItem(
-                        source_code=source.code,
-                        url=fetch_url,
-                        extractor=result.extractor,
-                        used_shadow=result.used_shadow,
-                        language=result.content.language,
-                        title=result.content.title,
-                    )
-                )
-            except Exception as exc:
-                out.append(
-                    CrawlRunItem(
-                        source_code=source.code,
-                        url=fetch_url,
-                        extractor="error",
-                        used_shadow=False,
-                        language="",
-                        title="",
-                        error=f"{exc.__class__.__name__}: {exc}",
-                    )
-                )
-        return out
+        async for result in iter_crawl_results(pending, fetcher, concurrency=concurrency):
+            yield result
     finally:
         await fetcher.close()
+
+
+async def run_crawler_once(
+    session: AsyncSession,
+    *,
+    limit: int = 10,
+    source_code: str | None = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> list[CrawlRunItem]:
+    """``iter_crawler_run`` collected into a list, in completion order."""
+    return [
+        item
+        async for item in iter_crawler_run(
+            session, limit=limit, source_code=source_code, concurrency=concurrency
+        )
+    ]
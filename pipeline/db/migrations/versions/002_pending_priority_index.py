@@ -0,0 +1,30 @@
+"""Index pending discovered URLs in crawl order.
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-16
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "002"
+down_revision: Union[str, None] = "001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_discovered_urls_pending_priority",
+        "discovered_urls",
+        [sa.text("priority DESC"), "discovered_at"],
+        postgresql_where=sa.text("crawled_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_discovered_urls_pending_priority", table_name="discovered_urls")
@@ -0,0 +1,37 @@
+"""Crawl frontier leases on discovered URLs.
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-16
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "003"
+down_revision: Union[str, None] = "002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("discovered_urls", sa.Column("claimed_by", sa.Text(), nullable=True))
+    op.add_column(
+        "discovered_urls",
+        sa.Column("lease_expires_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        "ix_discovered_urls_lease_expires_at",
+        "discovered_urls",
+        ["lease_expires_at"],
+        postgresql_where=sa.text("crawled_at IS NULL AND lease_expires_at IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_discovered_urls_lease_expires_at", table_name="discovered_urls")
+    op.drop_column("discovered_urls", "lease_expires_at")
+    op.drop_column("discovered_urls", "claimed_by")
@@ -0,0 +1,30 @@
+"""Crawl attempt counts and terminal failures on discovered URLs.
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-16
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "004"
+down_revision: Union[str, None] = "003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "discovered_urls",
+        sa.Column("crawl_attempts", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column("discovered_urls", sa.Column("crawl_error", sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("discovered_urls", "crawl_error")
+    op.drop_column("discovered_urls", "crawl_attempts")
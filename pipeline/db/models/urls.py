@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING, Any
 
-from sqlalchemy import DateTime, ForeignKey, Integer, Text, func
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, Text, func, text
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -15,6 +15,21 @@ if TYPE_CHECKING:
 
 class DiscoveredUrl(Base, UUIDPrimaryKeyMixin):
     __tablename__ = "discovered_urls"
+    __table_args__ = (
+        # Crawl order for uncrawled rows (migration 002).
+        Index(
+            "ix_discovered_urls_pending_priority",
+            text("priority DESC"),
+            "discovered_at",
+            postgresql_where=text("crawled_at IS NULL"),
+        ),
+        # Outstanding crawl leases, for reclaiming after a worker dies (migration 003).
+        Index(
+            "ix_discovered_urls_lease_expires_at",
+            "lease_expires_at",
+            postgresql_where=text("crawled_at IS NULL AND lease_expires_at IS NOT NULL"),
+        ),
+    )
 
     source_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -41,6 +56,17 @@ class DiscoveredUrl(Base, UUIDPrimaryKeyMixin):
         ForeignKey("crawl_jobs.id", ondelete="SET NULL"),
         nullable=True,
     )
+    # Crawl frontier lease: which worker holds the URL and until when.
+    claimed_by: Mapped[str | None] = mapped_column(Text, nullable=True)
+    lease_expires_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    # Frontier claims so far, and why the URL was given up on (migration 004). A
+    # given-up URL has ``crawled_at`` set too, so it leaves the pending index.
+    crawl_attempts: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default=text("0")
+    )
+    crawl_error: Mapped[str | None] = mapped_column(Text, nullable=True)
 
     source: Mapped["Source"] = relationship(back_populates="discovered_urls")
     crawl_job: Mapped["CrawlJob | None"] = relationship(
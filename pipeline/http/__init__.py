@@ -0,0 +1,10 @@
+"""Shared HTTP infrastructure for spider and crawler."""
+
+from pipeline.http.clients import (
+    USER_AGENT,
+    ClientPool,
+    close_client_pool,
+    get_client_pool,
+)
+
+__all__ = ["USER_AGENT", "ClientPool", "get_client_pool", "close_client_pool"]
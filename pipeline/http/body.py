@@ -0,0 +1,116 @@
+"""Streaming, size-capped body reads with a Content-Type / Content-Length preflight."""
+
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from typing import Protocol
+
+import httpx
+
+DEFAULT_MAX_BODY_BYTES = 20 * 1024 * 1024
+
+TEXT_CONTENT_TYPES = (
+    "text/",
+    "application/xml",
+    "application/json",
+    "application/javascript",
+    "application/rss+xml",
+    "application/atom+xml",
+    "application/xhtml+xml",
+)
+
+# Hop-by-hop / transfer headers that no longer describe the buffered body.
+_DROPPED_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding"})
+
+
+class ResponseRejected(Exception):
+    """Body refused before or while streaming; the connection is released early."""
+
+    def __init__(self, message: str, url: str) -> None:
+        super().__init__(message)
+        self.url = url
+
+
+class BodyTooLargeError(ResponseRejected):
+    pass
+
+
+class UnexpectedContentTypeError(ResponseRejected):
+    pass
+
+
+class BodyConsumer(Protocol):
+    """Takes a body chunk by chunk as it streams in, instead of it being buffered."""
+
+    async def feed(self, chunk: bytes) -> None: ...
+
+
+@dataclass(frozen=True)
+class BodyLimits:
+    max_bytes: int = DEFAULT_MAX_BODY_BYTES
+    expect_text: bool = True
+
+
+def is_text_content_type(content_type: str) -> bool:
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    if not media_type:
+        return True  # Unlabelled bodies get the benefit of the doubt.
+    return media_type.startswith(TEXT_CONTENT_TYPES) or media_type.endswith(("+xml", "+json"))
+
+
+async def read_capped(
+    response: httpx.Response,
+    limits: BodyLimits,
+    consumer: BodyConsumer | None = None,
+) -> httpx.Response:
+    """Drain a streamed response into a buffered one, enforcing ``limits``.
+
+    The returned response carries the body's SHA-256 in
+    ``extensions["body_sha256"]``, computed while the bytes streamed in. With
+    ``consumer``, a successful body is fed to it chunk by chunk and not kept:
+    the returned response then has no content.
+    """
+    url = str(response.url)
+    if response.is_success:
+        content_type = response.headers.get("Content-Type", "")
+        if limits.expect_text and not is_text_content_type(content_type):
+            raise UnexpectedContentTypeError(f"Expected text, got {content_type!r}: {url}", url)
+        declared = response.headers.get("Content-Length", "")
+        if declared.isdigit() and int(declared) > limits.max_bytes:
+            raise BodyTooLargeError(
+                f"Content-Length {declared} exceeds {limits.max_bytes} bytes: {url}", url
+            )
+
+    digest = hashlib.sha256()
+    chunks: list[bytes] = []
+    size = 0
+    if not response.is_success:
+        consumer = None
+    async for chunk in response.aiter_bytes():
+        size += len(chunk)
+        if size > limits.max_bytes:
+            raise BodyTooLargeError(f"Body exceeds {limits.max_bytes} bytes: {url}", url)
+        digest.update(chunk)
+        if consumer is not None:
+            await consumer.feed(chunk)
+        else:
+            chunks.append(chunk)
+
+    buffered = httpx.Response(
+        response.status_code,
+        headers=[
+            (name, value)
+            for name, value in response.headers.multi_items()
+            if name.lower() not in _DROPPED_HEADERS
+        ],
+        content=b"".join(chunks),
+        request=response.request,
+        extensions={
+            "http_version": response.extensions.get("http_version", b"HTTP/1.1"),
+            "reason_phrase": response.extensions.get("reason_phrase", b""),
+            "body_sha256": digest.hexdigest(),
+        },
+    )
+    buffered.history = response.history
+    return buffered
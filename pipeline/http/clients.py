@@ -0,0 +1,189 @@
+"""Worker-wide pool of long-lived httpx clients (HTTP/2, keep-alive reuse).
+
+One ``httpx.AsyncClient`` per (host, TLS settings) so connections to slow
+government hosts survive across spider and crawler runs in the same process.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+from dataclasses import dataclass
+from typing import Any
+from urllib.parse import urlparse
+
+import httpx
+
+from pipeline.config import get_settings
+from pipeline.http.body import BodyConsumer, BodyLimits, read_capped
+
+USER_AGENT = "BerhanAdvisorBot/1.0 (+https://berhanadvisor.com/bot)"
+
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+@dataclass(frozen=True)
+class ClientKey:
+    host: str
+    verify_ssl: bool
+
+
+@dataclass
+class HostConnectionStats:
+    requests: int = 0
+    new_connections: int = 0
+    tls_handshakes: int = 0
+    http2_responses: int = 0
+
+    @property
+    def reused(self) -> int:
+        return max(self.requests - self.new_connections, 0)
+
+    def to_dict(self) -> dict[str, int]:
+        return {
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "tls_handshakes": self.tls_handshakes,
+            "reused": self.reused,
+            "http2_responses": self.http2_responses,
+        }
+
+
+class ClientPool:
+    def __init__(
+        self,
+        *,
+        max_connections_per_host: int = 8,
+        keepalive_expiry_s: float = 60.0,
+        http2: bool = True,
+    ) -> None:
+        self._limits = httpx.Limits(
+            max_connections=max_connections_per_host,
+            max_keepalive_connections=max_connections_per_host,
+            keepalive_expiry=keepalive_expiry_s,
+        )
+        self._http2 = http2 and _HTTP2_AVAILABLE
+        self._clients: dict[ClientKey, httpx.AsyncClient] = {}
+        self._stats: dict[str, HostConnectionStats] = {}
+
+    def client_for(self, url: str, *, verify_ssl: bool = True) -> httpx.AsyncClient:
+        key = ClientKey(host=_host_of(url), verify_ssl=verify_ssl)
+        client = self._clients.get(key)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                headers={"User-Agent": USER_AGENT},
+                timeout=httpx.Timeout(connect=15.0, read=60.0, write=10.0, pool=5.0),
+                limits=self._limits,
+                http2=self._http2,
+                follow_redirects=True,
+                verify=verify_ssl,
+            )
+            self._clients[key] = client
+        return client
+
+    def build_request(
+        self,
+        url: str,
+        *,
+        verify_ssl: bool = True,
+        **kwargs: Any,
+    ) -> tuple[httpx.AsyncClient, httpx.Request]:
+        """Build a GET on the pooled client with connection tracing attached."""
+        client = self.client_for(url, verify_ssl=verify_ssl)
+        stats = self._stats.setdefault(_host_of(url), HostConnectionStats())
+        extensions = dict(kwargs.pop("extensions", None) or {})
+        extensions["trace"] = _tracer(stats)
+        request = client.build_request("GET", url, extensions=extensions, **kwargs)
+        stats.requests += 1
+        return client, request
+
+    async def get(
+        self,
+        url: str,
+        *,
+        verify_ssl: bool = True,
+        body_limits: BodyLimits | None = None,
+        consumer: BodyConsumer | None = None,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """GET through the pooled client; ``body_limits`` switches to a capped streaming read.
+
+        ``consumer`` (with ``body_limits``) takes the body as it streams; see ``read_capped``.
+        """
+        client, request = self.build_request(url, verify_ssl=verify_ssl, **kwargs)
+        if body_limits is None:
+            response = await client.send(request)
+            self.record_response(response)
+            return response
+
+        response = await client.send(request, stream=True)
+        try:
+            self.record_response(response)
+            return await read_capped(response, body_limits, consumer)
+        finally:
+            await response.aclose()
+
+    def record_response(self, response: httpx.Response) -> None:
+        if response.http_version == "HTTP/2":
+            stats = self._stats.setdefault(_host_of(str(response.url)), HostConnectionStats())
+            stats.http2_responses += 1
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        return {host: s.to_dict() for host, s in sorted(self._stats.items())}
+
+    async def aclose(self) -> None:
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            await client.aclose()
+
+
+def _host_of(url: str) -> str:
+    return urlparse(url).netloc.lower() or "default"
+
+
+def _tracer(stats: HostConnectionStats):
+    async def trace(event: str, _info: dict[str, Any]) -> None:
+        if event == "connection.connect_tcp.complete":
+            stats.new_connections += 1
+        elif event == "connection.start_tls.complete":
+            stats.tls_handshakes += 1
+
+    return trace
+
+
+# One pool per event loop: clients and their connections are bound to the loop
+# that opened them.
+_pools: dict[asyncio.AbstractEventLoop, ClientPool] = {}
+
+
+def get_client_pool() -> ClientPool:
+    """Process-wide pool for the running event loop."""
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(loop)
+    if pool is None:
+        # A closed loop cannot run ``aclose``; dropping its pool lets the
+        # sockets be collected instead of pinning them for the process lifetime.
+        for owner in [owner for owner in _pools if owner.is_closed()]:
+            del _pools[owner]
+        settings = get_settings()
+        pool = _pools[loop] = ClientPool(
+            max_connections_per_host=settings.http_max_connections_per_host,
+            keepalive_expiry_s=settings.http_keepalive_expiry_s,
+            http2=settings.http2_enabled,
+        )
+    return pool
+
+
+async def close_client_pool() -> None:
+    """Close the running loop's pool, and pools of loops running in other threads."""
+    loop = asyncio.get_running_loop()
+    for owner, pool in list(_pools.items()):
+        if owner is loop:
+            del _pools[owner]
+            await pool.aclose()
+        elif owner.is_running():
+            del _pools[owner]
+            await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(pool.aclose(), owner))
+        elif owner.is_closed():
+            del _pools[owner]
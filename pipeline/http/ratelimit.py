@@ -0,0 +1,170 @@
+"""Adaptive per-host rate limiting: token bucket paced by AIMD feedback.
+
+The refill rate rises additively while a host answers quickly and drops
+multiplicatively on 429/503, errors or latency spikes. ``Retry-After`` pauses
+the bucket outright. Bounds come from ``Source.crawl_delay_ms`` and
+``Source.max_concurrent_requests``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import httpx
+
+from pipeline.utils.url_normalizer import site_host
+
+THROTTLE_STATUSES = frozenset({429, 503})
+
+
+def retry_after_seconds(response: httpx.Response) -> float | None:
+    """Parse ``Retry-After`` as delta-seconds or an HTTP-date."""
+    value = (response.headers.get("Retry-After") or "").strip()
+    if not value:
+        return None
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def source_rate_bounds(crawl_delay_ms: int, max_concurrent: int) -> tuple[float, float]:
+    """(floor, ceiling) in requests/second for a source's politeness settings."""
+    base_rate = 1000.0 / max(crawl_delay_ms, 1)
+    return base_rate / 8, base_rate * max(max_concurrent, 1)
+
+
+class AdaptiveRateLimiter:
+    def __init__(
+        self,
+        *,
+        min_rate: float,
+        max_rate: float,
+        initial_rate: float | None = None,
+        burst: float = 1.0,
+        increase_step: float | None = None,
+        decrease_factor: float = 0.5,
+        slow_factor: float = 0.85,
+    ) -> None:
+        self.min_rate = min_rate
+        self.max_rate = max(max_rate, min_rate)
+        self.rate = min(max(initial_rate or min_rate, self.min_rate), self.max_rate)
+        self.burst = burst
+        self.increase_step = increase_step or self.rate * 0.1
+        self.decrease_factor = decrease_factor
+        self.slow_factor = slow_factor
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._latency_ewma: float | None = None
+
+    @classmethod
+    def for_source(cls, crawl_delay_ms: int, max_concurrent: int) -> AdaptiveRateLimiter:
+        """Start at one request per crawl delay; never exceed one per delay per slot."""
+        min_rate, max_rate = source_rate_bounds(crawl_delay_ms, max_concurrent)
+        return cls(min_rate=min_rate, max_rate=max_rate, initial_rate=min_rate * 8)
+
+    def set_bounds(self, min_rate: float, max_rate: float) -> None:
+        self.min_rate = min_rate
+        self.max_rate = max(max_rate, min_rate)
+        self.rate = min(max(self.rate, self.min_rate), self.max_rate)
+
+    def _refill(self, now: float) -> None:
+        # ``_updated`` may sit in the future after a Retry-After pause; the
+        # negative elapsed time then shows up as token debt.
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        """Take one token and return how long the caller must wait for it."""
+        self._refill(time.monotonic())
+        self._tokens -= 1.0
+        if self._tokens >= 0:
+            return 0.0
+        return -self._tokens / self.rate
+
+    async def acquire(self) -> float:
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def pause(self, seconds: float) -> None:
+        now = time.monotonic()
+        self._refill(now)
+        self._tokens = min(self._tokens, 0.0)
+        self._updated = max(self._updated, now + seconds)
+
+    def observe(
+        self,
+        *,
+        status_code: int | None,
+        latency_s: float,
+        retry_after_s: float | None = None,
+    ) -> None:
+        """Feed back one response (``status_code=None`` for transport errors)."""
+        if status_code in THROTTLE_STATUSES:
+            self._decrease(self.decrease_factor)
+            if retry_after_s:
+                self.pause(retry_after_s)
+            return
+        if status_code is None or status_code >= 500:
+            self._decrease(self.slow_factor)
+            return
+
+        ewma = self._latency_ewma
+        self._latency_ewma = latency_s if ewma is None else 0.8 * ewma + 0.2 * latency_s
+        if ewma is not None and latency_s > max(2 * ewma, 1.0):
+            self._decrease(self.slow_factor)
+        else:
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def _decrease(self, factor: float) -> None:
+        self._refill(time.monotonic())
+        self.rate = max(self.min_rate, self.rate * factor)
+
+
+class RateLimiterRegistry:
+    """One limiter per host, shared by every HTTP layer in the worker."""
+
+    def __init__(self) -> None:
+        self._limiters: dict[str, AdaptiveRateLimiter] = {}
+
+    def limiter_for(
+        self,
+        url: str,
+        *,
+        crawl_delay_ms: int,
+        max_concurrent: int,
+        authoritative: bool = True,
+    ) -> AdaptiveRateLimiter:
+        """Get the host's limiter, creating it from the given source settings.
+
+        ``authoritative`` settings (from a ``Source`` row) also reset the bounds
+        of an existing limiter; fallback defaults only apply to new hosts.
+        """
+        host = site_host(url) or "default"
+        limiter = self._limiters.get(host)
+        if limiter is None:
+            limiter = AdaptiveRateLimiter.for_source(crawl_delay_ms, max_concurrent)
+            self._limiters[host] = limiter
+        elif authoritative:
+            limiter.set_bounds(*source_rate_bounds(crawl_delay_ms, max_concurrent))
+        return limiter
+
+    def rates(self) -> dict[str, float]:
+        return {host: limiter.rate for host, limiter in sorted(self._limiters.items())}
+
+
+_registry = RateLimiterRegistry()
+
+
+def get_rate_limiters() -> RateLimiterRegistry:
+    return _registry
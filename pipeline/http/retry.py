@@ -0,0 +1,252 @@
+"""Shared retry engine: full-jitter backoff, per-host retry budget, circuit breaker.
+
+Retries run in a loop (no recursion). Every attempt takes a rate-limit token
+and a host concurrency slot; backoff sleeps hold neither.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import random
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from urllib.parse import urlparse
+
+import httpx
+
+from pipeline.http.ratelimit import AdaptiveRateLimiter, retry_after_seconds
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without touching the network while a host's circuit is open."""
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_retries: int = 4
+    base_delay_s: float = 1.0
+    max_delay_s: float = 30.0
+    retry_statuses: frozenset[int] = frozenset({429, 503})
+
+    def backoff(self, retry_number: int) -> float:
+        """Full jitter: uniform in [0, min(cap, base * 2**n)]."""
+        return random.uniform(0.0, min(self.max_delay_s, self.base_delay_s * 2**retry_number))
+
+
+class RetryBudget:
+    """Caps retries at ``ratio`` of recent requests (plus a small floor) per host."""
+
+    def __init__(self, *, ratio: float = 0.2, min_retries: int = 3, window_s: float = 60.0) -> None:
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window_s = window_s
+        self._window_start = time.monotonic()
+        self._requests = 0
+        self._retries = 0
+
+    def _roll(self) -> None:
+        now = time.monotonic()
+        if now - self._window_start >= self.window_s:
+            self._window_start = now
+            self._requests = 0
+            self._retries = 0
+
+    def record_request(self) -> None:
+        self._roll()
+        self._requests += 1
+
+    def try_spend(self) -> bool:
+        self._roll()
+        if self._retries >= self.min_retries + self.ratio * self._requests:
+            return False
+        self._retries += 1
+        return True
+
+
+class CircuitBreaker:
+    """closed -> open after consecutive failures -> half-open single probe."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, *, failure_threshold: int = 5, recovery_timeout_s: float = 30.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout_s = recovery_timeout_s
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def before_request(self, host: str) -> None:
+        if self.state == self.OPEN:
+            if time.monotonic() - self._opened_at < self.recovery_timeout_s:
+                raise CircuitOpenError(f"Circuit open for {host}")
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN:
+            if self._probe_in_flight:
+                raise CircuitOpenError(f"Circuit half-open for {host}; probe in flight")
+            self._probe_in_flight = True
+
+    def abandon(self) -> None:
+        """Attempt ended without a verdict (e.g. cancelled); free the probe slot."""
+        self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self._failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self._probe_in_flight = False
+        self._failures += 1
+        if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+
+
+@dataclass
+class RetryStats:
+    requests: int = 0
+    retries: int = 0
+    wait_s: float = 0.0
+    budget_exhausted: int = 0
+    circuit_rejections: int = 0
+
+    def to_dict(self) -> dict[str, float]:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "wait_s": round(self.wait_s, 3),
+            "budget_exhausted": self.budget_exhausted,
+            "circuit_rejections": self.circuit_rejections,
+        }
+
+
+@dataclass
+class HostGuards:
+    """Worker-wide retry budgets and circuit breakers, one pair per host."""
+
+    budgets: dict[str, RetryBudget] = field(default_factory=dict)
+    breakers: dict[str, CircuitBreaker] = field(default_factory=dict)
+
+    def budget_for(self, host: str) -> RetryBudget:
+        return self.budgets.setdefault(host, RetryBudget())
+
+    def breaker_for(self, host: str) -> CircuitBreaker:
+        return self.breakers.setdefault(host, CircuitBreaker())
+
+    def circuit_states(self) -> dict[str, str]:
+        return {host: b.state for host, b in sorted(self.breakers.items())}
+
+
+_guards = HostGuards()
+
+
+def get_host_guards() -> HostGuards:
+    return _guards
+
+
+class RetryEngine:
+    def __init__(
+        self,
+        policy: RetryPolicy | None = None,
+        *,
+        guards: HostGuards | None = None,
+        stats: RetryStats | None = None,
+    ) -> None:
+        self.policy = policy or RetryPolicy()
+        self.guards = guards or get_host_guards()
+        self.stats = stats or RetryStats()
+
+    async def run(
+        self,
+        url: str,
+        send: Callable[[], Awaitable[httpx.Response]],
+        *,
+        limiter: AdaptiveRateLimiter | None = None,
+        semaphore: asyncio.Semaphore | None = None,
+    ) -> httpx.Response:
+        """Send with retries; each attempt takes a token and a slot, backoff holds neither."""
+        host = urlparse(url).netloc.lower() or "default"
+        breaker = self.guards.breaker_for(host)
+        budget = self.guards.budget_for(host)
+        budget.record_request()
+        self.stats.requests += 1
+        retry_number = 0
+
+        while True:
+            if limiter is not None:
+                await limiter.acquire()
+            async with semaphore or contextlib.nullcontext():
+                try:
+                    breaker.before_request(host)
+                except CircuitOpenError:
+                    self.stats.circuit_rejections += 1
+                    raise
+
+                started = time.monotonic()
+                try:
+                    response = await send()
+                except httpx.TransportError:
+                    breaker.record_failure()
+                    if limiter is not None:
+                        limiter.observe(status_code=None, latency_s=time.monotonic() - started)
+                    delay = self._retry_delay(retry_number, budget, retry_after=None)
+                    if delay is None:
+                        raise
+                except BaseException:
+                    breaker.abandon()
+                    raise
+                else:
+                    retry_after = retry_after_seconds(response)
+                    if limiter is not None:
+                        limiter.observe(
+                            status_code=response.status_code,
+                            latency_s=time.monotonic() - started,
+                            retry_after_s=retry_after,
+                        )
+                    if response.status_code >= 500:
+                        breaker.record_failure()
+                    else:
+                        breaker.record_success()
+                    if response.status_code not in self.policy.retry_statuses:
+                        return _raise_for_status(response)
+                    delay = self._retry_delay(retry_number, budget, retry_after=retry_after)
+                    if delay is None:
+                        return _raise_for_status(response)
+                    await response.aclose()
+
+            self.stats.retries += 1
+            self.stats.wait_s += delay
+            await asyncio.sleep(delay)
+            retry_number += 1
+
+    def _retry_delay(
+        self,
+        retry_number: int,
+        budget: RetryBudget,
+        *,
+        retry_after: float | None,
+    ) -> float | None:
+        """Seconds to wait before the next attempt, or ``None`` to give up."""
+        if retry_number >= self.policy.max_retries:
+            return None
+        # A server asking us to wait longer than the cap is not worth a worker slot.
+        if retry_after is not None and retry_after > self.policy.max_delay_s:
+            return None
+        if not budget.try_spend():
+            self.stats.budget_exhausted += 1
+            return None
+        if retry_after is not None:
+            return retry_after
+        return self.policy.backoff(retry_number)
+
+
+def _raise_for_status(response: httpx.Response) -> httpx.Response:
+    # 304 answers a conditional GET; httpx would treat it as a failed redirect.
+    if response.status_code != 304:
+        response.raise_for_status()
+    return response
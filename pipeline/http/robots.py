@@ -0,0 +1,246 @@
+"""Process-wide robots.txt cache shared by spider and crawler.
+
+In-memory front, JSON files on disk behind it (shared across runs and worker
+processes on the host). Entries are served fresh for ``ttl_s``; after that they
+are still served for another ``ttl_s`` while a background task refreshes them.
+Failed lookups (4xx, 5xx, network errors) are cached as allow-all negative
+entries; server-side failures expire sooner so they are retried.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from urllib.parse import quote, unquote, urlparse, urlunparse
+from urllib.robotparser import RobotFileParser
+
+from pipeline.config import get_settings
+from pipeline.http.body import BodyLimits
+from pipeline.http.clients import USER_AGENT, get_client_pool
+
+ROBOTS_TTL_S = 24 * 3600.0
+SERVER_ERROR_TTL_S = 3600.0
+ROBOTS_MAX_BYTES = 512 * 1024
+
+RobotsFetch = Callable[[str, bool], Awaitable[tuple[int | None, str]]]
+
+
+class CompiledRobots:
+    """``RobotFileParser`` rules for one user agent, compiled to a single regex.
+
+    Decisions match ``RobotFileParser.can_fetch``: the agent's entry is chosen
+    once, and its rules stay in file order as prefix alternatives, so the first
+    alternative that matches is the first rule that applies.
+    """
+
+    __slots__ = ("_fixed", "_pattern", "_allowances")
+
+    def __init__(self, parser: RobotFileParser | None, useragent: str = USER_AGENT) -> None:
+        self._fixed: bool | None = None
+        self._pattern: re.Pattern[str] | None = None
+        self._allowances: list[bool] = []
+        if parser is None or parser.allow_all:
+            self._fixed = True
+            return
+        if parser.disallow_all or not parser.last_checked:
+            self._fixed = False
+            return
+
+        entry = next((e for e in parser.entries if e.applies_to(useragent)), None)
+        if entry is None:
+            entry = parser.default_entry
+        if entry is None or not entry.rulelines:
+            self._fixed = True
+            return
+
+        alternatives = []
+        for line in entry.rulelines:
+            alternatives.append("()" if line.path == "*" else f"({re.escape(line.path)})")
+            self._allowances.append(line.allowance)
+        self._pattern = re.compile("|".join(alternatives))
+
+    @staticmethod
+    def _request_path(url: str) -> str:
+        # Same normalization as RobotFileParser.can_fetch.
+        parsed = urlparse(unquote(url))
+        path = quote(urlunparse(("", "", parsed.path, parsed.params, parsed.query, parsed.fragment)))
+        return path or "/"
+
+    def can_fetch(self, url: str) -> bool:
+        if self._fixed is not None:
+            return self._fixed
+        match = self._pattern.match(self._request_path(url))
+        if match is None:
+            return True
+        return self._allowances[match.lastindex - 1]
+
+    def filter_allowed(self, urls: Iterable[str]) -> list[str]:
+        if self._fixed is not None:
+            return list(urls) if self._fixed else []
+        return [url for url in urls if self.can_fetch(url)]
+
+
+@dataclass
+class RobotsEntry:
+    origin: str
+    status: int | None
+    body: str
+    fetched_at: float
+
+    @property
+    def is_negative(self) -> bool:
+        return self.status is None or not 200 <= self.status < 300
+
+    def ttl_s(self, ttl_s: float) -> float:
+        if self.status is None or self.status >= 500:
+            return min(ttl_s, SERVER_ERROR_TTL_S)
+        return ttl_s
+
+    def compile(self) -> CompiledRobots:
+        """Compiled rules; negative entries compile to allow-all."""
+        if self.is_negative:
+            return CompiledRobots(None)
+        parser = RobotFileParser()
+        parser.parse(self.body.splitlines())
+        return CompiledRobots(parser)
+
+
+def origin_of(url: str) -> str:
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc.lower()}"
+
+
+async def _fetch_robots(robots_url: str, verify_ssl: bool) -> tuple[int | None, str]:
+    try:
+        response = await get_client_pool().get(
+            robots_url,
+            verify_ssl=verify_ssl,
+            body_limits=BodyLimits(max_bytes=ROBOTS_MAX_BYTES),
+        )
+    except Exception:
+        return None, ""
+    return response.status_code, response.text if response.is_success else ""
+
+
+class RobotsCache:
+    def __init__(
+        self,
+        *,
+        cache_dir: Path | None = None,
+        ttl_s: float = ROBOTS_TTL_S,
+        fetch: RobotsFetch = _fetch_robots,
+    ) -> None:
+        self._cache_dir = cache_dir
+        self._ttl_s = ttl_s
+        self._fetch = fetch
+        self._entries: dict[str, tuple[RobotsEntry, CompiledRobots]] = {}
+        self._inflight: dict[str, asyncio.Task[RobotsEntry]] = {}
+        self._background: set[asyncio.Task[RobotsEntry]] = set()
+
+    async def matcher_for(self, url: str, *, verify_ssl: bool = True) -> CompiledRobots:
+        origin = origin_of(url)
+        cached = self._entries.get(origin)
+        if cached is None:
+            entry = self._load(origin)
+            if entry is not None:
+                cached = self._remember(entry)
+
+        now = time.time()
+        if cached is not None:
+            entry, matcher = cached
+            age = now - entry.fetched_at
+            ttl = entry.ttl_s(self._ttl_s)
+            if age < ttl:
+                return matcher
+            if age < 2 * ttl:
+                self._refresh_in_background(origin, verify_ssl)
+                return matcher
+
+        entry = await self._refresh(origin, verify_ssl)
+        return self._entries[entry.origin][1]
+
+    async def can_fetch(self, url: str, *, verify_ssl: bool = True) -> bool:
+        matcher = await self.matcher_for(url, verify_ssl=verify_ssl)
+        return matcher.can_fetch(url)
+
+    async def filter_allowed(self, urls: Iterable[str], *, verify_ssl: bool = True) -> list[str]:
+        """Batch check, one matcher lookup per origin; input order is preserved."""
+        urls = list(urls)
+        matchers: dict[str, CompiledRobots] = {}
+        for url in urls:
+            origin = origin_of(url)
+            if origin not in matchers:
+                matchers[origin] = await self.matcher_for(url, verify_ssl=verify_ssl)
+        if len(matchers) == 1:
+            return next(iter(matchers.values())).filter_allowed(urls)
+        return [url for url in urls if matchers[origin_of(url)].can_fetch(url)]
+
+    def _refresh(self, origin: str, verify_ssl: bool) -> asyncio.Task[RobotsEntry]:
+        """One fetch per origin at a time; concurrent callers share the task."""
+        task = self._inflight.get(origin)
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(self._fetch_entry(origin, verify_ssl))
+            self._inflight[origin] = task
+        return task
+
+    def _refresh_in_background(self, origin: str, verify_ssl: bool) -> None:
+        task = self._refresh(origin, verify_ssl)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _fetch_entry(self, origin: str, verify_ssl: bool) -> RobotsEntry:
+        status, body = await self._fetch(f"{origin}/robots.txt", verify_ssl)
+        entry = RobotsEntry(origin=origin, status=status, body=body, fetched_at=time.time())
+        self._remember(entry)
+        self._store(entry)
+        return entry
+
+    def _remember(self, entry: RobotsEntry) -> tuple[RobotsEntry, CompiledRobots]:
+        cached = (entry, entry.compile())
+        self._entries[entry.origin] = cached
+        return cached
+
+    def _path_for(self, origin: str) -> Path | None:
+        if self._cache_dir is None:
+            return None
+        digest = hashlib.sha1(origin.encode("utf-8")).hexdigest()
+        return self._cache_dir / f"{digest}.json"
+
+    def _load(self, origin: str) -> RobotsEntry | None:
+        path = self._path_for(origin)
+        if path is None or not path.exists():
+            return None
+        try:
+            entry = RobotsEntry(**json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError, TypeError):
+            return None
+        return entry if entry.origin == origin else None
+
+    def _store(self, entry: RobotsEntry) -> None:
+        path = self._path_for(entry.origin)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(asdict(entry)), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError:
+            pass  # Disk cache is best-effort; memory still holds the entry.
+
+
+_cache: RobotsCache | None = None
+
+
+def get_robots_cache() -> RobotsCache:
+    global _cache
+    if _cache is None:
+        _cache = RobotsCache(cache_dir=Path(get_settings().http_cache_dir) / "robots")
+    return _cache
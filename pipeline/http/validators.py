@@ -0,0 +1,117 @@
+"""Conditional-GET validator cache (ETag / Last-Modified / body digest per URL)."""
+
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Collection
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import httpx
+
+# Entries not seen for this long are dropped when the store is serialized.
+ENTRY_TTL = timedelta(days=30)
+
+
+def body_digest(response: httpx.Response) -> str:
+    """SHA-256 of the body, reusing the digest computed while streaming if present."""
+    return response.extensions.get("body_sha256") or hashlib.sha256(response.content).hexdigest()
+
+
+class ValidatorStore:
+    """Per-URL validators, serializable to JSON (``SourceCrawlState.crawl_config``).
+
+    ``scope`` fingerprints whatever decides how bodies are interpreted (e.g. the
+    source selectors); a stored scope that no longer matches discards all entries.
+
+    Validators of a changed body are only staged by ``record``. The caller
+    ``confirm``s them once the body's links are extracted, and ``commit`` applies
+    confirmed entries, minus those of owners whose run failed. Until then the
+    URL keeps its previous validators, so a failed extraction is retried in full.
+    """
+
+    def __init__(self, entries: dict[str, dict[str, Any]] | None = None, scope: str = "") -> None:
+        self._entries: dict[str, dict[str, Any]] = dict(entries or {})
+        self._scope = scope
+        self._staged: dict[str, dict[str, Any]] = {}
+        self._confirmed: dict[str, tuple[str | None, dict[str, Any]]] = {}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any] | None, scope: str = "") -> ValidatorStore:
+        data = data or {}
+        if data.get("scope", "") != scope:
+            return cls(scope=scope)
+        return cls(data.get("entries"), scope=scope)
+
+    def to_dict(self) -> dict[str, Any]:
+        cutoff = (datetime.now(timezone.utc) - ENTRY_TTL).isoformat()
+        entries = {
+            url: entry
+            for url, entry in self._entries.items()
+            if entry.get("seen_at", "") >= cutoff
+        }
+        return {"scope": self._scope, "entries": entries}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def request_headers(self, url: str) -> dict[str, str]:
+        entry = self._entries.get(url) or {}
+        headers: dict[str, str] = {}
+        if etag := entry.get("etag"):
+            headers["If-None-Match"] = etag
+        if last_modified := entry.get("last_modified"):
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def is_unchanged(self, url: str, response: httpx.Response) -> bool:
+        entry = self._entries.get(url)
+        if entry is None:
+            return False
+        if response.status_code == 304:
+            return True
+        return entry.get("digest") == body_digest(response)
+
+    def record(self, url: str, response: httpx.Response) -> None:
+        now = datetime.now(timezone.utc).isoformat()
+        if self.is_unchanged(url, response):
+            self._entries[url]["seen_at"] = now
+            return
+        self._staged[url] = {
+            "seen_at": now,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "digest": body_digest(response),
+        }
+
+    def confirm(self, url: str, owner: str | None = None) -> None:
+        """The body recorded for ``url`` was fully extracted (on behalf of ``owner``)."""
+        if (entry := self._staged.pop(url, None)) is not None:
+            self._confirmed[url] = (owner, entry)
+
+    def commit(self, failed_owners: Collection[str] = ()) -> None:
+        """Apply confirmed validators except those of ``failed_owners``; drop the rest."""
+        for url, (owner, entry) in self._confirmed.items():
+            if owner not in failed_owners:
+                self._entries[url] = entry
+        self._staged.clear()
+        self._confirmed.clear()
+
+    def _pending(self, url: str) -> dict[str, Any] | None:
+        if (entry := self._staged.get(url)) is not None:
+            return entry
+        confirmed = self._confirmed.get(url)
+        return confirmed[1] if confirmed is not None else None
+
+    def annotate(self, url: str, **values: Any) -> None:
+        """Attach adapter data to an entry (e.g. a sitemap index's children).
+
+        Notes describe the body just recorded, so they travel with its validators.
+        """
+        entry = self._pending(url)
+        if entry is None:
+            entry = self._entries.setdefault(url, {})
+        entry.setdefault("notes", {}).update(values)
+
+    def annotation(self, url: str, key: str, default: Any = None) -> Any:
+        return ((self._entries.get(url) or {}).get("notes") or {}).get(key, default)
@@ -0,0 +1,160 @@
+"""Immutable per-worker snapshots of ``Source`` rows for spider and crawler runs.
+
+Network phases work from a ``SourceConfig`` rather than a live ORM object, so
+they never lazy-load, never need the session that loaded the row, and can run
+with no database connection checked out.
+"""
+
+from __future__ import annotations
+
+import time
+import uuid
+from collections.abc import Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any
+from urllib.parse import urlparse
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from pipeline.db.models.sources import Source
+from pipeline.utils.url_normalizer import site_host
+
+# Other workers' edits to a source show up after at most this long.
+DEFAULT_TTL_S = 300.0
+
+
+def _enum_value(value: Any) -> str:
+    return str(getattr(value, "value", value))
+
+
+def _frozen(value: Any) -> Any:
+    """Read-only copy of a JSON value: objects become mapping proxies, arrays tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _frozen(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_frozen(item) for item in value)
+    return value
+
+
+@dataclass(frozen=True, slots=True)
+class SourceConfig:
+    id: uuid.UUID
+    code: str
+    url: str
+    source_type: str
+    category: str
+    default_language: str
+    selectors: Mapping[str, Any]
+    crawl_delay_ms: int
+    max_concurrent_requests: int
+    request_timeout_ms: int
+    is_active: bool
+
+    @classmethod
+    def from_source(cls, source: Source) -> SourceConfig:
+        """Validated snapshot of ``source``; raises ``ValueError`` on bad config."""
+        parsed = urlparse(source.url or "")
+        if parsed.scheme not in ("http", "https") or not parsed.netloc:
+            raise ValueError(f"Source {source.code}: invalid url {source.url!r}")
+        selectors = source.selectors or {}
+        if not isinstance(selectors, dict):
+            raise ValueError(f"Source {source.code}: selectors must be an object")
+        for name, minimum in (
+            ("crawl_delay_ms", 0),
+            ("max_concurrent_requests", 1),
+            ("request_timeout_ms", 1),
+        ):
+            value = getattr(source, name)
+            if not isinstance(value, int) or value < minimum:
+                raise ValueError(f"Source {source.code}: invalid {name} {value!r}")
+        return cls(
+            id=source.id,
+            code=source.code,
+            url=source.url,
+            source_type=_enum_value(source.source_type),
+            category=_enum_value(source.category),
+            default_language=_enum_value(source.default_language),
+            # Frozen copy: nested selector values must not alias the ORM's JSONB dict.
+            selectors=_frozen(selectors),
+            crawl_delay_ms=source.crawl_delay_ms,
+            max_concurrent_requests=source.max_concurrent_requests,
+            request_timeout_ms=source.request_timeout_ms,
+            is_active=bool(source.is_active),
+        )
+
+    @property
+    def host(self) -> str:
+        return site_host(self.url)
+
+
+class SourceConfigCache:
+    """``SourceConfig`` by source id, refreshed after ``ttl_s`` or any local ``Source`` write."""
+
+    def __init__(self, ttl_s: float = DEFAULT_TTL_S) -> None:
+        self._ttl_s = ttl_s
+        self._entries: dict[uuid.UUID, tuple[float, SourceConfig]] = {}
+
+    def _fresh(self, source_id: uuid.UUID) -> SourceConfig | None:
+        entry = self._entries.get(source_id)
+        if entry is None or time.monotonic() - entry[0] > self._ttl_s:
+            return None
+        return entry[1]
+
+    def put(self, source: Source) -> SourceConfig:
+        config = SourceConfig.from_source(source)
+        self._entries[config.id] = (time.monotonic(), config)
+        return config
+
+    async def get(self, session: AsyncSession, source_id: uuid.UUID) -> SourceConfig | None:
+        if (config := self._fresh(source_id)) is not None:
+            return config
+        source = await session.get(Source, source_id, populate_existing=True)
+        return self.put(source) if source is not None else None
+
+    async def by_code(self, session: AsyncSession, code: str) -> SourceConfig | None:
+        for _, config in self._entries.values():
+            if config.code == code and (fresh := self._fresh(config.id)) is not None:
+                return fresh
+        result = await session.execute(
+            select(Source)
+            .where(Source.code == code)
+            .execution_options(populate_existing=True)
+        )
+        source = result.scalar_one_or_none()
+        return self.put(source) if source is not None else None
+
+    async def active(self, session: AsyncSession) -> list[SourceConfig]:
+        """All active sources, ordered by code; always reloaded (one query)."""
+        result = await session.execute(
+            select(Source)
+            .where(Source.is_active.is_(True))
+            .order_by(Source.code)
+            .execution_options(populate_existing=True)
+        )
+        return [self.put(source) for source in result.scalars().all()]
+
+    def invalidate(self, source_id: uuid.UUID | None = None) -> None:
+        if source_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(source_id, None)
+
+
+_cache: SourceConfigCache | None = None
+
+
+def get_source_configs() -> SourceConfigCache:
+    global _cache
+    if _cache is None:
+        _cache = SourceConfigCache()
+    return _cache
+
+
+@event.listens_for(Source, "after_insert")
+@event.listens_for(Source, "after_update")
+@event.listens_for(Source, "after_delete")
+def _invalidate_on_write(_mapper: Any, _connection: Any, target: Source) -> None:
+    if _cache is not None and target.id is not None:
+        _cache.invalidate(target.id)
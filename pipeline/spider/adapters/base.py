@@ -1,11 +1,25 @@
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
 
-from pipeline.db.models.sources import Source
+from pipeline.source_config import SourceConfig
 
 
 class SpiderAdapter(ABC):
     """Discover raw URLs from a source. Normalization happens outside adapters."""
 
+    # Spider state sections this adapter writes; rolled back when the adapter fails.
+    state_sections: tuple[str, ...] = ()
+
     @abstractmethod
-    async def discover_urls(self, source: Source) -> list[str]:
+    async def discover_urls(self, source: SourceConfig) -> list[str]:
         """Return un-normalized absolute URLs."""
+
+    async def iter_url_batches(self, source: SourceConfig) -> AsyncIterator[list[str]]:
+        """Yield un-normalized absolute URLs in batches as they are found.
+
+        The default yields ``discover_urls`` as one batch; adapters over large
+        sites override this so the spider can insert while discovery continues.
+        """
+        urls = await self.discover_urls(source)
+        if urls:
+            yield urls
@@ -1,70 +1,118 @@
 from __future__ import annotations
 
+from collections.abc import AsyncIterator
 from urllib.parse import urljoin, urlparse
 
-from pipeline.db.models.sources import Source
+from pipeline.source_config import SourceConfig
 from pipeline.spider.adapters.base import SpiderAdapter
+from pipeline.spider.context import SpiderContext
 from pipeline.spider.http import SpiderHttp
-from pipeline.spider.links import extract_links, filter_by_patterns
+from pipeline.spider.links import extract_link_records, extract_links, filter_by_patterns
+from pipeline.spider.pagination import ListingPaginator
 from pipeline.spider.robots import RobotsChecker
 
 
 class FIRMAAdapter(SpiderAdapter):
-    """MOJ FIRMA CMS — newsroom listing with retries."""
-
-    MAX_RETRIES = 5
-
-    def __init__(self, http: SpiderHttp, robots: RobotsChecker) -> None:
+    """MOJ FIRMA CMS — newsroom listing.
+
+    Retries come from the shared HTTP retry engine (``max_retries`` selector),
+    so a dead backend trips the host circuit instead of stacking retry loops.
+    """
+
+    def __init__(
+        self,
+        http: SpiderHttp,
+        robots: RobotsChecker,
+        context: SpiderContext | None = None,
+    ) -> None:
         self._http = http
         self._robots = robots
+        self._context = context
+
+    async def discover_urls(self, source: SourceConfig) -> list[str]:
+        urls: list[str] = []
+        async for batch in self.iter_url_batches(source):
+            urls.extend(batch)
+        return list(dict.fromkeys(urls))
 
-    async def discover_urls(self, source: Source) -> list[str]:
+    async def iter_url_batches(self, source: SourceConfig) -> AsyncIterator[list[str]]:
+        """The English newsroom, then its /am/ mirror; the fallback URLs if neither has links."""
         selectors = source.selectors or {}
-        max_retries = int(selectors.get("max_retries", self.MAX_RETRIES))
         listing_path = selectors.get("news_listing", "/en/newsroom/")
         listing_url = urljoin(source.url.rstrip("/") + "/", listing_path.lstrip("/"))
 
         if not await self._robots.can_fetch(listing_url):
-            return _fallback_urls(selectors)
+            if fallback := _fallback_urls(selectors):
+                yield fallback
+            return
 
-        html: str | None = None
-        for attempt in range(max_retries):
-            try:
+        backfill = self._context is not None and self._context.backfill
+        try:
+            if backfill:
                 response = await self._http.get(listing_url)
-                html = response.text
-                break
-            except Exception:
-                if attempt == max_retries - 1:
-                    return []
-                continue
-
-        if not html:
-            return _fallback_urls(selectors)
-
-        if "bot verification" in html.lower() or "captcha" in html.lower():
-            return _fallback_urls(selectors)
+            else:
+                response = await self._http.get_if_changed(listing_url)
+        except Exception:
+            return
+        # None: the English listing is unchanged since the last run. Its walk is
+        # skipped, but the /am/ mirror has its own validator and is still checked.
+        html = response.text if response is not None else None
+
+        if response is not None and (
+            not html or "bot verification" in html.lower() or "captcha" in html.lower()
+        ):
+            if fallback := _fallback_urls(selectors):
+                yield fallback
+            return
 
         host = urlparse(source.url).netloc.lower().removeprefix("www.")
-        links = extract_links(html, listing_url, allowed_hosts={host})
-
         patterns = [selectors.get("article_url_pattern", "/en/newsroom/")]
-        if patterns[0]:
-            links = filter_by_patterns(links, patterns) or links
+
+        def page_links(page_html: str, page_url: str) -> list[str]:
+            records = extract_link_records(page_html, page_url, allowed_hosts={host})
+            found = [r.url for r in records]
+            if patterns[0]:
+                found = filter_by_patterns(found, patterns) or found
+            if self._context is not None:
+                kept = set(found)
+                for record in records:
+                    if record.url in kept:
+                        self._context.annotate(record.url, **record.metadata())
+            return found
+
+        def mirror_links(page_html: str, page_url: str) -> list[str]:
+            return extract_links(page_html, page_url, allowed_hosts={host})
+
+        links: list[str] = []
+        if html is not None:
+            paginator = ListingPaginator.for_source(
+                self._http, self._robots, page_links, selectors, self._context
+            )
+            try:
+                links = await paginator.crawl(listing_url, first_html=html)
+            except Exception:
+                links = page_links(html, listing_url)
+                self._http.confirm(listing_url)
+        if links:
+            yield list(dict.fromkeys(links))
 
         # Also discover /am/ mirror listings
+        mirror: list[str] = []
         am_listing = listing_url.replace("/en/", "/am/", 1)
-        if am_listing != listing_url and await self._robots.can_fetch(am_listing):
+        if am_listing != listing_url:
+            am_paginator = ListingPaginator.for_source(
+                self._http, self._robots, mirror_links, selectors, self._context
+            )
             try:
-                am_response = await self._http.get(am_listing)
-                am_links = extract_links(am_response.text, am_listing, allowed_hosts={host})
-                links.extend(am_links)
+                mirror = await am_paginator.crawl(am_listing)
             except Exception:
                 pass
+        if mirror:
+            yield list(dict.fromkeys(mirror))
 
-        if not links:
-            return _fallback_urls(selectors)
-
-        return list(dict.fromkeys(links))
+        if html is not None and not links and not mirror:
+            if fallback := _fallback_urls(selectors):
+                yield fallback
 
 
 def _fallback_urls(selectors: dict) -> list[str]:
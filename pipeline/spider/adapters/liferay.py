@@ -1,16 +1,24 @@
 from __future__ import annotations
 
+from collections.abc import AsyncIterator
 from urllib.parse import urljoin, urlparse
 
-from pipeline.db.models.sources import Source
+from pipeline.source_config import SourceConfig
 from pipeline.spider.adapters.base import SpiderAdapter
+from pipeline.spider.bfs import BfsBudget, BfsDiscovery
+from pipeline.spider.context import SpiderContext
 from pipeline.spider.http import SpiderHttp
-from pipeline.spider.links import extract_links
 from pipeline.spider.robots import RobotsChecker
+from pipeline.spider.streaming import BatchSink, stream_batches
 
 
 class LiferayAdapter(SpiderAdapter):
-    """MOR Liferay portal — HTML link discovery with robots enforcement."""
+    """MOR Liferay portal — budgeted BFS link discovery with robots enforcement.
+
+    ``www.`` and ``alternate_base_url`` hosts are one site to the crawler, so seed
+    pages are not fetched twice. Budgets come from ``bfs_max_depth``,
+    ``bfs_max_pages`` and ``bfs_time_budget_s`` selectors.
+    """
 
     SEED_PATHS = (
         "/",
@@ -21,11 +29,40 @@ class LiferayAdapter(SpiderAdapter):
         "/en/directives",
     )
 
-    def __init__(self, http: SpiderHttp, robots: RobotsChecker) -> None:
+    def __init__(
+        self,
+        http: SpiderHttp,
+        robots: RobotsChecker,
+        context: SpiderContext | None = None,
+    ) -> None:
         self._http = http
         self._robots = robots
+        self._context = context
+
+    async def discover_urls(self, source: SourceConfig) -> list[str]:
+        crawler, seeds = self._crawler(source)
+        urls = await crawler.crawl(seeds)
+        if urls:
+            return urls
+        return _fallback_urls(source.selectors or {})
+
+    async def iter_url_batches(self, source: SourceConfig) -> AsyncIterator[list[str]]:
+        """Links from each page as it is fetched; the fallback URLs if none turn up."""
 
-    async def discover_urls(self, source: Source) -> list[str]:
+        async def run(sink: BatchSink) -> None:
+            crawler, seeds = self._crawler(source, on_links=sink)
+            await crawler.crawl(seeds)
+
+        found = False
+        async for batch in stream_batches(run):
+            found = True
+            yield batch
+        if not found and (fallback := _fallback_urls(source.selectors or {})):
+            yield fallback
+
+    def _crawler(
+        self, source: SourceConfig, on_links: BatchSink | None = None
+    ) -> tuple[BfsDiscovery, list[str]]:
         selectors = source.selectors or {}
         bases = [source.url.rstrip("/")]
         if alt := selectors.get("alternate_base_url"):
@@ -37,41 +74,17 @@ class LiferayAdapter(SpiderAdapter):
             allowed_hosts.add(host)
 
         seed_paths = selectors.get("seed_paths") or self.SEED_PATHS
-        urls: list[str] = []
+        seeds = [urljoin(base + "/", path.lstrip("/")) for base in bases for path in seed_paths]
 
-        for base in bases:
-            for path in seed_paths:
-                page_url = urljoin(base + "/", path.lstrip("/"))
-                if not await self._robots.can_fetch(page_url):
-                    continue
-                try:
-                    response = await self._http.get(page_url)
-                    links = extract_links(
-                        response.text, page_url, allowed_hosts=allowed_hosts
-                    )
-                    # Prefer document-like paths on MOR
-                    doc_links = [
-                        link
-                        for link in links
-                        if any(
-                            part in urlparse(link).path.lower()
-                            for part in (
-                                "/documents/",
-                                "/document/",
-                                "/download/",
-                                "/en/",
-                                "/web/",
-                            )
-                        )
-                    ]
-                    urls.extend(doc_links or links)
-                except Exception:
-                    continue
-
-        deduped = list(dict.fromkeys(urls))
-        if deduped:
-            return deduped
-        return _fallback_urls(selectors)
+        crawler = BfsDiscovery(
+            self._http,
+            self._robots,
+            allowed_hosts=allowed_hosts,
+            budget=BfsBudget.from_selectors(selectors),
+            workers=int(selectors.get("bfs_workers", 4)),
+            on_links=on_links,
+        )
+        return crawler, seeds
 
 
 def _fallback_urls(selectors: dict) -> list[str]:
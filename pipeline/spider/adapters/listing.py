@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+from collections.abc import AsyncIterator
 from urllib.parse import urljoin, urlparse
 
-from pipeline.db.models.sources import Source
+from pipeline.source_config import SourceConfig
 from pipeline.spider.adapters.base import SpiderAdapter
+from pipeline.spider.context import SpiderContext
 from pipeline.spider.http import SpiderHttp
-from pipeline.spider.links import extract_links, filter_by_patterns
+from pipeline.spider.links import CONTAINS_SELECTORS, UrlPatternSet, extract_link_records
+from pipeline.spider.pagination import ListingPaginator
 from pipeline.spider.robots import RobotsChecker
 
 
@@ -19,11 +22,24 @@ class ListingAdapter(SpiderAdapter):
         "/mof-directive/circular/",
     )
 
-    def __init__(self, http: SpiderHttp, robots: RobotsChecker) -> None:
+    def __init__(
+        self,
+        http: SpiderHttp,
+        robots: RobotsChecker,
+        context: SpiderContext | None = None,
+    ) -> None:
         self._http = http
         self._robots = robots
+        self._context = context
 
-    async def discover_urls(self, source: Source) -> list[str]:
+    async def discover_urls(self, source: SourceConfig) -> list[str]:
+        urls: list[str] = []
+        async for batch in self.iter_url_batches(source):
+            urls.extend(batch)
+        return list(dict.fromkeys(urls))
+
+    async def iter_url_batches(self, source: SourceConfig) -> AsyncIterator[list[str]]:
+        """One batch per listing path, once its pages have been walked."""
         selectors = source.selectors or {}
         paths = selectors.get("listing_paths") or [
             selectors.get("news_listing"),
@@ -32,27 +48,27 @@ class ListingAdapter(SpiderAdapter):
         ]
         paths = list(dict.fromkeys(p for p in paths if p))
 
-        patterns = [selectors.get("article_url_pattern")]
-        pdf_pattern = selectors.get("pdf_path_pattern")
-        if pdf_pattern:
-            patterns.append(f"*{pdf_pattern}*")
+        # Articles, directives and PDF paths (pdf_path_pattern) from one compiled set.
+        patterns = UrlPatternSet.from_selectors(selectors, contains_keys=CONTAINS_SELECTORS)
 
         base_host = urlparse(source.url).netloc.lower().removeprefix("www.")
         allowed_hosts = {base_host}
+        def page_links(html: str, page_url: str) -> list[str]:
+            records = extract_link_records(html, page_url, allowed_hosts=allowed_hosts)
+            records = [r for r in records if patterns.matches(r.url)]
+            if self._context is not None:
+                for record in records:
+                    self._context.annotate(record.url, **record.metadata())
+            return [r.url for r in records]
 
-        urls: list[str] = []
         for path in paths:
             listing_url = urljoin(source.url.rstrip("/") + "/", path.lstrip("/"))
-            if not await self._robots.can_fetch(listing_url):
-                continue
+            paginator = ListingPaginator.for_source(
+                self._http, self._robots, page_links, selectors, self._context
+            )
             try:
-                response = await self._http.get(listing_url)
-                links = extract_links(response.text, listing_url, allowed_hosts=allowed_hosts)
-                article_pattern = selectors.get("article_url_pattern")
-                if article_pattern:
-                    links = filter_by_patterns(links, [article_pattern])
-                urls.extend(links)
+                urls = await paginator.crawl(listing_url)
             except Exception:
                 continue
-
-        return list(dict.fromkeys(urls))
+            if urls:
+                yield list(dict.fromkeys(urls))
@@ -1,54 +1,131 @@
 from __future__ import annotations
 
 import asyncio
+from datetime import datetime, timedelta, timezone
 from urllib.parse import urljoin
 
 import feedparser
+from selectolax.parser import HTMLParser
 
-from pipeline.db.models.sources import Source
+from pipeline.source_config import SourceConfig
 from pipeline.spider.adapters.base import SpiderAdapter
+from pipeline.spider.context import SpiderContext
 from pipeline.spider.http import SpiderHttp
 from pipeline.spider.robots import RobotsChecker
 
+FEED_SECTION = "rss_feed"
+FEED_TTL = timedelta(days=7)
+NO_FEED_TTL = timedelta(days=1)
+
+_FEED_TYPES = ("rss", "atom", "xml")
+
 
 class RSSAdapter(SpiderAdapter):
+    """RSS/Atom entries; without ``rss_url`` the feed is autodiscovered and remembered.
+
+    Autodiscovery reads ``<link rel="alternate">`` on the homepage and probes those
+    plus ``FEED_PATHS`` concurrently. The winner (or "no feed") is cached in the
+    ``rss_feed`` state section for ``FEED_TTL`` / ``NO_FEED_TTL``.
+    """
+
     FEED_PATHS = ("/feed/", "/rss/", "/atom.xml", "/feed/rss/", "/index.xml")
+    state_sections = (FEED_SECTION,)
 
-    def __init__(self, http: SpiderHttp, robots: RobotsChecker) -> None:
+    def __init__(
+        self,
+        http: SpiderHttp,
+        robots: RobotsChecker,
+        context: SpiderContext | None = None,
+    ) -> None:
         self._http = http
         self._robots = robots
+        self._context = context
 
-    async def discover_urls(self, source: Source) -> list[str]:
+    async def discover_urls(self, source: SourceConfig) -> list[str]:
         selectors = source.selectors or {}
-        candidates: list[str] = []
-
         if rss_url := selectors.get("rss_url"):
-            candidates.append(rss_url)
-        else:
-            base = source.url.rstrip("/")
-            candidates.extend(urljoin(base + "/", path.lstrip("/")) for path in self.FEED_PATHS)
-
-        urls: list[str] = []
-        for feed_url in candidates:
-            if not await self._robots.can_fetch(feed_url):
-                continue
-            found = await self._parse_feed(feed_url)
-            if found:
-                urls.extend(found)
-                break
-
-        return list(dict.fromkeys(urls))
-
-    async def _parse_feed(self, feed_url: str) -> list[str]:
+            if not await self._robots.can_fetch(rss_url):
+                return []
+            _, links = await self._parse_feed(rss_url)
+            return list(dict.fromkeys(links))
+
+        cache = self._context.section(FEED_SECTION) if self._context is not None else {}
+        if _is_fresh(cache):
+            feed_url = cache.get("url")
+            if not feed_url:
+                return []
+            is_feed, links = await self._parse_feed(feed_url)
+            if is_feed:
+                return list(dict.fromkeys(links))
+            cache.clear()  # Feed moved or died: rediscover next run.
+            return []
+
+        feed_url, links = await self._discover(source)
+        cache.clear()
+        cache.update(url=feed_url, checked_at=datetime.now(timezone.utc).isoformat())
+        return list(dict.fromkeys(links))
+
+    async def _discover(self, source: SourceConfig) -> tuple[str | None, list[str]]:
+        base = source.url.rstrip("/")
+        candidates = await self._alternate_links(base + "/")
+        candidates.extend(urljoin(base + "/", path.lstrip("/")) for path in self.FEED_PATHS)
+        candidates = await self._robots.filter_allowed(dict.fromkeys(candidates))
+
+        probes = await asyncio.gather(*(self._parse_feed(url) for url in candidates))
+        for feed_url, (is_feed, links) in zip(candidates, probes):
+            if is_feed:
+                return feed_url, links
+        return None, []
+
+    async def _alternate_links(self, homepage: str) -> list[str]:
+        if not await self._robots.can_fetch(homepage):
+            return []
         try:
-            response = await self._http.get(feed_url)
-            parsed = await asyncio.to_thread(feedparser.parse, response.text)
+            response = await self._http.get(homepage)
         except Exception:
             return []
+        links: list[str] = []
+        for node in HTMLParser(response.text).css("link[rel~=alternate][href]"):
+            kind = (node.attributes.get("type") or "").lower()
+            if any(t in kind for t in _FEED_TYPES):
+                links.append(urljoin(homepage, (node.attributes.get("href") or "").strip()))
+        return links
+
+    async def _parse_feed(self, feed_url: str) -> tuple[bool, list[str]]:
+        """``(is_feed, links)``; an unchanged body (same digest) has nothing new.
+
+        Whether the body was a feed is kept with its validator, so an unchanged
+        probe answers the same as the last full parse did.
+        """
+        try:
+            response = await self._http.get_if_changed(feed_url)
+            if response is None:
+                return bool(self._http.annotation(feed_url, "is_feed", False)), []
+            parsed = await asyncio.to_thread(feedparser.parse, response.text)
+        except Exception:
+            return False, []
+        if not parsed.get("version") and not parsed.entries:
+            self._http.annotate(feed_url, is_feed=False)
+            self._http.confirm(feed_url)
+            return False, []
 
         links: list[str] = []
         for entry in parsed.entries:
-            link = entry.get("link")
-            if link and await self._robots.can_fetch(link):
+            if link := entry.get("link"):
                 links.append(link)
-        return links
+                if self._context is not None:
+                    self._context.annotate(link, published=entry.get("published"))
+        self._http.annotate(feed_url, is_feed=True)
+        self._http.confirm(feed_url)
+        return True, await self._robots.filter_allowed(links)
+
+
+def _is_fresh(cache: dict) -> bool:
+    checked_at = cache.get("checked_at")
+    if not checked_at:
+        return False
+    try:
+        age = datetime.now(timezone.utc) - datetime.fromisoformat(checked_at)
+    except ValueError:
+        return False
+    return age < (FEED_TTL if cache.get("url") else NO_FEED_TTL)
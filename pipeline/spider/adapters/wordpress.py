@@ -1,96 +1,238 @@
 from __future__ import annotations
 
-from urllib.parse import urljoin
+import asyncio
+from collections.abc import AsyncIterator, Callable
+from datetime import datetime, timedelta
+from urllib.parse import urlencode, urljoin
 
-from pipeline.db.models.sources import Source
+import httpx
+
+from pipeline.source_config import SourceConfig
 from pipeline.spider.adapters.base import SpiderAdapter
+from pipeline.spider.context import SpiderContext
 from pipeline.spider.http import SpiderHttp
-from pipeline.spider.links import extract_links, filter_by_patterns
+from pipeline.spider.links import UrlPatternSet, extract_links
 from pipeline.spider.robots import RobotsChecker
 
+WP_PER_PAGE = 100
+WP_MAX_PAGES = 20
+WP_FIELDS = "link,modified,date"
+WP_WATERMARK_SECTION = "wp_modified"
+# Key suffix for the (modified, next page) walk through one over-full timestamp.
+WP_TIE_SUFFIX = "#tie"
+
 
 class WordPressAdapter(SpiderAdapter):
     """WordPress sites: REST API + listing page fallback (NBE)."""
 
-    def __init__(self, http: SpiderHttp, robots: RobotsChecker) -> None:
+    state_sections = (WP_WATERMARK_SECTION,)
+
+    def __init__(
+        self,
+        http: SpiderHttp,
+        robots: RobotsChecker,
+        context: SpiderContext | None = None,
+    ) -> None:
         self._http = http
         self._robots = robots
+        self._context = context
 
-    async def discover_urls(self, source: Source) -> list[str]:
-        selectors = source.selectors or {}
+    async def discover_urls(self, source: SourceConfig) -> list[str]:
         urls: list[str] = []
+        async for batch in self.iter_url_batches(source):
+            urls.extend(batch)
+        return list(dict.fromkeys(urls))
+
+    async def iter_url_batches(self, source: SourceConfig) -> AsyncIterator[list[str]]:
+        """The REST API's posts as one batch, then one batch per listing page."""
+        selectors = source.selectors or {}
 
         post_type = selectors.get("wp_post_type", "nbe_news")
-        api_urls = await self._fetch_wp_api(source, post_type)
-        urls.extend(api_urls)
+        if api_urls := await self._fetch_wp_api(source, post_type):
+            yield list(dict.fromkeys(api_urls))
 
         listing_paths = [
             selectors.get("news_listing"),
             selectors.get("archive_listing"),
             selectors.get("directives_listing"),
         ]
-        patterns = [
-            selectors.get("article_url_pattern"),
-            selectors.get("directive_url_pattern"),
-        ]
+        patterns = UrlPatternSet.from_selectors(selectors)
 
         for path in listing_paths:
             if not path:
                 continue
-            listing_urls = await self._crawl_listing_page(source, path, patterns)
-            urls.extend(listing_urls)
-
-        return list(dict.fromkeys(urls))
-
-    async def _fetch_wp_api(self, source: Source, post_type: str) -> list[str]:
+            if listing_urls := await self._crawl_listing_page(source, path, patterns):
+                yield list(dict.fromkeys(listing_urls))
+
+    async def _fetch_wp_api(self, source: SourceConfig, post_type: str) -> list[str]:
+        """Post links from the REST API, trimmed to ``WP_FIELDS``.
+
+        With a context, only posts modified after the stored watermark are
+        requested, oldest change first. Page 1 reports ``X-WP-TotalPages``; the
+        remaining pages are fetched concurrently, still bounded by the per-host
+        limits. The watermark only advances when every page was read, and when
+        more than ``WP_MAX_PAGES`` were pending it stops short of the newest
+        ``modified`` read, whose ties may sit on the pages left for next run.
+        If every post read shares that one ``modified`` (a bulk import), the
+        runs that follow walk just that timestamp's posts in id order instead
+        (``WP_TIE_SUFFIX`` state), then move the watermark past it.
+        """
         base = source.url.rstrip("/")
         endpoint = f"{base}/wp-json/wp/v2/{post_type}"
-        found: list[str] = []
-        page = 1
-
-        while page <= 20:
-            api_url = f"{endpoint}?per_page=100&page={page}"
-            if not await self._robots.can_fetch(api_url):
-                break
-            try:
-                response = await self._http.get(api_url)
-                if response.status_code == 404:
-                    break
-                data = response.json()
-            except Exception:
-                break
+        watermarks = self._context.section(WP_WATERMARK_SECTION) if self._context else None
+        since = watermarks.get(endpoint) if watermarks is not None else None
+        tie = watermarks.get(endpoint + WP_TIE_SUFFIX) if watermarks is not None else None
+
+        params = {"per_page": WP_PER_PAGE, "_fields": WP_FIELDS}
+        if tie:
+            # Exactly one timestamp: modified_after/_before are exclusive, to the second.
+            modified = datetime.fromisoformat(tie["modified"])
+            params.update(
+                orderby="id",
+                order="asc",
+                modified_after=(modified - timedelta(seconds=1)).isoformat(),
+                modified_before=(modified + timedelta(seconds=1)).isoformat(),
+            )
+        elif watermarks is not None:
+            # Oldest first, so a backlog longer than WP_MAX_PAGES is worked off over runs.
+            params.update(orderby="modified", order="asc")
+            if since:
+                params["modified_after"] = since
+
+        def page_url(page: int) -> str:
+            return f"{endpoint}?{urlencode({**params, 'page': page})}"
+
+        read = await self._fetch_wp_pages(page_url, tie["page"] if tie else 1)
+        if read is None:
+            return []
+        items, truncated, complete = read
 
-            if not isinstance(data, list) or not data:
+        links: list[str] = []
+        modified_seen: set[str] = set()
+        for item in items:
+            link = item.get("link")
+            if not link:
+                continue
+            links.append(link)
+            modified = item.get("modified")
+            if modified:
+                modified_seen.add(modified)
+            if self._context is not None:
+                self._context.annotate(link, modified=modified, published=item.get("date"))
+
+        if watermarks is not None and complete:
+            if tie:
+                if truncated:
+                    watermarks[endpoint + WP_TIE_SUFFIX] = {
+                        **tie,
+                        "page": tie["page"] + WP_MAX_PAGES,
+                    }
+                else:
+                    # Every post at this timestamp is read: carry on strictly after it.
+                    del watermarks[endpoint + WP_TIE_SUFFIX]
+                    if since is None or tie["modified"] > since:
+                        watermarks[endpoint] = tie["modified"]
+            elif truncated and len(modified_seen) == 1:
+                # Dropping the one timestamp would leave the watermark stuck for good.
+                watermarks[endpoint + WP_TIE_SUFFIX] = {"modified": max(modified_seen), "page": 1}
+            else:
+                if truncated:
+                    modified_seen.discard(max(modified_seen, default=None))
+                newest = max(modified_seen, default=None)
+                if newest is not None and (since is None or newest > since):
+                    watermarks[endpoint] = newest
+        return await self._robots.filter_allowed(links)
+
+    async def _fetch_wp_pages(
+        self, page_url: Callable[[int], str], start: int
+    ) -> tuple[list[dict], bool, bool] | None:
+        """``(items, truncated, complete)`` for up to ``WP_MAX_PAGES`` pages from ``start``.
+
+        ``truncated``: more pages remain past the cap. ``None`` if the first page failed.
+        """
+        first = await self._fetch_wp_page(page_url(start))
+        if first is None:
+            return None
+        items, total_pages = first
+        last_page = start + WP_MAX_PAGES - 1
+        if total_pages is None:
+            # Header stripped by a proxy: page serially while pages come back full.
+            stop = last_page if len(items) >= WP_PER_PAGE else start
+            pages = await self._fetch_wp_pages_serially(page_url, start + 1, stop)
+            last = pages[-1] if pages else first
+            truncated = stop == last_page and last is not None
+            truncated = truncated and len(last[0]) >= WP_PER_PAGE
+        else:
+            truncated = total_pages > last_page
+            pages = await asyncio.gather(
+                *(
+                    self._fetch_wp_page(page_url(page))
+                    for page in range(start + 1, min(total_pages, last_page) + 1)
+                )
+            )
+        complete = all(page is not None for page in pages)
+        for page in pages:
+            if page is not None:
+                items.extend(page[0])
+        return items, truncated, complete
+
+    async def _fetch_wp_pages_serially(
+        self, page_url: Callable[[int], str], first_page: int, last_page: int
+    ) -> list[tuple[list[dict], int | None] | None]:
+        pages: list[tuple[list[dict], int | None] | None] = []
+        for page in range(first_page, last_page + 1):
+            result = await self._fetch_wp_page(page_url(page))
+            pages.append(result)
+            if result is None or len(result[0]) < WP_PER_PAGE:
                 break
+        return pages
 
-            for item in data:
-                link = item.get("link")
-                if link and await self._robots.can_fetch(link):
-                    found.append(link)
-
-            if len(data) < 100:
-                break
-            page += 1
+    async def _fetch_wp_page(self, api_url: str) -> tuple[list[dict], int | None] | None:
+        """``(items, X-WP-TotalPages)``; unchanged pages have no new items. ``None`` on failure."""
+        if not await self._robots.can_fetch(api_url):
+            return None
+        try:
+            response = await self._http.get_if_changed(api_url)
+            if response is None:
+                return [], self._http.annotation(api_url, "total_pages")
+            data = response.json()
+        except httpx.HTTPStatusError as exc:
+            # 404: no such post type; 400: page past the end (rest_post_invalid_page_number).
+            return ([], 0) if exc.response.status_code in (400, 404) else None
+        except Exception:
+            return None
+        if not isinstance(data, list):
+            return None
 
-        return found
+        total_pages: int | None = None
+        if header := response.headers.get("X-WP-TotalPages"):
+            try:
+                total_pages = int(header)
+            except ValueError:
+                pass
+        self._http.annotate(api_url, total_pages=total_pages)
+        self._http.confirm(api_url)
+        return [item for item in data if isinstance(item, dict)], total_pages
 
     async def _crawl_listing_page(
         self,
-        source: Source,
+        source: SourceConfig,
         path: str,
-        patterns: list[str | None],
+        patterns: UrlPatternSet,
     ) -> list[str]:
         listing_url = urljoin(source.url.rstrip("/") + "/", path.lstrip("/"))
         if not await self._robots.can_fetch(listing_url):
             return []
         try:
-            response = await self._http.get(listing_url)
+            response = await self._http.get_if_changed(listing_url)
+            if response is None:
+                return []
             host = source.url.split("//", 1)[-1].split("/")[0].lower().removeprefix("www.")
             allowed = {host}
-            links = extract_links(response.text, listing_url, allowed_hosts=allowed)
-            clean_patterns = [p for p in patterns if p]
-            if clean_patterns:
-                links = filter_by_patterns(links, clean_patterns)
-            return links
+            links = patterns.filter(
+                extract_links(response.text, listing_url, allowed_hosts=allowed)
+            )
         except Exception:
             return []
+        self._http.confirm(listing_url)
+        return links
@@ -0,0 +1,146 @@
+"""Budgeted breadth-first link discovery for portal-style CMSs (e.g. Liferay)."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from urllib.parse import urlparse
+
+from pipeline.spider.http import SpiderHttp
+from pipeline.spider.links import extract_links
+from pipeline.spider.robots import RobotsChecker
+from pipeline.spider.streaming import BatchSink
+
+DOCUMENT_PATH_PARTS = ("/documents/", "/document/", "/download/")
+# Links worth returning on MOR; kept from the original one-hop adapter.
+PREFERRED_PATH_PARTS = (*DOCUMENT_PATH_PARTS, "/en/", "/web/")
+FILE_EXTENSIONS = (
+    ".pdf", ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx", ".zip", ".rar",
+    ".jpg", ".jpeg", ".png", ".gif", ".mp4", ".mp3",
+)
+
+
+@dataclass(frozen=True)
+class BfsBudget:
+    max_depth: int = 2
+    max_pages: int = 60
+    time_budget_s: float = 120.0
+
+    @classmethod
+    def from_selectors(cls, selectors: dict) -> BfsBudget:
+        default = cls()
+        return cls(
+            max_depth=int(selectors.get("bfs_max_depth", default.max_depth)),
+            max_pages=int(selectors.get("bfs_max_pages", default.max_pages)),
+            time_budget_s=float(selectors.get("bfs_time_budget_s", default.time_budget_s)),
+        )
+
+
+def document_priority(url: str) -> int:
+    """Lower is fetched first: document-like paths, then everything else."""
+    path = urlparse(url).path.lower()
+    return 0 if any(part in path for part in DOCUMENT_PATH_PARTS) else 1
+
+
+def _is_file(url: str) -> bool:
+    return urlparse(url).path.lower().endswith(FILE_EXTENSIONS)
+
+
+class BfsDiscovery:
+    """Fetches pages breadth-first from seeds and collects the links they contain.
+
+    Hosts in ``allowed_hosts`` are aliases of one site (``www.`` or not, alternate
+    bases), so a page is fetched once whichever host it was linked under. Up to
+    ``workers`` fetches run at once; ``SpiderHttp`` still applies the per-host
+    limits. Within a depth, document-like paths are fetched first. The crawl
+    stops at ``max_depth``, after ``max_pages`` fetches, or when the time budget
+    runs out, returning whatever was collected. With ``on_links``, each page's
+    newly found links also go to that sink as soon as the page is read.
+    """
+
+    def __init__(
+        self,
+        http: SpiderHttp,
+        robots: RobotsChecker,
+        *,
+        allowed_hosts: set[str],
+        budget: BfsBudget | None = None,
+        priority: Callable[[str], int] = document_priority,
+        workers: int = 4,
+        on_links: BatchSink | None = None,
+    ) -> None:
+        self._http = http
+        self._robots = robots
+        self._allowed_hosts = allowed_hosts
+        self._budget = budget or BfsBudget()
+        self._priority = priority
+        self._workers = max(1, workers)
+        self._on_links = on_links
+        self._queue: asyncio.PriorityQueue[tuple[int, int, int, str]] = asyncio.PriorityQueue()
+        self._scheduled: set[tuple[str, str]] = set()
+        self._seq = 0
+        self._found: dict[str, None] = {}
+        self.pages_fetched = 0
+
+    def _page_key(self, url: str) -> tuple[str, str]:
+        parsed = urlparse(url)
+        host = parsed.netloc.lower().removeprefix("www.")
+        site = "" if host in self._allowed_hosts else host
+        return site, f"{parsed.path.rstrip('/') or '/'}?{parsed.query}"
+
+    def _schedule(self, url: str, depth: int) -> None:
+        key = self._page_key(url)
+        if key in self._scheduled or _is_file(url):
+            return
+        self._scheduled.add(key)
+        self._seq += 1
+        self._queue.put_nowait((depth, self._priority(url), self._seq, url))
+
+    async def crawl(self, seeds: Iterable[str]) -> list[str]:
+        for seed in seeds:
+            self._schedule(seed, 0)
+        deadline = time.monotonic() + self._budget.time_budget_s
+        workers = [asyncio.ensure_future(self._worker(deadline)) for _ in range(self._workers)]
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=self._budget.time_budget_s)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        return list(self._found)
+
+    async def _worker(self, deadline: float) -> None:
+        while True:
+            depth, _, _, url = await self._queue.get()
+            try:
+                if self.pages_fetched < self._budget.max_pages and time.monotonic() < deadline:
+                    await self._visit(url, depth)
+            finally:
+                self._queue.task_done()
+
+    async def _visit(self, url: str, depth: int) -> None:
+        if not await self._robots.can_fetch(url):
+            return
+        self.pages_fetched += 1
+        try:
+            response = await self._http.get(url)
+            links = extract_links(response.text, url, allowed_hosts=self._allowed_hosts)
+        except Exception:
+            return
+
+        preferred = [
+            link
+            for link in links
+            if any(part in urlparse(link).path.lower() for part in PREFERRED_PATH_PARTS)
+        ]
+        new = [link for link in preferred or links if link not in self._found]
+        self._found.update(dict.fromkeys(new))
+        if self._on_links is not None and new:
+            self._on_links(new)
+        if depth < self._budget.max_depth:
+            for link in links:
+                self._schedule(link, depth + 1)
@@ -0,0 +1,39 @@
+"""Per-run spider context shared by a source's adapters."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from pipeline.spider.known import KnownUrlIndex
+from pipeline.spider.state import SpiderState
+
+
+class SpiderContext:
+    """Persistent state sections plus per-URL metadata gathered during discovery.
+
+    Adapters still return plain URL lists; anything they learn about a URL
+    (``lastmod``, titles, dates) goes through ``annotate`` and is merged into
+    ``DiscoveredUrl.link_metadata`` on insert. ``known`` holds the URLs already
+    discovered for the source; ``backfill`` asks adapters to ignore stop-on-known
+    shortcuts and walk archives in full.
+    """
+
+    def __init__(
+        self,
+        state: SpiderState | None = None,
+        *,
+        known: KnownUrlIndex | None = None,
+        backfill: bool = False,
+    ) -> None:
+        self.state = state or SpiderState()
+        self.known = known
+        self.backfill = backfill
+        self.link_metadata: dict[str, dict[str, Any]] = {}
+
+    def section(self, name: str) -> dict[str, Any]:
+        return self.state.section(name)
+
+    def annotate(self, url: str, **meta: Any) -> None:
+        self.link_metadata.setdefault(url, {}).update(
+            {key: value for key, value in meta.items() if value is not None}
+        )
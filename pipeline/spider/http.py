@@ -3,13 +3,20 @@
 from __future__ import annotations
 
 import asyncio
-import random
+from collections.abc import Callable
 from typing import Any
-from urllib.parse import urlparse
 
 import httpx
 
-USER_AGENT = "BerhanAdvisorBot/1.0 (+https://berhanadvisor.com/bot)"
+from pipeline.http.body import DEFAULT_MAX_BODY_BYTES, BodyConsumer, BodyLimits
+from pipeline.http.clients import USER_AGENT, ClientPool, get_client_pool
+from pipeline.http.ratelimit import AdaptiveRateLimiter, RateLimiterRegistry, get_rate_limiters
+from pipeline.http.retry import RetryEngine, RetryPolicy, RetryStats
+from pipeline.http.validators import ValidatorStore
+from pipeline.spider.streaming import current_adapter
+from pipeline.utils.url_normalizer import site_host
+
+__all__ = ["SpiderHttp", "USER_AGENT"]
 
 
 class SpiderHttp:
@@ -19,42 +26,107 @@ class SpiderHttp:
         max_concurrent: int = 2,
         timeout_s: float = 60.0,
         verify_ssl: bool = True,
+        pool: ClientPool | None = None,
+        validators: ValidatorStore | None = None,
+        rate_limiters: RateLimiterRegistry | None = None,
+        retry_policy: RetryPolicy | None = None,
+        max_body_bytes: int = DEFAULT_MAX_BODY_BYTES,
     ) -> None:
-        self._delay_s = crawl_delay_ms / 1000.0
+        self._crawl_delay_ms = crawl_delay_ms
+        self._rate_limiters = rate_limiters or get_rate_limiters()
         self._semaphores: dict[str, asyncio.Semaphore] = {}
         self._max_concurrent = max_concurrent
-        self._client = httpx.AsyncClient(
-            headers={"User-Agent": USER_AGENT},
-            timeout=httpx.Timeout(15.0, read=timeout_s),
-            follow_redirects=True,
-            verify=verify_ssl,
-        )
+        self._timeout = httpx.Timeout(15.0, read=timeout_s)
+        self._verify_ssl = verify_ssl
+        self._pool = pool
+        self._retry = RetryEngine(retry_policy)
+        self._max_body_bytes = max_body_bytes
+        self.validators = validators
+
+    @property
+    def pool(self) -> ClientPool:
+        if self._pool is None:
+            self._pool = get_client_pool()
+        return self._pool
+
+    @property
+    def verify_ssl(self) -> bool:
+        return self._verify_ssl
+
+    @property
+    def retry_stats(self) -> RetryStats:
+        return self._retry.stats
 
     def _semaphore_for(self, url: str) -> asyncio.Semaphore:
-        host = urlparse(url).netloc or "default"
+        host = site_host(url) or "default"
         if host not in self._semaphores:
             self._semaphores[host] = asyncio.Semaphore(self._max_concurrent)
         return self._semaphores[host]
 
-    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
-        async with self._semaphore_for(url):
-            await asyncio.sleep(self._delay_s + random.uniform(-0.2, 0.2))
-            return await self._get_with_retry(url, **kwargs)
-
-    async def _get_with_retry(self, url: str, attempt: int = 0, **kwargs: Any) -> httpx.Response:
-        try:
-            response = await self._client.get(url, **kwargs)
-            if response.status_code in (429, 503) and attempt < 4:
-                retry_after = int(response.headers.get("Retry-After", 2**attempt * 5))
-                await asyncio.sleep(retry_after)
-                return await self._get_with_retry(url, attempt + 1, **kwargs)
-            response.raise_for_status()
-            return response
-        except httpx.TransportError:
-            if attempt < 4:
-                await asyncio.sleep(2**attempt)
-                return await self._get_with_retry(url, attempt + 1, **kwargs)
-            raise
+    def _limiter_for(self, url: str) -> AdaptiveRateLimiter:
+        return self._rate_limiters.limiter_for(
+            url,
+            crawl_delay_ms=self._crawl_delay_ms,
+            max_concurrent=self._max_concurrent,
+        )
+
+    async def get(
+        self,
+        url: str,
+        *,
+        expect_text: bool = True,
+        max_bytes: int | None = None,
+        consumer: Callable[[], BodyConsumer] | None = None,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """Capped streaming GET; pass ``expect_text=False`` to accept binary bodies.
+
+        ``max_bytes`` overrides the source's body cap for this request. With
+        ``consumer``, each attempt feeds a successful body to a fresh consumer as
+        it streams in, and the response comes back without content.
+        """
+        kwargs.setdefault("timeout", self._timeout)
+        limits = BodyLimits(max_bytes=max_bytes or self._max_body_bytes, expect_text=expect_text)
+        return await self._retry.run(
+            url,
+            lambda: self.pool.get(
+                url,
+                verify_ssl=self._verify_ssl,
+                body_limits=limits,
+                consumer=consumer() if consumer is not None else None,
+                **kwargs,
+            ),
+            limiter=self._limiter_for(url),
+            semaphore=self._semaphore_for(url),
+        )
+
+    async def get_if_changed(self, url: str, **kwargs: Any) -> httpx.Response | None:
+        """Conditional GET; ``None`` means the body is unchanged since the last run.
+
+        A changed body's validators are kept only once ``confirm`` is called for
+        ``url`` after its links were extracted.
+        """
+        if self.validators is None:
+            return await self.get(url, **kwargs)
+        headers = {**self.validators.request_headers(url), **(kwargs.pop("headers", None) or {})}
+        response = await self.get(url, headers=headers, **kwargs)
+        unchanged = self.validators.is_unchanged(url, response)
+        self.validators.record(url, response)
+        return None if unchanged else response
+
+    def confirm(self, url: str) -> None:
+        """Links from ``url``'s body were extracted; keep its validators if the adapter succeeds."""
+        if self.validators is not None:
+            self.validators.confirm(url, owner=current_adapter.get())
+
+    def annotate(self, url: str, **values: Any) -> None:
+        if self.validators is not None:
+            self.validators.annotate(url, **values)
+
+    def annotation(self, url: str, key: str, default: Any = None) -> Any:
+        if self.validators is None:
+            return default
+        return self.validators.annotation(url, key, default)
 
     async def aclose(self) -> None:
-        await self._client.aclose()
+        """Pooled connections outlive this instance; see ``close_client_pool``."""
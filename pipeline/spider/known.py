@@ -0,0 +1,289 @@
+"""Per-source index of URLs already discovered, as a Bloom filter over ``url_hash``.
+
+Membership answers "probably known": a hit can be a false positive (about
+``DEFAULT_ERROR_RATE``), a miss is definite as long as every insert went through
+``add``. Anything that must not lose URLs (the insert path) confirms hits with
+``confirm`` before skipping them; stop-on-known heuristics use hits as-is.
+
+The filter can be saved to a file and memory-mapped back (copy-on-write) at the
+next worker start, then topped up with rows discovered since it was saved. With
+persistence off, each worker process keeps one filter per source in memory and
+tops it up the same way. Either copy records how many of the source's rows it
+covers; if the table now holds fewer (the database was reset or restored), the
+copy is dropped and rebuilt from the table.
+"""
+
+from __future__ import annotations
+
+import math
+import mmap
+import os
+import struct
+import uuid
+from collections.abc import Iterable
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from pipeline.config import get_settings
+from pipeline.db.models.urls import DiscoveredUrl
+from pipeline.utils.url_normalizer import normalize_one
+
+DEFAULT_ERROR_RATE = 0.001
+MIN_CAPACITY = 10_000
+CONFIRM_CHUNK = 5_000
+# Rows from other workers may carry slightly older timestamps than our snapshot.
+RELOAD_OVERLAP = timedelta(minutes=5)
+
+_MAGIC = b"BKNOWN02"
+# magic, bit count, hash count, capacity, item count, loaded-through (unix seconds),
+# source rows discovered up to loaded-through
+_HEADER = struct.Struct("<8sQIQQdQ")
+
+
+class BloomFilter:
+    """Bloom filter keyed by hex SHA-256 digests (already uniformly distributed)."""
+
+    __slots__ = ("_bits", "num_bits", "num_hashes", "capacity", "count")
+
+    def __init__(
+        self,
+        capacity: int,
+        error_rate: float = DEFAULT_ERROR_RATE,
+        *,
+        bits: bytearray | memoryview | None = None,
+        num_bits: int | None = None,
+        num_hashes: int | None = None,
+        count: int = 0,
+    ) -> None:
+        self.capacity = max(1, capacity)
+        if num_bits is None:
+            num_bits = math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.num_bits = max(8, num_bits)
+        self.num_hashes = num_hashes or max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self._bits = bits if bits is not None else bytearray((self.num_bits + 7) // 8)
+        self.count = count
+
+    def _positions(self, digest: str) -> Iterable[int]:
+        # Double hashing from two independent 64-bit slices of the digest.
+        h1 = int(digest[:16], 16)
+        h2 = int(digest[16:32], 16) | 1
+        m = self.num_bits
+        return ((h1 + i * h2) % m for i in range(self.num_hashes))
+
+    def add(self, digest: str) -> None:
+        bits = self._bits
+        new = False
+        for pos in self._positions(digest):
+            byte, mask = pos >> 3, 1 << (pos & 7)
+            if not bits[byte] & mask:
+                bits[byte] |= mask
+                new = True
+        if new:
+            self.count += 1
+
+    def __contains__(self, digest: str) -> bool:
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(digest))
+
+    @property
+    def saturated(self) -> bool:
+        return self.count > self.capacity
+
+    def to_bytes(self) -> bytes:
+        return bytes(self._bits)
+
+
+def known_filter_path(source_id: uuid.UUID) -> Path | None:
+    """Where a source's filter is persisted, or ``None`` when persistence is off."""
+    settings = get_settings()
+    if not settings.known_url_filter_persist:
+        return None
+    return Path(settings.http_cache_dir) / "known" / f"{source_id}.bloom"
+
+
+def _hash_of(raw_url: str) -> str | None:
+    return normalize_one(raw_url)[1] or None
+
+
+# Per-process filters when persistence is off, reused across runs of a source.
+_shared: dict[uuid.UUID, KnownUrlIndex] = {}
+
+
+class KnownUrlIndex:
+    """Probably-known URLs for one source; see the module docstring for guarantees."""
+
+    def __init__(
+        self,
+        hashes: Iterable[str] = (),
+        *,
+        capacity: int | None = None,
+        error_rate: float = DEFAULT_ERROR_RATE,
+        bloom: BloomFilter | None = None,
+        loaded_through: datetime | None = None,
+        rows: int = 0,
+    ) -> None:
+        hashes = list(hashes)
+        self._bloom = bloom or BloomFilter(
+            capacity or max(MIN_CAPACITY, 2 * len(hashes)), error_rate
+        )
+        for hash_value in hashes:
+            self._bloom.add(hash_value)
+        self.loaded_through = loaded_through
+        # The source's rows with discovered_at <= loaded_through when last loaded.
+        self.rows = rows
+
+    @classmethod
+    async def load(
+        cls,
+        session: AsyncSession,
+        source_id: uuid.UUID,
+        *,
+        path: Path | None = None,
+    ) -> KnownUrlIndex:
+        """From ``path`` (or this process's copy) plus newer rows, else from the table."""
+        index = cls._open(path) if path is not None else _shared.get(source_id)
+        if index is not None and not await index._top_up(session, source_id):
+            index = None
+        if index is None:
+            index = await cls._build(session, source_id)
+        if path is None:
+            _shared[source_id] = index
+        return index
+
+    @classmethod
+    async def _build(cls, session: AsyncSession, source_id: uuid.UUID) -> KnownUrlIndex:
+        result = await session.execute(
+            select(DiscoveredUrl.url_hash).where(DiscoveredUrl.source_id == source_id)
+        )
+        hashes = list(result.scalars())
+        latest = await session.scalar(
+            select(func.max(DiscoveredUrl.discovered_at)).where(
+                DiscoveredUrl.source_id == source_id
+            )
+        )
+        return cls(hashes, loaded_through=latest or datetime.now(timezone.utc), rows=len(hashes))
+
+    async def _top_up(self, session: AsyncSession, source_id: uuid.UUID) -> bool:
+        """Add rows discovered since ``loaded_through``; ``False`` if this copy is unusable."""
+        if self.loaded_through is None:
+            return False
+        covered = await session.scalar(
+            select(func.count()).where(
+                DiscoveredUrl.source_id == source_id,
+                DiscoveredUrl.discovered_at <= self.loaded_through,
+            )
+        )
+        if (covered or 0) < self.rows:
+            return False  # Rows this filter saw are gone: not the same database.
+        since = self.loaded_through - RELOAD_OVERLAP
+        result = await session.execute(
+            select(DiscoveredUrl.url_hash, DiscoveredUrl.discovered_at).where(
+                DiscoveredUrl.source_id == source_id,
+                DiscoveredUrl.discovered_at >= since,
+            )
+        )
+        previous = self.loaded_through
+        rows = covered or 0
+        for hash_value, discovered_at in result.all():
+            self.add_hash(hash_value)
+            if discovered_at > previous:
+                rows += 1
+            self._advance(discovered_at)
+        self.rows = rows
+        return not self._bloom.saturated
+
+    @classmethod
+    def _open(cls, path: Path) -> KnownUrlIndex | None:
+        try:
+            with path.open("rb") as fh:
+                mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_COPY)
+        except (OSError, ValueError):
+            return None
+        if len(mapped) < _HEADER.size:
+            return None
+        magic, num_bits, num_hashes, capacity, count, loaded_at, rows = _HEADER.unpack_from(
+            mapped
+        )
+        if magic != _MAGIC or len(mapped) != _HEADER.size + (num_bits + 7) // 8:
+            return None
+        # Private copy-on-write view of the bit array; the header is skipped.
+        bits = memoryview(mapped)[_HEADER.size :]
+        bloom = BloomFilter(
+            capacity, bits=bits, num_bits=num_bits, num_hashes=num_hashes, count=count
+        )
+        return cls(
+            bloom=bloom,
+            loaded_through=datetime.fromtimestamp(loaded_at, timezone.utc),
+            rows=rows,
+        )
+
+    def save(self, path: Path) -> None:
+        """Atomically write the filter for the next worker start (best-effort)."""
+        loaded_through = (self.loaded_through or datetime.now(timezone.utc)).timestamp()
+        bloom = self._bloom
+        header = _HEADER.pack(
+            _MAGIC,
+            bloom.num_bits,
+            bloom.num_hashes,
+            bloom.capacity,
+            bloom.count,
+            loaded_through,
+            self.rows,
+        )
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_bytes(header + bloom.to_bytes())
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+    def _advance(self, discovered_at: datetime | None) -> None:
+        if discovered_at is not None and (
+            self.loaded_through is None or discovered_at > self.loaded_through
+        ):
+            self.loaded_through = discovered_at
+
+    def __contains__(self, raw_url: object) -> bool:
+        if not isinstance(raw_url, str):
+            return False
+        hash_value = _hash_of(raw_url)
+        return hash_value is not None and hash_value in self._bloom
+
+    def __len__(self) -> int:
+        return self._bloom.count
+
+    def contains_hash(self, hash_value: str) -> bool:
+        return hash_value in self._bloom
+
+    def add(self, raw_url: str) -> None:
+        if hash_value := _hash_of(raw_url):
+            self._bloom.add(hash_value)
+
+    def add_hash(self, hash_value: str) -> None:
+        self._bloom.add(hash_value)
+
+    async def confirm(
+        self,
+        session: AsyncSession,
+        hashes: Iterable[str],
+        *,
+        found_by: str | None = None,
+    ) -> set[str]:
+        """The subset of (filter-positive) ``hashes`` really present in ``discovered_urls``.
+
+        With ``found_by``, only rows whose ``found_by`` already lists that adapter.
+        """
+        hashes = list(dict.fromkeys(hashes))
+        confirmed: set[str] = set()
+        for i in range(0, len(hashes), CONFIRM_CHUNK):
+            chunk = hashes[i : i + CONFIRM_CHUNK]
+            stmt = select(DiscoveredUrl.url_hash).where(DiscoveredUrl.url_hash.in_(chunk))
+            if found_by is not None:
+                stmt = stmt.where(DiscoveredUrl.link_metadata["found_by"].contains([found_by]))
+            result = await session.execute(stmt)
+            confirmed.update(result.scalars())
+        return confirmed
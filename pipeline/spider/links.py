@@ -3,22 +3,116 @@
 from __future__ import annotations
 
 import re
-from urllib.parse import urljoin, urlparse
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from functools import lru_cache
+from urllib.parse import urljoin, urlparse, urlsplit
 
-from selectolax.parser import HTMLParser
+from selectolax.parser import HTMLParser, Node
 
 # "/nbe_news/{slug}/" -> regex matching path
 _SLUG_PLACEHOLDER = re.compile(r"\{[a-z_]+\}")
 
+# Selector keys whose patterns decide which discovered URLs are kept.
+PATTERN_SELECTORS = ("article_url_pattern", "directive_url_pattern")
+# Path fragments matched anywhere in the path (e.g. "/media/filer_public/"). Only
+# listing pages link documents this way; sitemaps and the WP API list pages.
+CONTAINS_SELECTORS = ("pdf_path_pattern",)
 
-def pattern_to_regex(url_pattern: str) -> re.Pattern[str] | None:
-    if not url_pattern:
-        return None
+
+def _pattern_body(url_pattern: str) -> str:
     path = url_pattern if url_pattern.startswith("/") else urlparse(url_pattern).path
     # Replace {slug} placeholders before re.escape (escape would lock braces literally).
     path_with_slots = _SLUG_PLACEHOLDER.sub("__SLUG__", path)
-    regex_body = re.escape(path_with_slots).replace("__SLUG__", r"[^/]+")
-    return re.compile(regex_body + r"/?$", re.IGNORECASE)
+    return re.escape(path_with_slots).replace("__SLUG__", r"[^/]+") + r"/?$"
+
+
+def pattern_to_regex(url_pattern: str) -> re.Pattern[str] | None:
+    if not url_pattern:
+        return None
+    return re.compile(_pattern_body(url_pattern), re.IGNORECASE)
+
+
+def url_path(url: str) -> str:
+    """``urlparse(url).path`` for plain absolute URLs, without building a ParseResult.
+
+    Anything unusual (no ``://``, ``;params``, whitespace/control characters) goes
+    through ``urlparse`` so the result is always identical.
+    """
+    start = url.find("://")
+    scheme = url[:start]
+    if start < 1 or not (scheme.isascii() and scheme.isalpha()):
+        return urlparse(url).path
+    if "\t" in url or "\n" in url or "\r" in url:
+        return urlparse(url).path
+    netloc_end = len(url)
+    for sep in "/?#":
+        pos = url.find(sep, start + 3)
+        if 0 <= pos < netloc_end:
+            netloc_end = pos
+    if netloc_end == len(url) or url[netloc_end] != "/":
+        return urlparse(url).path
+    path_end = len(url)
+    for sep in "?#":
+        pos = url.find(sep, netloc_end)
+        if 0 <= pos < path_end:
+            path_end = pos
+    path = url[netloc_end:path_end]
+    if ";" in path or "[" in url[start:netloc_end]:
+        return urlparse(url).path
+    return path
+
+
+class UrlPatternSet:
+    """Path patterns compiled into one case-insensitive alternation.
+
+    An empty set accepts every URL. Build through ``compile_patterns`` or
+    ``UrlPatternSet.from_selectors`` so identical pattern lists share one object.
+    """
+
+    __slots__ = ("patterns", "contains", "_search")
+
+    def __init__(self, patterns: Iterable[str] = (), contains: Iterable[str] = ()) -> None:
+        self.patterns = tuple(dict.fromkeys(p for p in patterns if p))
+        self.contains = tuple(dict.fromkeys(c for c in contains if c))
+        bodies = [_pattern_body(p) for p in self.patterns]
+        bodies.extend(re.escape(c) for c in self.contains)
+        self._search = (
+            re.compile("|".join(f"(?:{b})" for b in bodies), re.IGNORECASE).search
+            if bodies
+            else None
+        )
+
+    @classmethod
+    def from_selectors(
+        cls,
+        selectors: dict,
+        keys: tuple[str, ...] = PATTERN_SELECTORS,
+        contains_keys: tuple[str, ...] = (),
+    ) -> UrlPatternSet:
+        return compile_patterns(
+            tuple(selectors.get(k) or "" for k in keys),
+            tuple(selectors.get(k) or "" for k in contains_keys),
+        )
+
+    def __bool__(self) -> bool:
+        return self._search is not None
+
+    def matches(self, url: str) -> bool:
+        if self._search is None:
+            return True
+        return self._search(url_path(url)) is not None
+
+    def filter(self, urls: Iterable[str]) -> list[str]:
+        if self._search is None:
+            return list(urls)
+        search = self._search
+        return [url for url in urls if search(url_path(url)) is not None]
+
+
+@lru_cache(maxsize=256)
+def compile_patterns(patterns: tuple[str, ...], contains: tuple[str, ...] = ()) -> UrlPatternSet:
+    return UrlPatternSet(patterns, contains)
 
 
 def is_same_site(url: str, allowed_hosts: set[str]) -> bool:
@@ -26,42 +120,133 @@ def is_same_site(url: str, allowed_hosts: set[str]) -> bool:
     return host in allowed_hosts
 
 
-def extract_links(html: str, base_url: str, allowed_hosts: set[str] | None = None) -> list[str]:
+_SKIP_HREF_PREFIXES = ("#", "mailto:", "tel:", "javascript:")
+_UNSAFE_URL_CHARS = ("\t", "\r", "\n")
+_DATE_TEXT = re.compile(
+    r"\b(\d{4}-\d{2}-\d{2}"
+    r"|\d{1,2}[/.]\d{1,2}[/.]\d{4}"
+    r"|\d{1,2}\s+[A-Z][a-z]{2,8}\.?,?\s+\d{4}"
+    r"|[A-Z][a-z]{2,8}\.?\s+\d{1,2},?\s+\d{4})\b"
+)
+# Ancestors searched for a date near a link, and the most text they may hold.
+_DATE_SEARCH_DEPTH = 3
+_DATE_SEARCH_MAX_CHARS = 500
+
+
+@dataclass(slots=True)
+class LinkRecord:
+    url: str
+    text: str = ""
+    date_text: str | None = None
+
+    def metadata(self) -> dict[str, str]:
+        """Non-empty fields for ``DiscoveredUrl.link_metadata``."""
+        meta = {"anchor_text": self.text, "date_text": self.date_text}
+        return {key: value for key, value in meta.items() if value}
+
+
+def _iter_links(
+    html: str, base_url: str, allowed_hosts: set[str] | None
+) -> Iterator[tuple[str, Node]]:
+    """``(absolute_url, anchor)`` for each distinct same-site http(s) link, in page order.
+
+    Output matches ``urljoin`` + ``urlparse`` per anchor, with less work: repeated
+    hrefs are dropped before resolving, plain root-relative hrefs are joined onto
+    the pre-split base origin, and the host check reuses the single split. Hrefs
+    with an empty query or fragment (``/x?``, ``/x#``, ``/x?#f``), which
+    ``urljoin`` normalises away, take the ``urljoin`` path.
+    """
+    base = urlsplit(base_url)
+    base_host = base.netloc.lower().removeprefix("www.")
     if allowed_hosts is None:
-        base_host = urlparse(base_url).netloc.lower().removeprefix("www.")
         allowed_hosts = {base_host}
+    origin = f"{base.scheme}://{base.netloc}"
+    base_allowed = base.scheme in ("http", "https") and base_host in allowed_hosts
 
-    parser = HTMLParser(html)
-    found: list[str] = []
+    seen_hrefs: set[str] = set()
     seen: set[str] = set()
-
-    for node in parser.css("a[href]"):
+    for node in HTMLParser(html).css("a[href]"):
         href = (node.attributes.get("href") or "").strip()
-        if not href or href.startswith(("#", "mailto:", "tel:", "javascript:")):
-            continue
-        absolute = urljoin(base_url, href)
-        parsed = urlparse(absolute)
-        if parsed.scheme not in ("http", "https"):
-            continue
-        if not is_same_site(absolute, allowed_hosts):
+        if not href or href in seen_hrefs or href.startswith(_SKIP_HREF_PREFIXES):
             continue
+        seen_hrefs.add(href)
+
+        if (
+            href[0] == "/"
+            and not href.startswith("//")
+            and "/." not in href
+            and not any(c in href for c in _UNSAFE_URL_CHARS)
+            and not href.endswith(("?", "#"))
+            and "?#" not in href
+        ):
+            # Root-relative without dot segments: urljoin would give origin + href.
+            if not base_allowed:
+                continue
+            absolute = origin + href
+        else:
+            absolute = urljoin(base_url, href)
+            parts = urlsplit(absolute)
+            if parts.scheme not in ("http", "https"):
+                continue
+            if parts.netloc.lower().removeprefix("www.") not in allowed_hosts:
+                continue
+
         if absolute in seen:
             continue
         seen.add(absolute)
-        found.append(absolute)
+        yield absolute, node
+
 
-    return found
+def extract_links(html: str, base_url: str, allowed_hosts: set[str] | None = None) -> list[str]:
+    return [absolute for absolute, _ in _iter_links(html, base_url, allowed_hosts)]
+
+
+def _nearby_date(node: Node, texts: dict[int, str]) -> str | None:
+    """Date in the closest small ancestor of ``node``; ``texts`` caches ancestor text.
+
+    An ancestor holding more than ``_DATE_SEARCH_MAX_CHARS`` of text is a list
+    of items rather than this link's item, so the search stops before looking
+    inside it and never picks up a sibling's date.
+    """
+    current: Node | None = node
+    for _ in range(_DATE_SEARCH_DEPTH + 1):
+        if current is None:
+            return None
+        text = texts.get(current.mem_id)
+        if text is None:
+            text = texts[current.mem_id] = current.text(separator=" ", strip=True)
+        if len(text) > _DATE_SEARCH_MAX_CHARS:
+            return None
+        time_node = current.css_first("time")
+        if time_node is not None:
+            return time_node.attributes.get("datetime") or time_node.text(strip=True) or None
+        if match := _DATE_TEXT.search(text):
+            return match.group(1)
+        current = current.parent
+    return None
+
+
+def extract_link_records(
+    html: str,
+    base_url: str,
+    allowed_hosts: set[str] | None = None,
+    *,
+    with_dates: bool = True,
+) -> list[LinkRecord]:
+    """Like ``extract_links``, plus anchor text and the nearest date-looking text."""
+    records: list[LinkRecord] = []
+    # Links in one list item share ancestors: their text is read once per page.
+    texts: dict[int, str] = {}
+    for absolute, node in _iter_links(html, base_url, allowed_hosts):
+        text = " ".join(node.text(separator=" ", strip=True).split())
+        records.append(
+            LinkRecord(absolute, text, _nearby_date(node, texts) if with_dates else None)
+        )
+    return records
 
 
 def filter_by_patterns(urls: list[str], patterns: list[str]) -> list[str]:
-    regexes = [pattern_to_regex(p) for p in patterns if p]
-    regexes = [r for r in regexes if r is not None]
-    if not regexes:
+    pattern_set = compile_patterns(tuple(p for p in patterns if p))
+    if not pattern_set:
         return urls
-
-    filtered: list[str] = []
-    for url in urls:
-        path = urlparse(url).path
-        if any(rx.search(path) for rx in regexes):
-            filtered.append(url)
-    return filtered
+    return pattern_set.filter(urls)
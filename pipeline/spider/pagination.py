@@ -0,0 +1,144 @@
+"""Paginated listing crawl that stops once a page has nothing new."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
+
+from selectolax.parser import HTMLParser
+
+from pipeline.spider.context import SpiderContext
+from pipeline.spider.http import SpiderHttp
+from pipeline.spider.known import KnownUrlIndex
+from pipeline.spider.robots import RobotsChecker
+
+DEFAULT_MAX_PAGES = 10
+BACKFILL_MAX_PAGES = 200
+
+_NEXT_SELECTORS = ("link[rel~=next]", "a[rel~=next]", "a.next", ".next a", ".pagination-next a")
+_NEXT_TEXT = frozenset({"next", "next »", "next ›", "»", "›", "older posts", "older entries"})
+
+# (html, page_url) -> candidate item links on that page
+LinkExtractor = Callable[[str, str], list[str]]
+
+
+def _with_page(url: str, page_param: str, page: int) -> str:
+    parsed = urlparse(url)
+    params = [(k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True) if k != page_param]
+    params.append((page_param, str(page)))
+    return urlunparse(parsed._replace(query=urlencode(params)))
+
+
+def next_page_url(html: str, page_url: str, page: int, page_param: str | None = None) -> str | None:
+    """Next listing page: ``rel=next`` / "next" links first, then ``?{page_param}=N+1``."""
+    tree = HTMLParser(html)
+    for selector in _NEXT_SELECTORS:
+        node = tree.css_first(selector)
+        if node is not None and (href := (node.attributes.get("href") or "").strip()):
+            return urljoin(page_url, href)
+    for node in tree.css("a[href]"):
+        if node.text(strip=True).lower() in _NEXT_TEXT:
+            return urljoin(page_url, (node.attributes.get("href") or "").strip())
+    if page_param:
+        return _with_page(page_url, page_param, page + 1)
+    return None
+
+
+class ListingPaginator:
+    """Walks listing pages until one yields only known URLs.
+
+    Known means already in ``known`` (the source's discovered URLs) or seen on an
+    earlier page of this walk. ``backfill`` ignores that stop rule, skips
+    conditional GETs and allows up to ``BACKFILL_MAX_PAGES`` pages.
+    """
+
+    def __init__(
+        self,
+        http: SpiderHttp,
+        robots: RobotsChecker,
+        extract: LinkExtractor,
+        *,
+        known: KnownUrlIndex | None = None,
+        max_pages: int | None = None,
+        page_param: str | None = None,
+        backfill: bool = False,
+    ) -> None:
+        self._http = http
+        self._robots = robots
+        self._extract = extract
+        self._known = known
+        self._backfill = backfill
+        self._max_pages = max_pages or (BACKFILL_MAX_PAGES if backfill else DEFAULT_MAX_PAGES)
+        self._page_param = page_param
+        self.pages_fetched = 0
+
+    @classmethod
+    def for_source(
+        cls,
+        http: SpiderHttp,
+        robots: RobotsChecker,
+        extract: LinkExtractor,
+        selectors: dict,
+        context: SpiderContext | None,
+    ) -> ListingPaginator:
+        """Paginator configured from ``page_param`` / ``max_listing_pages`` selectors."""
+        max_pages = selectors.get("max_listing_pages")
+        return cls(
+            http,
+            robots,
+            extract,
+            known=context.known if context is not None else None,
+            max_pages=int(max_pages) if max_pages else None,
+            page_param=selectors.get("page_param"),
+            backfill=context.backfill if context is not None else False,
+        )
+
+    async def crawl(self, first_url: str, *, first_html: str | None = None) -> list[str]:
+        """Links from ``first_url`` onward; pass ``first_html`` if page 1 is already fetched."""
+        found: dict[str, None] = {}
+        visited = {first_url}
+        extracted: list[str] = []
+        url, html, page = first_url, first_html, 1
+
+        while True:
+            if html is None:
+                html = await self._fetch(url)
+                if html is None:
+                    break
+            links = self._extract(html, url)
+            extracted.append(url)
+            new = [
+                link
+                for link in links
+                if link not in found and (self._known is None or link not in self._known)
+            ]
+            found.update(dict.fromkeys(links))
+            if not links or (not new and not self._backfill) or page >= self._max_pages:
+                break
+
+            next_url = next_page_url(html, url, page, self._page_param)
+            if next_url is None or next_url in visited:
+                break
+            visited.add(next_url)
+            url, html, page = next_url, None, page + 1
+
+        # Only a walk that returns its links keeps the pages' validators.
+        for page_url in extracted:
+            self._http.confirm(page_url)
+        return list(found)
+
+    async def _fetch(self, url: str) -> str | None:
+        """Page HTML, or ``None`` when blocked, failed or unchanged since the last run."""
+        if not await self._robots.can_fetch(url):
+            return None
+        try:
+            if self._backfill:
+                response = await self._http.get(url)
+            else:
+                response = await self._http.get_if_changed(url)
+        except Exception:
+            return None
+        if response is None:
+            return None
+        self.pages_fetched += 1
+        return response.text
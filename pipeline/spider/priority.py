@@ -0,0 +1,109 @@
+"""Discovery-time crawl priority for ``DiscoveredUrl.priority`` (higher is crawled first)."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any
+from urllib.parse import urlparse
+
+# Adapters that surface what a site just published, as opposed to full inventories.
+FRESH_ADAPTERS = frozenset({"rss", "listing", "wordpress", "firma"})
+PRIORITY_CATEGORIES = {"legal": 15, "finance": 10, "government": 5}
+# Metadata keys adapters use for a page's own date, most specific first.
+_DATE_KEYS = ("modified", "lastmod", "published")
+
+
+@dataclass(frozen=True, slots=True)
+class UrlSignals:
+    """What is known about a URL when it is discovered."""
+
+    raw_url: str
+    directive: dict[str, Any] | None = None
+    link_metadata: dict[str, Any] = field(default_factory=dict)
+    category: str | None = None
+    now: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+    @property
+    def found_by(self) -> frozenset[str]:
+        return frozenset(self.link_metadata.get("found_by") or ())
+
+    @property
+    def depth(self) -> int:
+        return len([part for part in urlparse(self.raw_url).path.split("/") if part])
+
+    @property
+    def page_date(self) -> datetime | None:
+        for key in _DATE_KEYS:
+            if parsed := parse_page_date(self.link_metadata.get(key)):
+                return parsed
+        return None
+
+
+PriorityScorer = Callable[[UrlSignals], int]
+
+
+def parse_page_date(value: Any) -> datetime | None:
+    """ISO 8601 (sitemap, WordPress) or RFC 822 (RSS) date as an aware UTC datetime."""
+    if not isinstance(value, str) or not value.strip():
+        return None
+    value = value.strip()
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            parsed = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def default_priority(signals: UrlSignals) -> int:
+    """Directives first, then fresh pages from feeds and listings, backfill last."""
+    score = 0
+    if directive := signals.directive:
+        score += 100
+        if directive.get("directive_year", 0) >= signals.now.year - 1:
+            score += 50
+
+    if (page_date := signals.page_date) is not None:
+        age_days = (signals.now - page_date).days
+        if age_days <= 2:
+            score += 40
+        elif age_days <= 14:
+            score += 20
+        elif age_days <= 90:
+            score += 5
+        elif age_days > 365:
+            score -= 20
+
+    if signals.found_by & FRESH_ADAPTERS:
+        score += 20
+    score += PRIORITY_CATEGORIES.get(signals.category or "", 0)
+    # Deep paths are usually archives or attachments rather than new items.
+    score -= 5 * max(0, signals.depth - 4)
+    return score
+
+
+def flat_priority(_signals: UrlSignals) -> int:
+    return 0
+
+
+PRIORITY_SCORERS: dict[str, PriorityScorer] = {
+    "default": default_priority,
+    "flat": flat_priority,
+}
+
+
+def scorer_for(selectors: dict) -> PriorityScorer:
+    """Scorer named by the ``priority_scorer`` selector (``default`` if unset or unknown)."""
+    return PRIORITY_SCORERS.get(selectors.get("priority_scorer", "default"), default_priority)
+
+
+def adapter_kind(adapter_name: str) -> str:
+    """``"RSSAdapter"`` -> ``"rss"``; the label stored in ``found_by``."""
+    return adapter_name.removesuffix("Adapter").lower()
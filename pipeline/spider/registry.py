@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from pipeline.db.models.sources import Source
+from pipeline.source_config import SourceConfig
 from pipeline.spider.adapters.base import SpiderAdapter
 from pipeline.spider.adapters.firma import FIRMAAdapter
 from pipeline.spider.adapters.liferay import LiferayAdapter
@@ -8,6 +8,7 @@ from pipeline.spider.adapters.listing import ListingAdapter
 from pipeline.spider.adapters.rss import RSSAdapter
 from pipeline.spider.adapters.sitemap import SitemapAdapter
 from pipeline.spider.adapters.wordpress import WordPressAdapter
+from pipeline.spider.context import SpiderContext
 from pipeline.spider.http import SpiderHttp
 from pipeline.spider.robots import RobotsChecker
 
@@ -19,7 +20,11 @@ CMS_PRIMARY = {
 }
 
 
-def build_adapters(source: Source, http: SpiderHttp) -> list[SpiderAdapter]:
+def build_adapters(
+    source: SourceConfig,
+    http: SpiderHttp,
+    context: SpiderContext | None = None,
+) -> list[SpiderAdapter]:
     """Primary CMS adapter + sitemap + optional RSS."""
     selectors = source.selectors or {}
     robots = RobotsChecker(source.url, http)
@@ -28,11 +33,11 @@ def build_adapters(source: Source, http: SpiderHttp) -> list[SpiderAdapter]:
     cms = selectors.get("cms")
     primary_cls = CMS_PRIMARY.get(cms or "")
     if primary_cls:
-        adapters.append(primary_cls(http, robots))
+        adapters.append(primary_cls(http, robots, context))
 
-    adapters.append(SitemapAdapter(http, robots))
+    adapters.append(SitemapAdapter(http, robots, context))
 
     if selectors.get("rss_url") or selectors.get("use_rss", False):
-        adapters.append(RSSAdapter(http, robots))
+        adapters.append(RSSAdapter(http, robots, context))
 
     return adapters
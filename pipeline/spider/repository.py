@@ -3,14 +3,35 @@ from __future__ import annotations
 import uuid
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from typing import Any
 from urllib.parse import urlparse
 
+from sqlalchemy import func, literal_column, text
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from pipeline.db.models.urls import DiscoveredUrl
+from pipeline.spider.known import KnownUrlIndex
+from pipeline.spider.priority import PriorityScorer, UrlSignals
 from pipeline.utils.directive_meta import extract_directive_meta
-from pipeline.utils.url_normalizer import normalize_url, url_hash
+from pipeline.utils.url_normalizer import normalize_batch_async
+
+# Rows per multi-row INSERT; 7 bind params each stays well under asyncpg's 32767.
+INSERT_CHUNK_ROWS = 1000
+
+_UNSET: Any = object()
+
+# On conflict, a row found by another adapter gains this one in ``found_by`` and
+# keeps the higher of the two priorities; rows already listing it are left alone.
+_MERGE_FOUND_BY = text(
+    "jsonb_set(coalesce(discovered_urls.link_metadata, '{}'::jsonb), '{found_by}', "
+    "coalesce(discovered_urls.link_metadata->'found_by', '[]'::jsonb) "
+    "|| (excluded.link_metadata->'found_by'))"
+)
+_NOT_YET_FOUND_BY = text(
+    "NOT coalesce(discovered_urls.link_metadata->'found_by', '[]'::jsonb) "
+    "@> (excluded.link_metadata->'found_by')"
+)
 
 
 @dataclass
@@ -20,11 +41,17 @@ class InsertStats:
     skipped: int
 
 
-def build_link_metadata(raw_url: str) -> dict:
+def build_link_metadata(
+    raw_url: str, extra: dict | None = None, *, directive: dict | None = _UNSET
+) -> dict:
+    """Pass ``directive`` (even ``None``) when already known to skip re-parsing the URL."""
     meta: dict = {"raw_url": raw_url}
-    directive = extract_directive_meta(urlparse(raw_url).path)
+    if directive is _UNSET:
+        directive = extract_directive_meta(urlparse(raw_url).path)
     if directive:
         meta.update(directive)
+    if extra:
+        meta.update(extra)
     return meta
 
 
@@ -34,45 +61,94 @@ async def insert_discovered_urls(
     raw_urls: list[str],
     *,
     priority: int = 0,
+    link_metadata: dict[str, dict] | None = None,
+    known: KnownUrlIndex | None = None,
+    scorer: PriorityScorer | None = None,
+    category: str | None = None,
+    found_by: str | None = None,
 ) -> InsertStats:
-    seen_hashes: set[str] = set()
-    inserted = 0
-    skipped = 0
-    now = datetime.now(timezone.utc)
+    """Insert new URLs; ``link_metadata`` maps raw URLs to adapter-supplied metadata.
 
-    for raw_url in raw_urls:
-        if not raw_url or not raw_url.startswith("http"):
-            skipped += 1
-            continue
+    With ``known``, URLs the filter has never seen go straight to INSERT, and
+    filter hits are confirmed with one bulk lookup so only real duplicates are
+    skipped without an INSERT. The rest is written as multi-row
+    ``INSERT ... ON CONFLICT DO NOTHING RETURNING`` statements of up to
+    ``INSERT_CHUNK_ROWS`` rows, one round trip per chunk. Inserted hashes are
+    added to ``known``.
 
-        normalized = normalize_url(raw_url)
-        if not normalized:
-            skipped += 1
-            continue
+    ``scorer`` computes each new row's priority from its directive metadata,
+    adapter metadata and the source ``category``; without it every row gets
+    ``priority``.
+
+    ``found_by`` labels the adapter that found ``raw_urls``. Existing rows are
+    then only skipped if that adapter already found them: others are upserted,
+    adding the label to ``found_by`` and raising ``priority`` to the new score
+    when it is higher. Such rows count as skipped, not inserted.
+    """
+    link_metadata = link_metadata or {}
+    candidates: dict[str, tuple[str, str, dict | None]] = {}
+    http_urls = [raw_url for raw_url in raw_urls if raw_url and raw_url.startswith("http")]
+    skipped = len(raw_urls) - len(http_urls)
 
-        hash_value = url_hash(normalized)
-        if hash_value in seen_hashes:
+    for raw_url, (normalized, hash_value, directive) in zip(
+        http_urls, await normalize_batch_async(http_urls)
+    ):
+        if not normalized or hash_value in candidates:
             skipped += 1
             continue
-        seen_hashes.add(hash_value)
-
-        stmt = (
-            pg_insert(DiscoveredUrl)
-            .values(
-                source_id=source_id,
-                normalized_url=normalized,
-                url_hash=hash_value,
-                priority=priority,
-                link_metadata=build_link_metadata(raw_url),
-                discovered_at=now,
-            )
-            .on_conflict_do_nothing(index_elements=["url_hash"])
-            .returning(DiscoveredUrl.id)
+        candidates[hash_value] = (raw_url, normalized, directive)
+
+    if known is not None:
+        maybe_known = [h for h in candidates if known.contains_hash(h)]
+        if maybe_known:
+            for hash_value in await known.confirm(session, maybe_known, found_by=found_by):
+                del candidates[hash_value]
+                skipped += 1
+
+    inserted = 0
+    now = datetime.now(timezone.utc)
+    rows = []
+    for hash_value, (raw_url, normalized, directive) in candidates.items():
+        extra = link_metadata.get(raw_url)
+        if found_by is not None:
+            extra = {**(extra or {}), "found_by": [found_by]}
+        if scorer is not None:
+            signals = UrlSignals(raw_url, directive, extra or {}, category, now)
+            row_priority = scorer(signals)
+        else:
+            row_priority = priority
+        rows.append(
+            {
+                "source_id": source_id,
+                "normalized_url": normalized,
+                "url_hash": hash_value,
+                "priority": row_priority,
+                "link_metadata": build_link_metadata(raw_url, extra, directive=directive),
+                "discovered_at": now,
+            }
         )
-        result = await session.execute(stmt)
-        if result.fetchone():
-            inserted += 1
+    for i in range(0, len(rows), INSERT_CHUNK_ROWS):
+        chunk = rows[i : i + INSERT_CHUNK_ROWS]
+        stmt = pg_insert(DiscoveredUrl).values(chunk)
+        if found_by is None:
+            stmt = stmt.on_conflict_do_nothing(index_elements=["url_hash"])
         else:
-            skipped += 1
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["url_hash"],
+                set_={
+                    "priority": func.greatest(DiscoveredUrl.priority, stmt.excluded.priority),
+                    "link_metadata": _MERGE_FOUND_BY,
+                },
+                where=_NOT_YET_FOUND_BY,
+            )
+        # xmax is 0 only for freshly inserted rows, not for upserted ones.
+        stmt = stmt.returning(DiscoveredUrl.url_hash, literal_column("xmax = 0"))
+        result = await session.execute(stmt)
+        chunk_inserted = sum(1 for _, fresh in result.all() if fresh)
+        inserted += chunk_inserted
+        skipped += len(chunk) - chunk_inserted
+        if known is not None:
+            for row in chunk:
+                known.add_hash(row["url_hash"])
 
     return InsertStats(discovered=len(raw_urls), inserted=inserted, skipped=skipped)
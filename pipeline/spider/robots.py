@@ -2,36 +2,26 @@
 
 from __future__ import annotations
 
-from urllib.parse import urljoin, urlparse
-from urllib.robotparser import RobotFileParser
+from collections.abc import Iterable
 
-from pipeline.spider.http import SpiderHttp, USER_AGENT
+from pipeline.http.robots import RobotsCache, get_robots_cache
+from pipeline.spider.http import SpiderHttp
 
 
 class RobotsChecker:
-    def __init__(self, base_url: str, http: SpiderHttp) -> None:
+    """Spider view of the shared robots cache.
+
+    robots.txt is fetched outside the rate limiter, so checking it never costs
+    a crawl delay.
+    """
+
+    def __init__(self, base_url: str, http: SpiderHttp, cache: RobotsCache | None = None) -> None:
         self._base_url = base_url.rstrip("/")
         self._http = http
-        self._parsers: dict[str, RobotFileParser | None] = {}
-
-    async def _parser_for(self, url: str) -> RobotFileParser | None:
-        parsed = urlparse(url)
-        origin = f"{parsed.scheme}://{parsed.netloc}"
-        if origin in self._parsers:
-            return self._parsers[origin]
-
-        robots_url = urljoin(origin + "/", "robots.txt")
-        parser = RobotFileParser()
-        try:
-            response = await self._http.get(robots_url)
-            parser.parse(response.text.splitlines())
-            self._parsers[origin] = parser
-        except Exception:
-            self._parsers[origin] = None
-        return self._parsers[origin]
+        self._cache = cache or get_robots_cache()
 
     async def can_fetch(self, url: str) -> bool:
-        parser = await self._parser_for(url)
-        if parser is None:
-            return True
-        return parser.can_fetch(USER_AGENT, url)
+        return await self._cache.can_fetch(url, verify_ssl=self._http.verify_ssl)
+
+    async def filter_allowed(self, urls: Iterable[str]) -> list[str]:
+        return await self._cache.filter_allowed(urls, verify_ssl=self._http.verify_ssl)
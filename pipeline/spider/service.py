@@ -1,15 +1,34 @@
 from __future__ import annotations
 
+import asyncio
+import copy
+import hashlib
+import json
+import time
 import uuid
-from dataclasses import dataclass
+from collections.abc import AsyncIterator, Awaitable, Callable, Mapping
+from contextlib import AbstractAsyncContextManager
+from dataclasses import dataclass, field
+from typing import Any
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from pipeline.db.models.sources import Source
+from pipeline.db.session import get_session
+from pipeline.http.body import DEFAULT_MAX_BODY_BYTES
+from pipeline.http.retry import RetryPolicy
+from pipeline.http.validators import ValidatorStore
+from pipeline.source_config import SourceConfig, get_source_configs
+from pipeline.spider.adapters.base import SpiderAdapter
+from pipeline.spider.context import SpiderContext
 from pipeline.spider.http import SpiderHttp
+from pipeline.spider.known import KnownUrlIndex, known_filter_path
+from pipeline.spider.priority import PriorityScorer, adapter_kind, scorer_for
 from pipeline.spider.registry import build_adapters
-from pipeline.spider.repository import InsertStats, insert_discovered_urls
+from pipeline.spider.repository import insert_discovered_urls
+from pipeline.spider.state import SpiderState, load_spider_state, save_spider_state
+from pipeline.spider.streaming import current_adapter
 
 
 @dataclass
@@ -19,61 +38,340 @@ class SpiderRunResult:
     inserted: int
     skipped: int
     adapter_counts: dict[str, int]
+    retries: int = 0
+    retry_wait_s: float = 0.0
+    adapter_timings: dict[str, float] = field(default_factory=dict)
+    adapter_errors: dict[str, str] = field(default_factory=dict)
+    duration_s: float = 0.0
+    error: str | None = None
+
+
+@dataclass
+class AdapterOutcome:
+    name: str
+    duration_s: float = 0.0
+    error: str | None = None
+    # URLs the adapter handed on, batch by batch
+    url_count: int = 0
+
+
+# Batches buffered between adapters and the writer before adapters wait.
+STREAM_QUEUE_BATCHES = 16
+DEADLINE_ERROR = "deadline exceeded"
+
+# (adapter name, URL batch) -> None; called for one batch at a time
+BatchHandler = Callable[[str, list[str]], Awaitable[None]]
+
+
+async def _stream_adapter(
+    adapter: SpiderAdapter,
+    source: SourceConfig,
+    outcome: AdapterOutcome,
+    queue: asyncio.Queue[tuple[str, list[str]]],
+) -> None:
+    started = time.monotonic()
+    # Runs in its own task, so this only labels work done on this adapter's behalf.
+    current_adapter.set(outcome.name)
+    try:
+        async for batch in adapter.iter_url_batches(source):
+            outcome.url_count += len(batch)
+            await queue.put((outcome.name, batch))
+    except Exception as exc:
+        outcome.error = f"{type(exc).__name__}: {exc}"
+    finally:
+        outcome.duration_s = time.monotonic() - started
+
+
+async def stream_adapters(
+    adapters: list[SpiderAdapter],
+    source: SourceConfig,
+    handle: BatchHandler,
+    *,
+    deadline_s: float | None = None,
+) -> tuple[list[AdapterOutcome], bool]:
+    """Run adapters concurrently, passing URL batches to ``handle`` as they arrive.
+
+    ``handle`` runs in the calling task, one batch at a time, so it can use the
+    caller's session. Once ``deadline_s`` passes, adapters still running are
+    cancelled (their outcome error says so), batches already queued are still
+    handled, and the second return value is ``True``.
+    """
+    queue: asyncio.Queue[tuple[str, list[str]]] = asyncio.Queue(maxsize=STREAM_QUEUE_BATCHES)
+    outcomes = [AdapterOutcome(adapter.__class__.__name__) for adapter in adapters]
+    producers = [
+        asyncio.ensure_future(_stream_adapter(adapter, source, outcome, queue))
+        for adapter, outcome in zip(adapters, outcomes)
+    ]
+    finished = asyncio.ensure_future(asyncio.gather(*producers))
+    deadline = None if deadline_s is None else time.monotonic() + deadline_s
+    timed_out = False
+    try:
+        while True:
+            getter = asyncio.ensure_future(queue.get())
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            done, _ = await asyncio.wait(
+                {getter, finished}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            if getter in done:
+                await handle(*getter.result())
+                continue
+            getter.cancel()
+            timed_out = finished not in done
+            break
+    finally:
+        for outcome, producer in zip(outcomes, producers):
+            if not producer.done():
+                producer.cancel()
+                outcome.error = outcome.error or DEADLINE_ERROR
+        await asyncio.gather(finished, return_exceptions=True)
+
+    while not queue.empty():
+        await handle(*queue.get_nowait())
+    return outcomes, timed_out
+
+
+class _BatchWriter:
+    """Inserts streamed URL batches, committing each in its own short transaction."""
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        source: SourceConfig,
+        context: SpiderContext,
+        known: KnownUrlIndex,
+        scorer: PriorityScorer,
+    ) -> None:
+        self._session = session
+        self._source = source
+        self._context = context
+        self._known = known
+        self._scorer = scorer
+        self._category = source.category
+        self._seen: set[str] = set()
+        # (adapter kind, url) pairs written, so a URL found again by another
+        # adapter still reaches found_by.
+        self._written: set[tuple[str, str]] = set()
+        self.urls_found = 0
+        self.inserted = 0
+        self.skipped = 0
+
+    async def __call__(self, adapter_name: str, urls: list[str]) -> None:
+        kind = adapter_kind(adapter_name)
+        new = [url for url in dict.fromkeys(urls) if (kind, url) not in self._written]
+        if not new:
+            return
+        self._written.update((kind, url) for url in new)
+        # Metadata leaves the context once written, so it doesn't grow with the site.
+        metadata = {url: self._context.link_metadata.pop(url, {}) for url in new}
+
+        stats = await insert_discovered_urls(
+            self._session,
+            self._source.id,
+            new,
+            link_metadata=metadata,
+            known=self._known,
+            scorer=self._scorer,
+            category=self._category,
+            found_by=kind,
+        )
+        await self._session.commit()
+        self.urls_found += sum(1 for url in new if url not in self._seen)
+        self._seen.update(new)
+        self.inserted += stats.inserted
+        self.skipped += stats.skipped
 
 
 async def run_spider_for_source(
     session: AsyncSession,
-    source: Source,
+    source: SourceConfig,
+    *,
+    backfill: bool = False,
+    deadline_s: float | None = None,
 ) -> SpiderRunResult:
+    """Discover and insert URLs for ``source``, committing batch by batch.
+
+    The session's transaction is committed once state is loaded and again after
+    each batch, so no connection stays checked out while adapters wait on HTTP.
+    ``deadline_s`` (default: the ``spider_deadline_s`` selector) bounds the run;
+    on expiry what was discovered so far stays committed.
+
+    Spider state is saved per adapter: an adapter that failed or was cut off by
+    the deadline keeps its previous state sections and validators, so the next
+    run revisits whatever it did not finish.
+    """
+    started = time.monotonic()
     selectors = source.selectors or {}
+    if deadline_s is None and selectors.get("spider_deadline_s"):
+        deadline_s = float(selectors["spider_deadline_s"])
+    state = await load_spider_state(session, source.id)
+    baseline = copy.deepcopy(state.to_config())
+    # Selector edits change how pages are read, so they invalidate stored validators.
+    validators = ValidatorStore.from_dict(
+        state.section("http_validators"), scope=_selectors_digest(selectors)
+    )
     http = SpiderHttp(
         crawl_delay_ms=source.crawl_delay_ms,
         max_concurrent=source.max_concurrent_requests,
         timeout_s=source.request_timeout_ms / 1000.0,
         verify_ssl=bool(selectors.get("verify_ssl", True)),
+        validators=validators,
+        retry_policy=RetryPolicy(max_retries=int(selectors.get("max_retries", 4))),
+        max_body_bytes=int(selectors.get("max_body_bytes", DEFAULT_MAX_BODY_BYTES)),
     )
     try:
-        adapters = build_adapters(source, http)
-        all_urls: list[str] = []
-        adapter_counts: dict[str, int] = {}
-
-        for adapter in adapters:
-            name = adapter.__class__.__name__
-            urls = await adapter.discover_urls(source)
-            adapter_counts[name] = len(urls)
-            all_urls.extend(urls)
-
-        # Deduplicate raw URLs before insert
-        unique_urls = list(dict.fromkeys(all_urls))
-        stats: InsertStats = await insert_discovered_urls(
-            session, source.id, unique_urls
+        filter_path = known_filter_path(source.id)
+        known = await KnownUrlIndex.load(session, source.id, path=filter_path)
+        context = SpiderContext(state, known=known, backfill=backfill)
+        # Nothing to write yet: hand the connection back before the network phase.
+        await session.commit()
+        writer = _BatchWriter(session, source, context, known, scorer_for(selectors))
+        adapters = build_adapters(source, http, context)
+        outcomes, timed_out = await stream_adapters(
+            adapters, source, writer, deadline_s=deadline_s
         )
+        if filter_path is not None:
+            known.save(filter_path)
+        failed = {o.name for o in outcomes if o.error}
+        _roll_back_sections(state, baseline, adapters, failed)
+        validators.commit(failed_owners=failed)
+        state.replace("http_validators", validators.to_dict())
+        await save_spider_state(session, source.id, state)
 
         return SpiderRunResult(
             source_code=source.code,
-            urls_found=len(unique_urls),
-            inserted=stats.inserted,
-            skipped=stats.skipped,
-            adapter_counts=adapter_counts,
+            urls_found=writer.urls_found,
+            inserted=writer.inserted,
+            skipped=writer.skipped,
+            adapter_counts={o.name: o.url_count for o in outcomes},
+            retries=http.retry_stats.retries,
+            retry_wait_s=http.retry_stats.wait_s,
+            adapter_timings={o.name: round(o.duration_s, 3) for o in outcomes},
+            adapter_errors={o.name: o.error for o in outcomes if o.error},
+            duration_s=round(time.monotonic() - started, 3),
+            error=f"{DEADLINE_ERROR} after {deadline_s:g}s" if timed_out else None,
         )
     finally:
         await http.aclose()
 
 
-async def run_spider_by_code(session: AsyncSession, source_code: str) -> SpiderRunResult:
-    result = await session.execute(select(Source).where(Source.code == source_code))
-    source = result.scalar_one_or_none()
+def _roll_back_sections(
+    state: SpiderState,
+    baseline: dict,
+    adapters: list[SpiderAdapter],
+    failed: set[str],
+) -> None:
+    """Restore the state sections of ``failed`` adapters to their loaded values."""
+    for adapter in adapters:
+        if adapter.__class__.__name__ in failed:
+            for name in adapter.state_sections:
+                state.replace(name, copy.deepcopy(baseline.get(name) or {}))
+
+
+def _selectors_digest(selectors: Mapping[str, Any]) -> str:
+    encoded = json.dumps(dict(selectors), sort_keys=True, default=_json_default).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def _json_default(value: Any) -> Any:
+    # Nested selector objects are read-only mappings in a SourceConfig.
+    return dict(value) if isinstance(value, Mapping) else str(value)
+
+
+async def run_spider_by_code(
+    session: AsyncSession,
+    source_code: str,
+    *,
+    backfill: bool = False,
+    deadline_s: float | None = None,
+) -> SpiderRunResult:
+    source = await get_source_configs().by_code(session, source_code)
     if source is None:
         raise ValueError(f"Unknown source code: {source_code}")
     if not source.is_active:
         raise ValueError(f"Source {source_code} is not active")
-    return await run_spider_for_source(session, source)
+    return await run_spider_for_source(session, source, backfill=backfill, deadline_s=deadline_s)
 
 
-async def run_spider_all(session: AsyncSession) -> list[SpiderRunResult]:
-    result = await session.execute(select(Source).where(Source.is_active.is_(True)))
-    sources = list(result.scalars().all())
-    results: list[SpiderRunResult] = []
-    for source in sources:
-        results.append(await run_spider_for_source(session, source))
-    return results
+SessionFactory = Callable[[], AbstractAsyncContextManager[AsyncSession]]
+
+
+async def active_source_ids(session: AsyncSession) -> list[uuid.UUID]:
+    result = await session.execute(
+        select(Source.id).where(Source.is_active.is_(True)).order_by(Source.code)
+    )
+    return list(result.scalars().all())
+
+
+async def _run_spider_isolated(
+    source_id: uuid.UUID,
+    session_factory: SessionFactory,
+    backfill: bool = False,
+    deadline_s: float | None = None,
+) -> SpiderRunResult:
+    """One source in its own session; a failure affects only this source."""
+    started = time.monotonic()
+    code = str(source_id)
+    try:
+        async with session_factory() as session:
+            source = await get_source_configs().get(session, source_id)
+            if source is None:
+                raise ValueError(f"Unknown source id: {source_id}")
+            code = source.code
+            return await run_spider_for_source(
+                session, source, backfill=backfill, deadline_s=deadline_s
+            )
+    except Exception as exc:
+        return SpiderRunResult(
+            source_code=code,
+            urls_found=0,
+            inserted=0,
+            skipped=0,
+            adapter_counts={},
+            duration_s=round(time.monotonic() - started, 3),
+            error=f"{type(exc).__name__}: {exc}",
+        )
+
+
+async def iter_spider_runs(
+    source_ids: list[uuid.UUID],
+    *,
+    concurrency: int = 4,
+    session_factory: SessionFactory = get_session,
+    backfill: bool = False,
+    deadline_s: float | None = None,
+) -> AsyncIterator[SpiderRunResult]:
+    """Spider sources concurrently (at most ``concurrency`` at once), yielding as each finishes."""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(source_id: uuid.UUID) -> SpiderRunResult:
+        async with semaphore:
+            return await _run_spider_isolated(source_id, session_factory, backfill, deadline_s)
+
+    tasks = [asyncio.ensure_future(run(source_id)) for source_id in source_ids]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def run_spider_all_parallel(
+    *,
+    concurrency: int = 4,
+    session_factory: SessionFactory = get_session,
+    backfill: bool = False,
+    deadline_s: float | None = None,
+) -> list[SpiderRunResult]:
+    async with session_factory() as session:
+        source_ids = await active_source_ids(session)
+    return [
+        result
+        async for result in iter_spider_runs(
+            source_ids,
+            concurrency=concurrency,
+            session_factory=session_factory,
+            backfill=backfill,
+            deadline_s=deadline_s,
+        )
+    ]
@@ -0,0 +1,370 @@
+"""Streaming sitemap engine: incremental XML parsing, gzip, concurrent index fan-out.
+
+With a ``SpiderContext``, discovery is incremental: each sitemap's newest
+``<lastmod>`` is kept as a watermark in the ``sitemap_lastmod`` state section.
+Index children whose lastmod hasn't advanced are not fetched, and urlsets emit
+only entries newer than their watermark (entries without lastmod always pass).
+Watermarks allow a ``WATERMARK_OVERLAP`` of slack, since a date-only ``<lastmod>``
+can name a day on which the file changed again after it was read: urlset entries
+that close to the watermark are emitted again (the writer dedupes them), and an
+index child is only skipped once its lastmod is older than the overlap.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import zlib
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from xml.etree import ElementTree as ET
+
+from pipeline.spider.context import SpiderContext
+from pipeline.spider.http import SpiderHttp
+from pipeline.spider.robots import RobotsChecker
+from pipeline.spider.streaming import BatchSink
+
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+# Only sitemap-namespace <loc>/<lastmod>, not e.g. <image:loc> inside a <url>.
+_LOC_TAGS = frozenset({f"{{{SITEMAP_NS}}}loc", "loc"})
+_LASTMOD_TAGS = frozenset({f"{{{SITEMAP_NS}}}lastmod", "lastmod"})
+
+GZIP_MAGIC = b"\x1f\x8b"
+# Sitemap protocol limit for an uncompressed file; anything past it is ignored.
+SITEMAP_MAX_BYTES = 50 * 1024 * 1024
+CHUNK_BYTES = 64 * 1024
+# Accepted page URLs handed to ``on_pages`` at a time while a file downloads.
+PAGE_BATCH = 1000
+MAX_DEPTH = 5
+WATERMARK_SECTION = "sitemap_lastmod"
+# Lastmods this close to a watermark still count as new (same-day, date-only values).
+WATERMARK_OVERLAP = timedelta(days=1)
+
+
+@dataclass(slots=True)
+class SitemapEntry:
+    """One ``<url>`` or ``<sitemap>`` element."""
+
+    loc: str
+    lastmod: str | None = None
+
+
+def parse_lastmod(value: str | None) -> datetime | None:
+    """W3C datetime (``2024-05-01``, ``2024-05-01T10:00:00+03:00``) as aware UTC."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip())
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def _covered(lastmod: datetime, watermark: datetime | None) -> bool:
+    """``lastmod`` is safely older than ``watermark``, overlap included."""
+    return watermark is not None and lastmod < watermark - WATERMARK_OVERLAP
+
+
+def _local_name(tag: str) -> str:
+    if "}" in tag:
+        return tag.split("}", 1)[1]
+    return tag
+
+
+class SitemapParser:
+    """Push parser for one sitemap body: feed raw bytes, get entries as they complete.
+
+    Bodies starting with the gzip magic bytes are gunzipped on the fly
+    (``Content-Encoding: gzip`` is already undone by httpx; this covers
+    ``.xml.gz`` files served as ``application/gzip``). Decompressed output is
+    bounded per step and capped at ``max_bytes``; anything past the cap is
+    ignored. No tree is kept, so memory stays flat however large the file.
+    """
+
+    def __init__(self, max_bytes: int = SITEMAP_MAX_BYTES) -> None:
+        self._max_bytes = max_bytes
+        self._produced = 0
+        # Set once decoded bytes past ``max_bytes`` were dropped.
+        self.truncated = False
+        self._head = b""
+        self._sniffed = False
+        self._gunzip: zlib._Decompress | None = None
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._root: ET.Element | None = None
+        self._kind = ""
+        self._loc: str | None = None
+        self._lastmod: str | None = None
+
+    def feed(self, data: bytes) -> Iterator[tuple[str, SitemapEntry]]:
+        """``(root_kind, entry)`` pairs completed by ``data``.
+
+        ``root_kind`` is ``"sitemapindex"`` or ``"urlset"`` (other roots yield
+        nothing). Malformed XML raises ``ET.ParseError`` after the entries before it.
+        """
+        if not self._sniffed:
+            self._head += data
+            if len(self._head) < len(GZIP_MAGIC):
+                return
+            data, self._head, self._sniffed = self._head, b"", True
+            if data.startswith(GZIP_MAGIC):
+                self._gunzip = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        for chunk in self._decoded(data):
+            self._parser.feed(chunk)
+            yield from self._drain()
+
+    def close(self) -> Iterator[tuple[str, SitemapEntry]]:
+        """Entries left at the end of the body; raises ``ET.ParseError`` if it was cut short."""
+        if not self._sniffed:
+            self._sniffed = True
+            head, self._head = self._head, b""
+            yield from self.feed(head)
+        self._parser.close()
+        yield from self._drain()
+
+    def _decoded(self, data: bytes) -> Iterator[bytes]:
+        if self._gunzip is None:
+            for i in range(0, len(data), CHUNK_BYTES):
+                yield from self._capped(data[i : i + CHUNK_BYTES])
+            return
+        pending = data
+        while pending and not self._gunzip.eof:
+            chunk = self._gunzip.decompress(pending, CHUNK_BYTES)
+            pending = self._gunzip.unconsumed_tail
+            yield from self._capped(chunk)
+
+    def _capped(self, chunk: bytes) -> Iterator[bytes]:
+        room = self._max_bytes - self._produced
+        if not chunk:
+            return
+        if len(chunk) > room:
+            self.truncated = True
+            if room <= 0:
+                return
+        chunk = chunk[:room]
+        self._produced += len(chunk)
+        yield chunk
+
+    def _drain(self) -> Iterator[tuple[str, SitemapEntry]]:
+        for event, elem in self._parser.read_events():
+            if event == "start":
+                if self._root is None:
+                    self._root, self._kind = elem, _local_name(elem.tag)
+                continue
+            if elem.tag in _LOC_TAGS:
+                self._loc = (elem.text or "").strip() or None
+            elif elem.tag in _LASTMOD_TAGS:
+                self._lastmod = (elem.text or "").strip() or None
+            elif _local_name(elem.tag) in ("url", "sitemap"):
+                if self._loc and self._kind in ("urlset", "sitemapindex"):
+                    yield self._kind, SitemapEntry(self._loc, self._lastmod)
+                self._loc = self._lastmod = None
+                # Drop finished entries so memory stays flat on large files.
+                self._root.clear()
+
+
+def iter_sitemap(body: bytes) -> Iterator[tuple[str, SitemapEntry]]:
+    """Entries of a whole sitemap body; see ``SitemapParser``."""
+    parser = SitemapParser()
+    for i in range(0, len(body), CHUNK_BYTES):
+        yield from parser.feed(body[i : i + CHUNK_BYTES])
+    yield from parser.close()
+
+
+class _SitemapReader:
+    """Reads one sitemap file while it downloads (a ``BodyConsumer``).
+
+    Index children are collected; accepted pages newer than the file's watermark
+    go to the crawler's sink every ``PAGE_BATCH`` URLs, or are kept in ``pages``
+    when there is no sink.
+    """
+
+    def __init__(self, crawler: SitemapCrawler, sitemap_url: str) -> None:
+        self._crawler = crawler
+        self._parser = SitemapParser()
+        self.watermark = crawler._watermark(sitemap_url)
+        self.newest = self.watermark
+        self.fed = False
+        self.all_children: list[str] = []
+        self.children: list[tuple[str, datetime | None]] = []
+        self.pages: list[str] = []
+        self._pending: list[str] = []
+
+    async def feed(self, chunk: bytes) -> None:
+        self.fed = True
+        try:
+            self._take(self._parser.feed(chunk))
+        finally:
+            await self._flush()
+
+    async def finish(self) -> None:
+        """Take the rest of the body; ``ET.ParseError`` if malformed (pages read are kept)."""
+        try:
+            self._take(self._parser.close())
+        finally:
+            await self._flush(final=True)
+
+    @property
+    def truncated(self) -> bool:
+        """The body ran past ``SITEMAP_MAX_BYTES`` and its tail was never parsed."""
+        return self._parser.truncated
+
+    def _take(self, entries: Iterator[tuple[str, SitemapEntry]]) -> None:
+        crawler = self._crawler
+        for kind, entry in entries:
+            lastmod = parse_lastmod(entry.lastmod)
+            if kind == "sitemapindex":
+                self.all_children.append(entry.loc)
+                if not crawler._unchanged_child(entry.loc, lastmod):
+                    self.children.append((entry.loc, lastmod))
+                continue
+            if lastmod is not None:
+                if _covered(lastmod, self.watermark):
+                    continue
+                self.newest = lastmod if self.newest is None else max(self.newest, lastmod)
+            if crawler._accept is None or crawler._accept(entry.loc):
+                self._pending.append(entry.loc)
+                if crawler._context is not None and lastmod is not None:
+                    crawler._context.annotate(entry.loc, lastmod=lastmod.isoformat())
+
+    async def _flush(self, *, final: bool = False) -> None:
+        """Hand on full batches (and, when ``final``, the remainder)."""
+        while len(self._pending) >= PAGE_BATCH or (final and self._pending):
+            pages = self._pending[:PAGE_BATCH]
+            del self._pending[:PAGE_BATCH]
+            pages = await self._crawler._robots.filter_allowed(pages)
+            if self._crawler._on_pages is None:
+                self.pages.extend(pages)
+            elif pages:
+                self._crawler._on_pages(pages)
+
+
+class SitemapCrawler:
+    """Walks sitemaps and sitemap indexes, fetching index children concurrently.
+
+    Children share the ``SpiderHttp`` per-host semaphore and rate limiter;
+    ``max_parallel`` bounds how many files download and parse at once. Bodies
+    are parsed as they stream in (up to ``SITEMAP_MAX_BYTES``), never buffered.
+    ``accept`` filters page URLs as they come out of the parser. With
+    ``on_pages``, accepted pages go to that sink in batches of at most
+    ``PAGE_BATCH`` while each file downloads, and ``collect`` returns nothing;
+    without it ``collect`` returns every accepted page as one list.
+    """
+
+    def __init__(
+        self,
+        http: SpiderHttp,
+        robots: RobotsChecker,
+        *,
+        accept: Callable[[str], bool] | None = None,
+        max_parallel: int = 4,
+        context: SpiderContext | None = None,
+        on_pages: BatchSink | None = None,
+    ) -> None:
+        self._http = http
+        self._robots = robots
+        self._accept = accept
+        self._on_pages = on_pages
+        self._parallel = asyncio.Semaphore(max_parallel)
+        self._context = context
+        self._watermarks = context.section(WATERMARK_SECTION) if context is not None else None
+
+    async def collect(self, sitemap_urls: list[str]) -> list[str]:
+        allowed = await self._robots.filter_allowed(sitemap_urls)
+        batches = await asyncio.gather(*(self._collect(url, None, 0) for url in allowed))
+        return list(dict.fromkeys(url for batch in batches for url in batch))
+
+    async def _collect(
+        self, sitemap_url: str, listed_lastmod: datetime | None, depth: int
+    ) -> list[str]:
+        if depth > MAX_DEPTH:
+            return []
+
+        async with self._parallel:
+            result = await self._read(sitemap_url)
+        if result is None:
+            return []
+        children, pages, complete = result
+        # Read in full: the index's lastmod for this file is now covered, unless
+        # it is recent enough that the file may still change without it moving.
+        now = datetime.now(timezone.utc)
+        if complete and listed_lastmod is not None and _covered(listed_lastmod, now):
+            self._advance(f"index:{sitemap_url}", listed_lastmod)
+
+        if not children:
+            return pages
+        batches = await asyncio.gather(
+            *(self._collect(child, lastmod, depth + 1) for child, lastmod in children)
+        )
+        return pages + [url for batch in batches for url in batch]
+
+    async def _read(
+        self, sitemap_url: str
+    ) -> tuple[list[tuple[str, datetime | None]], list[str], bool] | None:
+        """``(children to visit, pages not sent to the sink, read in full)``.
+
+        ``None`` if the fetch failed. A partial read (cut off, malformed, or past
+        ``SITEMAP_MAX_BYTES``) keeps its pages but leaves the watermarks alone:
+        entries after the break were never seen and must not be skipped next run.
+        """
+        readers: list[_SitemapReader] = []
+
+        def reader() -> _SitemapReader:
+            # One per attempt: a retried download starts parsing from scratch.
+            readers.append(_SitemapReader(self, sitemap_url))
+            return readers[-1]
+
+        try:
+            # expect_text=False: .xml.gz files arrive as application/gzip.
+            response = await self._http.get_if_changed(
+                sitemap_url, expect_text=False, max_bytes=SITEMAP_MAX_BYTES, consumer=reader
+            )
+        except Exception:
+            if not readers or not readers[-1].fed:
+                return None
+            # Cut off mid-body: keep what was read, fetch it in full next run.
+            response, complete = None, False
+        else:
+            complete = True
+
+        if response is None and (not readers or not readers[-1].fed):
+            # An unchanged index still has to visit children, which may have changed.
+            # Their lastmods are unknown here, so the urlset watermarks do the skipping.
+            known = self._http.annotation(sitemap_url, "children") or []
+            return [(child, None) for child in known], [], True
+
+        current = readers[-1] if readers else reader()
+        if not current.fed and response is not None:
+            await current.feed(response.content)  # Body was buffered after all.
+        try:
+            await current.finish()
+        except ET.ParseError:
+            complete = False  # Keep what was read before the malformed part.
+        complete = complete and not current.truncated
+        if complete and response is not None:
+            self._http.confirm(sitemap_url)
+        if current.all_children:
+            self._http.annotate(sitemap_url, children=current.all_children)
+        if complete:
+            self._advance(sitemap_url, current.newest)
+        return current.children, current.pages, complete
+
+    def _watermark(self, key: str) -> datetime | None:
+        if self._watermarks is None:
+            return None
+        return parse_lastmod(self._watermarks.get(key))
+
+    def _advance(self, key: str, lastmod: datetime | None) -> None:
+        if self._watermarks is None or lastmod is None:
+            return
+        current = self._watermark(key)
+        if current is None or lastmod > current:
+            self._watermarks[key] = lastmod.isoformat()
+
+    def _unchanged_child(self, child_url: str, lastmod: datetime | None) -> bool:
+        """The index lists no change since the child was last read in full."""
+        if lastmod is None:
+            return False
+        seen = self._watermark(f"index:{child_url}")
+        return seen is not None and lastmod <= seen
@@ -0,0 +1,54 @@
+"""Per-source spider memory persisted in ``SourceCrawlState.crawl_config``."""
+
+from __future__ import annotations
+
+import uuid
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from pipeline.db.models.sources import SourceCrawlState
+
+
+class SpiderState:
+    """JSON-ready named sections (validators, watermarks, ...) for one source."""
+
+    def __init__(self, config: dict[str, Any] | None = None) -> None:
+        self._config: dict[str, Any] = dict(config or {})
+
+    def section(self, name: str) -> dict[str, Any]:
+        value = self._config.get(name)
+        if not isinstance(value, dict):
+            value = self._config[name] = {}
+        return value
+
+    def replace(self, name: str, value: dict[str, Any]) -> None:
+        self._config[name] = value
+
+    def to_config(self) -> dict[str, Any]:
+        return dict(self._config)
+
+
+async def load_spider_state(session: AsyncSession, source_id: uuid.UUID) -> SpiderState:
+    result = await session.execute(
+        select(SourceCrawlState.crawl_config).where(SourceCrawlState.source_id == source_id)
+    )
+    return SpiderState(result.scalar_one_or_none())
+
+
+async def save_spider_state(
+    session: AsyncSession,
+    source_id: uuid.UUID,
+    state: SpiderState,
+) -> None:
+    result = await session.execute(
+        select(SourceCrawlState).where(SourceCrawlState.source_id == source_id)
+    )
+    row = result.scalar_one_or_none()
+    if row is None:
+        row = SourceCrawlState(source_id=source_id, health_score=100, consecutive_errors=0)
+        session.add(row)
+    # Assign a fresh dict so the JSONB column is flagged dirty.
+    row.crawl_config = state.to_config()
+    await session.flush()
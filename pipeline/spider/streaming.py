@@ -0,0 +1,43 @@
+"""Glue for adapters that report URL batches while a crawl is still running."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextvars import ContextVar
+from typing import Any
+
+# Receives URL batches from a crawler as they are found.
+BatchSink = Callable[[list[str]], None]
+
+# Name of the adapter whose task is running, so shared helpers can attribute work to it.
+current_adapter: ContextVar[str | None] = ContextVar("current_adapter", default=None)
+
+
+async def stream_batches(
+    run: Callable[[BatchSink], Awaitable[Any]],
+) -> AsyncIterator[list[str]]:
+    """Turn a crawl that reports batches to a sink into an async iterator.
+
+    ``run`` is started in a task and given the sink; batches are yielded as they
+    arrive and its exception, if any, is raised once they are exhausted. Closing
+    the iterator early cancels the crawl.
+    """
+    queue: asyncio.Queue[list[str] | None] = asyncio.Queue()
+
+    async def drive() -> None:
+        try:
+            await run(queue.put_nowait)
+        finally:
+            queue.put_nowait(None)
+
+    task = asyncio.ensure_future(drive())
+    try:
+        while (batch := await queue.get()) is not None:
+            if batch:
+                yield batch
+        await task
+    finally:
+        if not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
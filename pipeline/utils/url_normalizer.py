@@ -1,9 +1,16 @@
 """URL normalization and hashing for deduplication."""
 
+import asyncio
 import hashlib
+import multiprocessing
 import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Any
 from urllib.parse import parse_qsl, unquote, urlencode, urlparse, urlunparse
 
+from pipeline.utils.directive_meta import extract_directive_meta
+
 STRIP_PARAMS = frozenset(
     {
         "utm_source",
@@ -43,11 +50,86 @@ def normalize_url(raw_url: str) -> str:
         if _ETHIOPIC.search(decoded):
             path = decoded
 
-    params = [(k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True) if k not in STRIP_PARAMS]
-    query = urlencode(params) if params else ""
+    query = ""
+    if parsed.query:
+        params = [
+            (k, v)
+            for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+            if k not in STRIP_PARAMS
+        ]
+        query = urlencode(params) if params else ""
 
     return urlunparse((scheme, host, path, "", query, ""))
 
 
+def site_host(url: str) -> str:
+    """Lower-cased host without ``www.``: one key per site for politeness limits."""
+    return urlparse(url).netloc.lower().removeprefix("www.")
+
+
 def url_hash(normalized_url: str) -> str:
     return hashlib.sha256(normalized_url.encode("utf-8")).hexdigest()
+
+
+# (normalized URL, url_hash, directive metadata from the raw path); "" / "" / None
+# when the URL normalizes to nothing. The metadata dict is shared; don't mutate it.
+NormalizedUrl = tuple[str, str, dict[str, Any] | None]
+
+NORMALIZE_CACHE_SIZE = 65_536
+# Batches at least this large are normalized in worker processes.
+PROCESS_POOL_THRESHOLD = 20_000
+PROCESS_POOL_CHUNK = 5_000
+
+_pool: ProcessPoolExecutor | None = None
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def normalize_one(raw_url: str) -> NormalizedUrl:
+    normalized = normalize_url(raw_url)
+    if not normalized:
+        return "", "", None
+    return normalized, url_hash(normalized), extract_directive_meta(urlparse(raw_url).path)
+
+
+def normalize_batch(raw_urls: list[str]) -> list[NormalizedUrl]:
+    """``normalize_one`` over ``raw_urls``, in order."""
+    return [normalize_one(raw_url) for raw_url in raw_urls]
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # Not fork: workers must not inherit the event loop, sockets or DB connections.
+        methods = multiprocessing.get_all_start_methods()
+        method = "forkserver" if "forkserver" in methods else "spawn"
+        _pool = ProcessPoolExecutor(mp_context=multiprocessing.get_context(method))
+    return _pool
+
+
+def shutdown_normalize_pool() -> None:
+    """Stop the worker processes of ``normalize_batch_async``, if any were started."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+
+
+async def normalize_batch_async(
+    raw_urls: list[str], *, threshold: int = PROCESS_POOL_THRESHOLD
+) -> list[NormalizedUrl]:
+    """``normalize_batch`` that keeps large batches off the event loop.
+
+    Batches below ``threshold`` run inline (cheap, and the cache helps); larger
+    ones are split into chunks and normalized in a shared process pool.
+    """
+    if len(raw_urls) < threshold:
+        return normalize_batch(raw_urls)
+    loop = asyncio.get_running_loop()
+    pool = _get_pool()
+    chunks = await asyncio.gather(
+        *(
+            loop.run_in_executor(pool, normalize_batch, raw_urls[i : i + PROCESS_POOL_CHUNK])
+            for i in range(0, len(raw_urls), PROCESS_POOL_CHUNK)
+        )
+    )
+    return [item for chunk in chunks for item in chunk]
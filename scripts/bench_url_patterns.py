@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: URL pattern filtering on sitemap-sized inputs (no network, no DB)."""
+
+import argparse
+import random
+import sys
+import timeit
+from pathlib import Path
+from urllib.parse import urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from pipeline.spider.links import UrlPatternSet, compile_patterns, pattern_to_regex
+
+SELECTORS = {
+    "article_url_pattern": "/nbe_news/{slug}/",
+    "directive_url_pattern": "/files/{slug}/",
+    "pdf_path_pattern": "/media/filer_public/",
+}
+
+
+def make_urls(count: int, seed: int = 7) -> list[str]:
+    rng = random.Random(seed)
+    shapes = (
+        "/nbe_news/post-{n}/",
+        "/files/directive-{n}/",
+        "/media/filer_public/{n}/doc.pdf",
+        "/category/news/page/{n}/",
+        "/tag/banking-{n}/",
+        "/en/about-us/team-{n}/",
+    )
+    return [f"https://nbe.gov.et{rng.choice(shapes).format(n=i)}" for i in range(count)]
+
+
+def filter_per_call(urls: list[str], patterns: list[str]) -> list[str]:
+    """The previous filter_by_patterns: recompile per call, one regex at a time."""
+    regexes = [pattern_to_regex(p) for p in patterns if p]
+    regexes = [r for r in regexes if r is not None]
+    filtered: list[str] = []
+    for url in urls:
+        path = urlparse(url).path
+        if any(rx.search(path) for rx in regexes):
+            filtered.append(url)
+    return filtered
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--urls", type=int, default=50_000, help="URLs per run (default: 50000)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs (default: 5)")
+    args = parser.parse_args()
+
+    urls = make_urls(args.urls)
+    # The old path had no contains-patterns; compare on the same anchored patterns.
+    patterns = [SELECTORS["article_url_pattern"], SELECTORS["directive_url_pattern"]]
+    compiled = compile_patterns(tuple(patterns))
+    assert compiled.filter(urls) == filter_per_call(urls, patterns)
+
+    baseline = min(timeit.repeat(lambda: filter_per_call(urls, patterns), number=1, repeat=args.repeat))
+    combined = min(timeit.repeat(lambda: compiled.filter(urls), number=1, repeat=args.repeat))
+    full = UrlPatternSet.from_selectors(SELECTORS)
+    with_pdf = min(timeit.repeat(lambda: full.filter(urls), number=1, repeat=args.repeat))
+
+    print(f"{len(urls)} urls, best of {args.repeat}")
+    print(f"  per-call regex list : {baseline * 1000:8.1f} ms")
+    print(f"  compiled pattern set: {combined * 1000:8.1f} ms  ({baseline / combined:.1f}x)")
+    print(f"  + pdf_path_pattern  : {with_pdf * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,9 @@
 #!/usr/bin/env python3
-"""Run a Phase-3 crawler pass over discovered URLs (no DB writes)."""
+"""Run a Phase-3 crawler pass over discovered URLs.
+
+Without --claim nothing is written to the DB; with --claim URLs are leased from
+the shared frontier and marked crawled, so several workers can run at once.
+"""
 
 from __future__ import annotations
 
@@ -10,38 +14,73 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-from pipeline.crawler.runner import run_crawler_once
+from pipeline.crawler.frontier import DEFAULT_LEASE_S, CrawlFrontier, iter_frontier_run
+from pipeline.crawler.runner import DEFAULT_CONCURRENCY, CrawlRunItem, iter_crawler_run
 from pipeline.db.session import get_session
+from pipeline.http.clients import close_client_pool
 
 
 async def main() -> None:
     parser = argparse.ArgumentParser(description="Run crawler extraction over discovered URLs")
     parser.add_argument("--source", "-s", help="Source code filter, e.g. NBE")
     parser.add_argument("--limit", "-n", type=int, default=10, help="Maximum URLs to process")
+    parser.add_argument(
+        "--concurrency",
+        "-c",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Pages fetched at once across all sources (default: {DEFAULT_CONCURRENCY}).",
+    )
+    parser.add_argument(
+        "--claim",
+        action="store_true",
+        help="Lease URLs from the shared frontier and mark them crawled (multi-worker safe).",
+    )
+    parser.add_argument("--worker-id", help="Lease owner name (default: host:pid).")
+    parser.add_argument(
+        "--lease",
+        type=float,
+        default=DEFAULT_LEASE_S,
+        help=f"Seconds a claimed URL stays leased (default: {DEFAULT_LEASE_S:g}).",
+    )
     args = parser.parse_args()
 
-    async with get_session() as session:
-        rows = await run_crawler_once(
-            session,
-            limit=max(args.limit, 1),
-            source_code=args.source,
-        )
+    limit = max(args.limit, 1)
+    concurrency = max(args.concurrency, 1)
+    processed = 0
+    try:
+        if args.claim:
+            frontier = CrawlFrontier(worker_id=args.worker_id, lease_s=args.lease)
+            async for row in iter_frontier_run(
+                frontier, limit=limit, source_code=args.source, concurrency=concurrency
+            ):
+                processed += 1
+                print_row(row)
+        else:
+            async with get_session() as session:
+                async for row in iter_crawler_run(
+                    session, limit=limit, source_code=args.source, concurrency=concurrency
+                ):
+                    processed += 1
+                    print_row(row)
+    finally:
+        await close_client_pool()
 
-    if not rows:
+    if not processed:
         print("No pending discovered URLs.")
-        return
 
-    for row in rows:
-        if row.error:
-            print(f"[{row.source_code}] extractor=error url={row.url}")
-            print(f"  error={row.error}")
-            continue
-        shadow = "yes" if row.used_shadow else "no"
-        print(
-            f"[{row.source_code}] extractor={row.extractor} shadow={shadow} "
-            f"lang={row.language} url={row.url}"
-        )
-        print(f"  title={row.title[:120]}")
+
+def print_row(row: CrawlRunItem) -> None:
+    if row.error:
+        print(f"[{row.source_code}] extractor=error url={row.url}")
+        print(f"  error={row.error}")
+        return
+    shadow = "yes" if row.used_shadow else "no"
+    print(
+        f"[{row.source_code}] extractor={row.extractor} shadow={shadow} "
+        f"lang={row.language} url={row.url}"
+    )
+    print(f"  title={row.title[:120]}")
 
 
 if __name__ == "__main__":
@@ -9,7 +9,28 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
 from pipeline.db.session import get_session
-from pipeline.spider.service import run_spider_all, run_spider_by_code
+from pipeline.http.clients import close_client_pool, get_client_pool
+from pipeline.spider.service import (
+    SpiderRunResult,
+    active_source_ids,
+    iter_spider_runs,
+    run_spider_by_code,
+)
+from pipeline.utils.url_normalizer import shutdown_normalize_pool
+
+
+def print_result(r: SpiderRunResult) -> None:
+    print(
+        f"\n[{r.source_code}] found={r.urls_found} inserted={r.inserted} skipped={r.skipped} "
+        f"retries={r.retries} retry_wait={r.retry_wait_s:.1f}s duration={r.duration_s:.1f}s"
+    )
+    if r.error:
+        print(f"  FAILED: {r.error}")
+    for adapter, count in r.adapter_counts.items():
+        line = f"  {adapter}: {count} urls in {r.adapter_timings.get(adapter, 0.0):.1f}s"
+        if error := r.adapter_errors.get(adapter):
+            line += f" (error: {error})"
+        print(line)
 
 
 async def main() -> None:
@@ -19,18 +40,58 @@ async def main() -> None:
         "-s",
         help="Source code (NBE, MOF, MOR, MOJ). Omit to run all active sources.",
     )
+    parser.add_argument(
+        "--parallel",
+        "-p",
+        type=int,
+        default=4,
+        help="Sources spidered concurrently when running all sources (default: 4).",
+    )
+    parser.add_argument(
+        "--backfill",
+        action="store_true",
+        help="Walk listing archives in full instead of stopping at known URLs.",
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        default=None,
+        help="Stop each source after this many seconds, keeping what was found so far.",
+    )
     args = parser.parse_args()
 
-    async with get_session() as session:
+    try:
         if args.source:
-            results = [await run_spider_by_code(session, args.source.upper())]
+            async with get_session() as session:
+                print_result(
+                    await run_spider_by_code(
+                        session,
+                        args.source.upper(),
+                        backfill=args.backfill,
+                        deadline_s=args.deadline,
+                    )
+                )
         else:
-            results = await run_spider_all(session)
+            async with get_session() as session:
+                source_ids = await active_source_ids(session)
+            async for result in iter_spider_runs(
+                source_ids,
+                concurrency=args.parallel,
+                backfill=args.backfill,
+                deadline_s=args.deadline,
+            ):
+                print_result(result)
+        connection_stats = get_client_pool().stats()
+    finally:
+        await close_client_pool()
+        shutdown_normalize_pool()
 
-    for r in results:
-        print(f"\n[{r.source_code}] found={r.urls_found} inserted={r.inserted} skipped={r.skipped}")
-        for adapter, count in r.adapter_counts.items():
-            print(f"  {adapter}: {count} urls")
+    print("\nConnections:")
+    for host, stats in connection_stats.items():
+        print(
+            f"  {host}: requests={stats['requests']} new={stats['new_connections']} "
+            f"reused={stats['reused']} http2={stats['http2_responses']}"
+        )
 
 
 if __name__ == "__main__":
@@ -7,10 +7,9 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-from sqlalchemy import select
-
-from pipeline.db.models import Source
 from pipeline.db.session import get_session_factory
+from pipeline.http.clients import close_client_pool
+from pipeline.source_config import get_source_configs
 from pipeline.spider.http import SpiderHttp
 from pipeline.spider.registry import build_adapters
 
@@ -20,10 +19,7 @@ async def smoke() -> int:
     failures: list[str] = []
 
     async with factory() as session:
-        result = await session.execute(
-            select(Source).where(Source.is_active.is_(True)).order_by(Source.code)
-        )
-        sources = list(result.scalars().all())
+        sources = await get_source_configs().active(session)
 
     for source in sources:
         http = SpiderHttp(
@@ -53,6 +49,8 @@ async def smoke() -> int:
         finally:
             await http.aclose()
 
+    await close_client_pool()
+
     if failures:
         print("\nFailures:")
         for f in failures:
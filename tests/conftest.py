@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    # The pipeline is built on asyncio primitives (tasks, queues, conditions).
+    return "asyncio"
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from pipeline.crawler import frontier as frontier_module
+from pipeline.crawler.frontier import CrawlFrontier, iter_frontier_run
+from pipeline.crawler.runner import CrawlRunItem
+
+
+class _Result:
+    rowcount = 0
+
+    def all(self) -> list:
+        return []
+
+
+class _RecordingSession:
+    def __init__(self) -> None:
+        self.statements: list[str] = []
+
+    async def execute(self, stmt):
+        self.statements.append(str(stmt.compile(dialect=postgresql.dialect())))
+        return _Result()
+
+
+@pytest.mark.anyio
+async def test_claim_leases_with_skip_locked_in_one_statement():
+    session = _RecordingSession()
+
+    class _Factory:
+        async def __aenter__(self):
+            return session
+
+        async def __aexit__(self, *_exc):
+            return False
+
+    frontier = CrawlFrontier(_Factory, worker_id="node-a:1")
+    assert await frontier.claim(50) == []
+
+    (sql,) = session.statements
+    assert "FOR UPDATE OF discovered_urls SKIP LOCKED" in sql
+    assert sql.startswith("WITH claim_batch AS")
+    assert "UPDATE discovered_urls SET claimed_by" in sql
+    assert "lease_expires_at < now()" in sql
+    assert "crawl_attempts=(discovered_urls.crawl_attempts + " in sql
+    assert "discovered_urls.crawl_attempts < " in sql
+
+
+class _FakeFrontier:
+    lease_s = 600.0
+
+    def __init__(self, ids: list[uuid.UUID]) -> None:
+        self._ids = ids
+        self.acked: list[list[uuid.UUID]] = []
+        self.released: list[list[uuid.UUID]] = []
+        self.failed: dict[uuid.UUID, str] = {}
+        self.renewed: list[set[uuid.UUID]] = []
+        self.calls: list[str] = []
+        self.renew_errors = 0
+
+    async def reclaim_expired(self):
+        self.calls.append("reclaim_expired")
+        return 0
+
+    async def claim(self, limit, *, source_code=None):
+        self.calls.append("claim")
+        return [SimpleNamespace(url_id=url_id) for url_id in self._ids[:limit]]
+
+    async def ack(self, ids):
+        if ids:
+            self.acked.append(list(ids))
+        return len(ids)
+
+    async def release(self, ids, *, retry_after_s=0.0):
+        if ids:
+            self.released.append(list(ids))
+        return len(ids)
+
+    async def fail(self, errors):
+        self.failed.update(errors)
+        return len(errors)
+
+    async def renew(self, ids):
+        if self.renew_errors:
+            self.renew_errors -= 1
+            raise ConnectionError("database went away")
+        self.renewed.append(set(ids))
+        return len(ids)
+
+
+@pytest.mark.anyio
+async def test_reclaim_expired_gives_up_on_rows_out_of_attempts():
+    session = _RecordingSession()
+
+    class _Factory:
+        async def __aenter__(self):
+            return session
+
+        async def __aexit__(self, *_exc):
+            return False
+
+    await CrawlFrontier(_Factory, worker_id="node-a:1", max_attempts=3).reclaim_expired()
+
+    (sql,) = session.statements
+    assert "crawled_at=CASE WHEN (discovered_urls.crawl_attempts >= " in sql
+    assert "lease_expires_at < now()" in sql
+
+
+@pytest.mark.anyio
+async def test_frontier_run_acks_successes_and_releases_failures_in_batches(monkeypatch):
+    ids = [uuid.uuid4() for _ in range(frontier_module.ACK_BATCH + 3)]
+
+    async def fake_crawl_pending(pending, *, concurrency):
+        for i, item in enumerate(pending):
+            yield CrawlRunItem(
+                "NBE", f"https://nbe.gov.et/{i}", "nbe", False, "en", "t",
+                error="RuntimeError: boom" if i % 10 == 0 else None,
+                url_id=item.url_id,
+            )
+
+    monkeypatch.setattr(frontier_module, "crawl_pending", fake_crawl_pending)
+    fake = _FakeFrontier(ids)
+
+    results = [r async for r in iter_frontier_run(fake, limit=len(ids))]
+
+    assert len(results) == len(ids)
+    failed = [ids[i] for i in range(0, len(ids), 10)]
+    assert [i for batch in fake.released for i in batch] == failed
+    assert sorted(i for batch in fake.acked for i in batch) == sorted(set(ids) - set(failed))
+    assert len(fake.acked) == 2  # one full batch, then the remainder
+    assert fake.failed == {}
+    # Leases left by dead workers are settled before this run claims.
+    assert fake.calls == ["reclaim_expired", "claim"]
+
+
+@pytest.mark.anyio
+async def test_frontier_run_fails_permanent_errors_instead_of_retrying(monkeypatch):
+    ids = [uuid.uuid4() for _ in range(3)]
+    errors = ["HTTPStatusError: 404 Not Found", "ConnectTimeout: timed out", None]
+
+    async def fake_crawl_pending(pending, *, concurrency):
+        for i, item in enumerate(pending):
+            yield CrawlRunItem(
+                "NBE", f"https://nbe.gov.et/{i}", "error", False, "", "",
+                error=errors[i], url_id=item.url_id, permanent=i == 0,
+            )
+
+    monkeypatch.setattr(frontier_module, "crawl_pending", fake_crawl_pending)
+    fake = _FakeFrontier(ids)
+
+    [_ async for _ in iter_frontier_run(fake, limit=3)]
+
+    assert fake.failed == {ids[0]: "HTTPStatusError: 404 Not Found"}
+    assert fake.released == [[ids[1]]]
+    assert fake.acked == [[ids[2]]]
+
+
+@pytest.mark.anyio
+async def test_frontier_run_renews_leases_of_unfinished_urls(monkeypatch):
+    ids = [uuid.uuid4() for _ in range(2)]
+
+    async def fake_crawl_pending(pending, *, concurrency):
+        first, second = pending
+        yield CrawlRunItem(
+            "NBE", "https://nbe.gov.et/0", "nbe", False, "en", "t", url_id=first.url_id
+        )
+        await asyncio.sleep(0.1)
+        yield CrawlRunItem(
+            "NBE", "https://nbe.gov.et/1", "nbe", False, "en", "t", url_id=second.url_id
+        )
+
+    monkeypatch.setattr(frontier_module, "crawl_pending", fake_crawl_pending)
+    fake = _FakeFrontier(ids)
+    fake.lease_s = 0.06
+
+    [_ async for _ in iter_frontier_run(fake, limit=2)]
+
+    # The slow second URL kept its lease while the run waited on it.
+    assert fake.renewed and all(ids[1] in renewed for renewed in fake.renewed)
+
+
+@pytest.mark.anyio
+async def test_frontier_run_survives_a_failed_renewal(monkeypatch):
+    ids = [uuid.uuid4()]
+
+    async def fake_crawl_pending(pending, *, concurrency):
+        await asyncio.sleep(0.1)
+        yield CrawlRunItem(
+            "NBE", "https://nbe.gov.et/0", "nbe", False, "en", "t", url_id=pending[0].url_id
+        )
+
+    monkeypatch.setattr(frontier_module, "crawl_pending", fake_crawl_pending)
+    fake = _FakeFrontier(ids)
+    fake.lease_s = 0.06
+    fake.renew_errors = 1
+
+    [_ async for _ in iter_frontier_run(fake, limit=1)]
+
+    assert fake.renewed  # the renewer kept going after the first call raised
+    assert fake.acked == [ids]
+
+
+@pytest.mark.anyio
+async def test_frontier_run_settles_finished_results_when_stopped_early(monkeypatch):
+    ids = [uuid.uuid4() for _ in range(3)]
+
+    async def fake_crawl_pending(pending, *, concurrency):
+        for i, item in enumerate(pending):
+            yield CrawlRunItem(
+                "NBE", f"https://nbe.gov.et/{i}", "nbe", False, "en", "t", url_id=item.url_id
+            )
+
+    monkeypatch.setattr(frontier_module, "crawl_pending", fake_crawl_pending)
+    fake = _FakeFrontier(ids)
+
+    run = iter_frontier_run(fake, limit=3)
+    async for _ in run:
+        break
+    await run.aclose()
+
+    assert fake.acked == [ids[:1]]
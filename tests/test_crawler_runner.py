@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+from urllib.parse import urlparse
+
+import httpx
+import pytest
+
+from pipeline.crawler import runner
+from pipeline.crawler.fetcher.http import HTTPFetcher
+from pipeline.crawler.runner import PendingCrawl, iter_crawl_results
+from pipeline.crawler.service import CrawlRequest
+from pipeline.http.ratelimit import RateLimiterRegistry
+
+HTML = "<html><head><title>Notice</title></head><body><p>National Bank update.</p></body></html>"
+
+
+class _SlowFetcher:
+    def __init__(self, delay_s: float) -> None:
+        self._delay_s = delay_s
+        self.in_flight: dict[str, int] = {}
+        self.peak: dict[str, int] = {}
+        self.order: list[str] = []
+
+    async def fetch_text(self, url: str) -> tuple[str, str]:
+        host = urlparse(url).netloc
+        self.order.append(host)
+        self.in_flight[host] = self.in_flight.get(host, 0) + 1
+        self.peak[host] = max(self.peak.get(host, 0), self.in_flight[host])
+        await asyncio.sleep(self._delay_s)
+        self.in_flight[host] -= 1
+        if url.endswith("/broken"):
+            raise RuntimeError("connection reset")
+        if url.endswith("/gone"):
+            request = httpx.Request("GET", url)
+            response = httpx.Response(404, request=request)
+            raise httpx.HTTPStatusError("404 Not Found", request=request, response=response)
+        return HTML, url
+
+
+def _pending(
+    host: str, count: int, limit: int, *, crawl_delay_ms: int | None = None
+) -> list[PendingCrawl]:
+    return [
+        PendingCrawl(
+            request=CrawlRequest(
+                source_code=host.split(".")[0].upper(),
+                source_url=f"https://{host}",
+                url=f"https://{host}/news/{i}",
+                link_metadata={},
+            ),
+            host=host,
+            host_limit=limit,
+            crawl_delay_ms=crawl_delay_ms,
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.mark.anyio
+async def test_crawl_results_round_robin_hosts_within_limits():
+    pending = _pending("nbe.gov.et", 6, 2) + _pending("mofed.gov.et", 2, 1) + _pending(
+        "moj.gov.et", 2, 1
+    )
+    fetcher = _SlowFetcher(0.05)
+
+    results = [item async for item in iter_crawl_results(pending, fetcher, concurrency=8)]
+
+    assert len(results) == len(pending)
+    # Every host runs at its own limit at once, none above it.
+    assert fetcher.peak == {"nbe.gov.et": 2, "mofed.gov.et": 1, "moj.gov.et": 1}
+    # Hosts interleave from the start instead of draining NBE first: the first
+    # round fills every host's slots before NBE's third page starts.
+    assert sorted(fetcher.order[:4]) == ["mofed.gov.et", "moj.gov.et", "nbe.gov.et", "nbe.gov.et"]
+    assert fetcher.order[4:].count("nbe.gov.et") == 4
+
+
+@pytest.mark.anyio
+async def test_crawl_pending_paces_each_host_by_its_source(monkeypatch):
+    pending = _pending("moj.gov.et", 2, 1, crawl_delay_ms=4000) + _pending("nbe.gov.et", 2, 2)
+    fetchers: list[HTTPFetcher] = []
+
+    async def capture(pending, fetcher, *, concurrency):
+        fetchers.append(fetcher)
+        return
+        yield
+
+    monkeypatch.setattr(runner, "iter_crawl_results", capture)
+    monkeypatch.setattr(
+        runner,
+        "HTTPFetcher",
+        functools.partial(HTTPFetcher, rate_limiters=RateLimiterRegistry(), robots=object()),
+    )
+    [_ async for _ in runner.crawl_pending(pending)]
+
+    (fetcher,) = fetchers
+    moj = fetcher._limiter_for("https://moj.gov.et/news/0")
+    assert moj.max_rate == 0.25
+    waits = [moj.reserve() for _ in range(2)]
+    assert 3.9 < waits[1] <= 4.0  # the second MOJ fetch waits out the 4 s delay
+
+
+@pytest.mark.anyio
+async def test_crawl_results_report_failures_per_url():
+    pending = _pending("nbe.gov.et", 1, 1)
+    pending[0].request.url = "https://nbe.gov.et/broken"
+
+    (result,) = [item async for item in iter_crawl_results(pending, _SlowFetcher(0.0))]
+
+    assert result.extractor == "error"
+    assert result.error == "RuntimeError: connection reset"
+
+
+@pytest.mark.anyio
+async def test_crawl_results_mark_gone_pages_permanent():
+    pending = _pending("nbe.gov.et", 2, 1)
+    pending[0].request.url = "https://nbe.gov.et/broken"
+    pending[1].request.url = "https://nbe.gov.et/gone"
+
+    results = [item async for item in iter_crawl_results(pending, _SlowFetcher(0.0))]
+
+    assert {r.url: r.permanent for r in results} == {
+        "https://nbe.gov.et/broken": False,
+        "https://nbe.gov.et/gone": True,
+    }
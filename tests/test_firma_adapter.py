@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from pipeline.spider.adapters.firma import FIRMAAdapter
+
+
+class _Response:
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+
+class _FakeHttp:
+    """Serves ``pages``; URLs in ``unchanged`` answer 304 (``None``)."""
+
+    def __init__(self, pages: dict[str, str], unchanged: set[str]) -> None:
+        self._pages = pages
+        self._unchanged = unchanged
+        self.fetched: list[str] = []
+
+    async def get_if_changed(self, url: str) -> _Response | None:
+        self.fetched.append(url)
+        if url in self._unchanged:
+            return None
+        return _Response(self._pages[url])
+
+    def confirm(self, url: str) -> None:
+        pass
+
+
+class _AllowAllRobots:
+    async def can_fetch(self, _url: str) -> bool:
+        return True
+
+
+@pytest.mark.anyio
+async def test_unchanged_english_newsroom_still_checks_the_amharic_mirror():
+    en = "https://moj.gov.et/en/newsroom/"
+    am = "https://moj.gov.et/am/newsroom/"
+    http = _FakeHttp(
+        {am: '<html><body><a href="/am/newsroom/new-item/">New</a></body></html>'},
+        unchanged={en},
+    )
+    source = SimpleNamespace(
+        url="https://moj.gov.et", selectors={"seed_urls": ["https://moj.gov.et/en/seed/"]}
+    )
+
+    adapter = FIRMAAdapter(http, _AllowAllRobots())
+    batches = [batch async for batch in adapter.iter_url_batches(source)]
+
+    assert http.fetched == [en, am]
+    # Only the mirror's new item: the seeds are for a walled listing, not an unchanged one.
+    assert batches == [["https://moj.gov.et/am/newsroom/new-item/"]]
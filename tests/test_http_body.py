@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import hashlib
+
+import httpx
+import pytest
+
+from pipeline.http.body import (
+    BodyLimits,
+    BodyTooLargeError,
+    UnexpectedContentTypeError,
+    read_capped,
+)
+
+
+async def _stream(
+    response: httpx.Response, limits: BodyLimits, consumer=None
+) -> httpx.Response:
+    async def handler(_request: httpx.Request) -> httpx.Response:
+        return response
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        async with client.stream("GET", "https://www.mor.gov.et/documents/x") as streamed:
+            return await read_capped(streamed, limits, consumer)
+
+
+async def _chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+@pytest.mark.anyio
+async def test_read_capped_buffers_text_and_hashes_while_streaming():
+    body = b"<html><body>ok</body></html>"
+    out = await _stream(
+        httpx.Response(200, headers={"Content-Type": "text/html; charset=utf-8"}, content=body),
+        BodyLimits(max_bytes=1024),
+    )
+    assert out.text == body.decode()
+    assert out.extensions["body_sha256"] == hashlib.sha256(body).hexdigest()
+
+
+@pytest.mark.anyio
+async def test_read_capped_rejects_binary_when_text_expected():
+    with pytest.raises(UnexpectedContentTypeError):
+        await _stream(
+            httpx.Response(200, headers={"Content-Type": "application/pdf"}, content=b"%PDF"),
+            BodyLimits(max_bytes=1024),
+        )
+
+
+@pytest.mark.anyio
+async def test_read_capped_rejects_oversized_declared_and_streamed_bodies():
+    with pytest.raises(BodyTooLargeError):
+        await _stream(
+            httpx.Response(200, headers={"Content-Type": "text/html"}, content=b"x" * 2048),
+            BodyLimits(max_bytes=1024),
+        )
+    with pytest.raises(BodyTooLargeError):
+        await _stream(
+            httpx.Response(
+                200,
+                headers={"Content-Type": "text/html"},
+                content=_chunks(b"x" * 600, b"x" * 600),
+            ),
+            BodyLimits(max_bytes=1024),
+        )
+
+
+class _Collector:
+    def __init__(self) -> None:
+        self.chunks: list[bytes] = []
+
+    async def feed(self, chunk: bytes) -> None:
+        self.chunks.append(chunk)
+
+
+@pytest.mark.anyio
+async def test_read_capped_hands_body_to_consumer_instead_of_buffering():
+    body = b"<urlset>" + b"<url/>" * 1000 + b"</urlset>"
+    consumer = _Collector()
+    out = await _stream(
+        httpx.Response(
+            200, headers={"Content-Type": "application/xml"}, content=_chunks(body[:10], body[10:])
+        ),
+        BodyLimits(max_bytes=len(body)),
+        consumer,
+    )
+    assert b"".join(consumer.chunks) == body
+    assert out.content == b""
+    assert out.extensions["body_sha256"] == hashlib.sha256(body).hexdigest()
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from pipeline.http.clients import ClientPool, close_client_pool, get_client_pool
+
+
+async def _keepalive_server() -> asyncio.base_events.Server:
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                await reader.readuntil(b"\r\n\r\n")
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok")
+                await writer.drain()
+        except asyncio.IncompleteReadError:
+            pass
+        writer.close()
+
+    return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+
+@pytest.mark.anyio
+async def test_client_pool_reuses_clients_per_host_and_tls_setting():
+    pool = ClientPool(http2=False)
+    try:
+        a = pool.client_for("https://www.mor.gov.et/a", verify_ssl=False)
+        b = pool.client_for("https://www.mor.gov.et/b", verify_ssl=False)
+        c = pool.client_for("https://www.mor.gov.et/b", verify_ssl=True)
+        assert a is b
+        assert a is not c
+    finally:
+        await pool.aclose()
+
+
+@pytest.mark.anyio
+async def test_client_pool_counts_connection_reuse():
+    server = await _keepalive_server()
+    port = server.sockets[0].getsockname()[1]
+    pool = ClientPool(http2=False)
+    try:
+        for _ in range(3):
+            response = await pool.get(f"http://127.0.0.1:{port}/")
+            assert response.text == "ok"
+        stats = pool.stats()[f"127.0.0.1:{port}"]
+        assert stats["requests"] == 3
+        assert stats["new_connections"] == 1
+        assert stats["reused"] == 2
+    finally:
+        await pool.aclose()
+        server.close()
+        await server.wait_closed()
+
+
+def test_client_pool_per_loop_and_closed_on_shutdown():
+    async def pool_with_client() -> ClientPool:
+        pool = get_client_pool()
+        pool.client_for("https://www.mor.gov.et/")
+        return pool
+
+    first_loop = asyncio.new_event_loop()
+    try:
+        first = first_loop.run_until_complete(pool_with_client())
+        second = asyncio.run(pool_with_client())
+        assert second is not first
+        # The first loop is still alive, so its pool was neither dropped nor replaced.
+        assert first_loop.run_until_complete(pool_with_client()) is first
+
+        first_client = first.client_for("https://www.mor.gov.et/")
+        first_loop.run_until_complete(close_client_pool())
+        assert first_client.is_closed
+        assert first_loop.run_until_complete(pool_with_client()) is not first
+        first_loop.run_until_complete(close_client_pool())
+    finally:
+        first_loop.close()
@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import httpx
+
+from pipeline.crawler.fetcher.http import HTTPFetcher
+from pipeline.http.ratelimit import AdaptiveRateLimiter, RateLimiterRegistry, retry_after_seconds
+
+
+def test_token_bucket_spaces_reservations_by_rate():
+    limiter = AdaptiveRateLimiter(min_rate=1.0, max_rate=4.0, initial_rate=2.0)
+    waits = [limiter.reserve() for _ in range(3)]
+    assert waits[0] == 0.0
+    assert 0.45 < waits[1] <= 0.5
+    assert 0.95 < waits[2] <= 1.0
+
+
+def test_aimd_stays_within_source_bounds():
+    limiter = AdaptiveRateLimiter.for_source(crawl_delay_ms=2000, max_concurrent=2)
+    assert limiter.rate == 0.5
+    for _ in range(100):
+        limiter.observe(status_code=200, latency_s=0.2)
+    assert limiter.rate == limiter.max_rate == 1.0
+
+    for _ in range(20):
+        limiter.observe(status_code=429, latency_s=0.2)
+    assert limiter.rate == limiter.min_rate == 0.0625
+
+
+def test_retry_after_pauses_the_bucket():
+    limiter = AdaptiveRateLimiter(min_rate=1.0, max_rate=10.0, initial_rate=10.0)
+    limiter.observe(status_code=503, latency_s=0.1, retry_after_s=30)
+    assert limiter.reserve() >= 29.9
+
+
+def test_retry_after_accepts_seconds_and_http_dates():
+    assert retry_after_seconds(httpx.Response(429, headers={"Retry-After": "7"})) == 7.0
+    later = datetime.now(timezone.utc) + timedelta(seconds=120)
+    response = httpx.Response(503, headers={"Retry-After": format_datetime(later, usegmt=True)})
+    assert 100 < retry_after_seconds(response) <= 120
+    assert retry_after_seconds(httpx.Response(503, headers={"Retry-After": "soon"})) is None
+
+
+def test_registry_keeps_source_bounds_over_fallback_defaults():
+    registry = RateLimiterRegistry()
+    spider = registry.limiter_for("https://nbe.gov.et/a", crawl_delay_ms=2000, max_concurrent=2)
+    crawler = registry.limiter_for(
+        "https://nbe.gov.et/b", crawl_delay_ms=500, max_concurrent=2, authoritative=False
+    )
+    assert crawler is spider
+    assert crawler.max_rate == 1.0
+
+
+def test_fetcher_paces_configured_hosts_by_their_source():
+    registry = RateLimiterRegistry()
+    fetcher = HTTPFetcher(rate_limiters=registry, robots=object())
+    fetcher.configure_host("https://www.moj.gov.et", crawl_delay_ms=4000, max_concurrent=1)
+
+    moj = fetcher._limiter_for("https://www.moj.gov.et/news/1")
+    assert moj.rate == 0.25 and moj.max_rate == 0.25
+
+    # An unconfigured host gets the Source defaults, not a faster fallback ...
+    other = fetcher._limiter_for("https://mofed.gov.et/a")
+    assert other.rate == 0.5
+    # ... and the fallback never loosens bounds a source already set for a host.
+    registry.limiter_for("https://mor.gov.et/", crawl_delay_ms=3000, max_concurrent=1)
+    assert fetcher._limiter_for("https://mor.gov.et/b").max_rate == 1000 / 3000
+
+
+def test_fetcher_shares_one_host_budget_with_and_without_www():
+    registry = RateLimiterRegistry()
+    fetcher = HTTPFetcher(rate_limiters=registry, robots=object(), max_concurrent_per_host=4)
+    fetcher.configure_host("https://mor.gov.et", crawl_delay_ms=2000, max_concurrent=2)
+
+    bare = fetcher._semaphore_for("https://mor.gov.et/a")
+    assert fetcher._semaphore_for("https://www.mor.gov.et/b") is bare
+    assert bare._value == 2
+    assert fetcher._limiter_for("https://www.mor.gov.et/b") is fetcher._limiter_for(
+        "https://mor.gov.et/a"
+    )
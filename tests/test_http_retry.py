@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import httpx
+import pytest
+
+from pipeline.http.retry import (
+    CircuitBreaker,
+    CircuitOpenError,
+    HostGuards,
+    RetryBudget,
+    RetryEngine,
+    RetryPolicy,
+)
+
+URL = "https://justice.gov.et/en/newsroom/"
+
+
+def _sender(*statuses: int):
+    calls: list[int] = []
+
+    async def send() -> httpx.Response:
+        status = statuses[min(len(calls), len(statuses) - 1)]
+        calls.append(status)
+        if status == 0:
+            raise httpx.ConnectError("down", request=httpx.Request("GET", URL))
+        return httpx.Response(status, request=httpx.Request("GET", URL))
+
+    return send, calls
+
+
+@pytest.mark.anyio
+async def test_engine_retries_throttled_responses_and_reports_wait():
+    engine = RetryEngine(RetryPolicy(base_delay_s=0.0), guards=HostGuards())
+    send, calls = _sender(503, 429, 200)
+
+    response = await engine.run(URL, send)
+
+    assert response.status_code == 200
+    assert calls == [503, 429, 200]
+    assert engine.stats.retries == 2
+    assert engine.stats.wait_s == 0.0
+
+
+@pytest.mark.anyio
+async def test_engine_passes_not_modified_through():
+    engine = RetryEngine(guards=HostGuards())
+    send, _ = _sender(304)
+    assert (await engine.run(URL, send)).status_code == 304
+
+
+@pytest.mark.anyio
+async def test_open_circuit_fails_fast_without_sending():
+    guards = HostGuards()
+    guards.breakers["justice.gov.et"] = CircuitBreaker(failure_threshold=2)
+    engine = RetryEngine(RetryPolicy(max_retries=5, base_delay_s=0.0), guards=guards)
+    send, calls = _sender(0)
+
+    with pytest.raises(CircuitOpenError):
+        await engine.run(URL, send)
+    assert len(calls) == 2
+
+    with pytest.raises(CircuitOpenError):
+        await engine.run(URL, send)
+    assert len(calls) == 2
+    assert engine.stats.circuit_rejections == 2
+
+
+def test_half_open_allows_a_single_probe():
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout_s=0.0)
+    breaker.record_failure()
+    breaker.before_request("h")
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request("h")
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_retry_budget_is_a_ratio_of_requests():
+    budget = RetryBudget(ratio=0.5, min_retries=1)
+    for _ in range(4):
+        budget.record_request()
+    spent = sum(budget.try_spend() for _ in range(10))
+    assert spent == 3
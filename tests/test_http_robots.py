@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from urllib.robotparser import RobotFileParser
+
+import pytest
+
+from pipeline.http.clients import USER_AGENT
+from pipeline.http.robots import CompiledRobots, RobotsCache
+
+ROBOTS = "User-agent: *\nDisallow: /private/\n"
+
+
+def _fetcher(responses: dict[str, tuple[int | None, str]]):
+    calls: list[str] = []
+
+    async def fetch(robots_url: str, _verify_ssl: bool) -> tuple[int | None, str]:
+        calls.append(robots_url)
+        return responses.get(robots_url, (404, ""))
+
+    return fetch, calls
+
+
+@pytest.mark.anyio
+async def test_robots_cache_fetches_once_and_persists_to_disk(tmp_path):
+    fetch, calls = _fetcher({"https://justice.gov.et/robots.txt": (200, ROBOTS)})
+    cache = RobotsCache(cache_dir=tmp_path, fetch=fetch)
+
+    assert await cache.can_fetch("https://justice.gov.et/en/newsroom/") is True
+    assert await cache.can_fetch("https://justice.gov.et/private/x") is False
+    assert calls == ["https://justice.gov.et/robots.txt"]
+
+    # A second worker process starts from the disk copy.
+    other = RobotsCache(cache_dir=tmp_path, fetch=fetch)
+    assert await other.can_fetch("https://justice.gov.et/private/x") is False
+    assert len(calls) == 1
+
+
+@pytest.mark.anyio
+async def test_robots_cache_keeps_negative_entries_as_allow_all(tmp_path):
+    fetch, calls = _fetcher({})
+    cache = RobotsCache(cache_dir=tmp_path, fetch=fetch)
+
+    assert await cache.can_fetch("https://www.mor.gov.et/a") is True
+    assert await cache.can_fetch("https://www.mor.gov.et/b") is True
+    assert calls == ["https://www.mor.gov.et/robots.txt"]
+
+
+@pytest.mark.anyio
+async def test_stale_entry_is_served_while_refreshing_in_background(tmp_path):
+    fetch, calls = _fetcher({"https://nbe.gov.et/robots.txt": (200, ROBOTS)})
+    cache = RobotsCache(cache_dir=tmp_path, ttl_s=60, fetch=fetch)
+    await cache.can_fetch("https://nbe.gov.et/")
+    entry, _ = cache._entries["https://nbe.gov.et"]
+    entry.fetched_at = time.time() - 90
+
+    assert await cache.can_fetch("https://nbe.gov.et/private/x") is False
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert len(calls) == 2
+    assert cache._entries["https://nbe.gov.et"][0].fetched_at > time.time() - 5
+
+
+PARITY_ROBOTS = {
+    "star": "User-agent: *\nDisallow: /private/\nAllow: /private/open\nDisallow: /*.pdf\n",
+    "agent": (
+        "User-agent: otherbot\nDisallow: /\n\n"
+        "User-agent: BerhanAdvisorBot\nAllow: /wp-admin/admin-ajax.php\nDisallow: /wp-admin/\n\n"
+        "User-agent: *\nDisallow: /\n"
+    ),
+    "wildcard": "User-agent: *\nDisallow: *\n",
+    "empty": "User-agent: *\nDisallow:\n",
+    "other_only": "User-agent: otherbot\nDisallow: /\n",
+}
+PARITY_URLS = [
+    "https://nbe.gov.et/",
+    "https://nbe.gov.et",
+    "https://nbe.gov.et/private/",
+    "https://nbe.gov.et/private/open/doc",
+    "https://nbe.gov.et/private/x?y=1",
+    "https://nbe.gov.et/wp-admin/",
+    "https://nbe.gov.et/wp-admin/admin-ajax.php?action=x",
+    "https://nbe.gov.et/files/a%20b.pdf",
+    "https://nbe.gov.et/%7Euser/pr%69vate/",
+    "https://nbe.gov.et/news;param?q=%2F#frag",
+]
+
+
+@pytest.mark.parametrize("name", sorted(PARITY_ROBOTS))
+def test_compiled_robots_matches_stdlib_parser(name):
+    parser = RobotFileParser()
+    parser.parse(PARITY_ROBOTS[name].splitlines())
+    compiled = CompiledRobots(parser)
+
+    expected = [url for url in PARITY_URLS if parser.can_fetch(USER_AGENT, url)]
+    assert [url for url in PARITY_URLS if compiled.can_fetch(url)] == expected
+    assert compiled.filter_allowed(PARITY_URLS) == expected
+
+
+@pytest.mark.anyio
+async def test_filter_allowed_groups_by_origin_and_keeps_order(tmp_path):
+    fetch, calls = _fetcher({"https://justice.gov.et/robots.txt": (200, ROBOTS)})
+    cache = RobotsCache(cache_dir=tmp_path, fetch=fetch)
+    urls = [
+        "https://justice.gov.et/private/a",
+        "https://mor.gov.et/private/a",
+        "https://justice.gov.et/en/b",
+        "https://justice.gov.et/private/c",
+    ]
+
+    allowed = await cache.filter_allowed(urls)
+
+    assert allowed == ["https://mor.gov.et/private/a", "https://justice.gov.et/en/b"]
+    assert sorted(calls) == ["https://justice.gov.et/robots.txt", "https://mor.gov.et/robots.txt"]
@@ -0,0 +1,57 @@
+import httpx
+
+from pipeline.http.validators import ValidatorStore
+
+
+def _response(status: int, body: bytes = b"", **headers: str) -> httpx.Response:
+    return httpx.Response(status, content=body, headers=headers)
+
+
+def test_validator_store_sends_conditional_headers_and_detects_unchanged_body():
+    url = "https://nbe.gov.et/wp-sitemap.xml"
+    store = ValidatorStore()
+    first = _response(200, b"<urlset/>", ETag='"abc"', **{"Last-Modified": "Tue, 01 Jul 2026 00:00:00 GMT"})
+
+    assert store.is_unchanged(url, first) is False
+    store.record(url, first)
+    store.confirm(url)
+    store.commit()
+
+    assert store.request_headers(url) == {
+        "If-None-Match": '"abc"',
+        "If-Modified-Since": "Tue, 01 Jul 2026 00:00:00 GMT",
+    }
+    assert store.is_unchanged(url, _response(304)) is True
+    assert store.is_unchanged(url, _response(200, b"<urlset/>")) is True
+    assert store.is_unchanged(url, _response(200, b"<urlset><url/></urlset>")) is False
+
+
+def test_validator_store_round_trips_and_drops_entries_on_scope_change():
+    url = "https://www.mofed.gov.et/press-media/news/"
+    store = ValidatorStore(scope="v1")
+    store.record(url, _response(200, b"<html></html>"))
+    store.annotate(url, children=["a", "b"])
+    store.confirm(url)
+    store.commit()
+
+    restored = ValidatorStore.from_dict(store.to_dict(), scope="v1")
+    assert restored.annotation(url, "children") == ["a", "b"]
+    assert restored.request_headers(url) == {}
+
+    assert len(ValidatorStore.from_dict(store.to_dict(), scope="v2")) == 0
+
+
+def test_validator_store_keeps_old_validators_until_extraction_is_confirmed():
+    parsed, unparsed, failed = (f"https://www.mor.gov.et/{name}" for name in "abc")
+    store = ValidatorStore()
+    for url in (parsed, unparsed, failed):
+        store.record(url, _response(200, url.encode(), ETag=f'"{url[-1]}"'))
+    store.confirm(parsed, owner="ListingAdapter")
+    store.confirm(failed, owner="RSSAdapter")
+    store.commit(failed_owners={"RSSAdapter"})
+
+    assert store.request_headers(parsed) == {"If-None-Match": '"a"'}
+    # Never extracted, or extracted by an adapter that then failed: fetch in full again.
+    assert store.request_headers(unparsed) == {}
+    assert store.request_headers(failed) == {}
+    assert store.is_unchanged(failed, _response(200, failed.encode())) is False
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from pipeline.spider.adapters.rss import FEED_SECTION, RSSAdapter
+from pipeline.spider.context import SpiderContext
+from pipeline.spider.state import SpiderState
+
+HOMEPAGE = """<html><head>
+<link rel="alternate" type="application/rss+xml" href="/news/rss.xml">
+</head><body></body></html>"""
+
+FEED = """<?xml version="1.0"?><rss version="2.0"><channel><title>MOF</title>
+<item><link>https://mofed.gov.et/news/a/</link><pubDate>Mon, 06 May 2024 10:00:00 GMT</pubDate></item>
+</channel></rss>"""
+
+
+class _FakeHttp:
+    def __init__(self, bodies: dict[str, str]) -> None:
+        self.bodies = bodies
+        self.fetched: list[str] = []
+        self.unchanged: set[str] = set()
+        self.notes: dict[str, dict] = {}
+
+    async def get(self, url: str) -> httpx.Response:
+        self.fetched.append(url)
+        if url not in self.bodies:
+            raise httpx.HTTPStatusError("404", request=httpx.Request("GET", url), response=None)
+        return httpx.Response(200, text=self.bodies[url])
+
+    async def get_if_changed(self, url: str) -> httpx.Response | None:
+        if url in self.unchanged:
+            self.fetched.append(url)
+            return None
+        return await self.get(url)
+
+    def confirm(self, url: str) -> None:
+        pass
+
+    def annotate(self, url: str, **values) -> None:
+        self.notes.setdefault(url, {}).update(values)
+
+    def annotation(self, url: str, key: str, default=None):
+        return self.notes.get(url, {}).get(key, default)
+
+
+class _AllowAllRobots:
+    async def can_fetch(self, _url: str) -> bool:
+        return True
+
+    async def filter_allowed(self, urls):
+        return list(urls)
+
+
+@pytest.mark.anyio
+async def test_rss_autodiscovers_feed_and_caches_its_location():
+    feed_url = "https://mofed.gov.et/news/rss.xml"
+    http = _FakeHttp({"https://mofed.gov.et/": HOMEPAGE, feed_url: FEED})
+    context = SpiderContext(SpiderState())
+    source = SimpleNamespace(url="https://mofed.gov.et", selectors={"use_rss": True})
+
+    urls = await RSSAdapter(http, _AllowAllRobots(), context).discover_urls(source)
+
+    assert urls == ["https://mofed.gov.et/news/a/"]
+    assert context.section(FEED_SECTION)["url"] == feed_url
+    assert "published" in context.link_metadata["https://mofed.gov.et/news/a/"]
+
+    # Next run: straight to the cached feed, and an unchanged body isn't parsed.
+    http.fetched.clear()
+    http.unchanged.add(feed_url)
+    assert await RSSAdapter(http, _AllowAllRobots(), context).discover_urls(source) == []
+    assert http.fetched == [feed_url]
+
+
+@pytest.mark.anyio
+async def test_rss_remembers_that_a_site_has_no_feed():
+    http = _FakeHttp({"https://www.mor.gov.et/": "<html></html>"})
+    context = SpiderContext(SpiderState())
+    source = SimpleNamespace(url="https://www.mor.gov.et", selectors={"use_rss": True})
+
+    assert await RSSAdapter(http, _AllowAllRobots(), context).discover_urls(source) == []
+    assert context.section(FEED_SECTION)["url"] is None
+
+    http.fetched.clear()
+    assert await RSSAdapter(http, _AllowAllRobots(), context).discover_urls(source) == []
+    assert http.fetched == []
+
+
+@pytest.mark.anyio
+async def test_rss_unchanged_page_that_was_not_a_feed_is_still_not_a_feed():
+    feed_url = "https://mofed.gov.et/news/rss.xml"
+    http = _FakeHttp({"https://mofed.gov.et/": HOMEPAGE, feed_url: FEED})
+    context = SpiderContext(SpiderState())
+    source = SimpleNamespace(url="https://mofed.gov.et", selectors={"use_rss": True})
+    await RSSAdapter(http, _AllowAllRobots(), context).discover_urls(source)
+
+    # The feed URL now serves an HTML page, which then stays unchanged.
+    http.bodies[feed_url] = "<html><body>Moved</body></html>"
+    context.section(FEED_SECTION)["checked_at"] = "2000-01-01T00:00:00+00:00"
+    await RSSAdapter(http, _AllowAllRobots(), context).discover_urls(source)
+    http.unchanged.add(feed_url)
+    context.section(FEED_SECTION)["checked_at"] = "2000-01-01T00:00:00+00:00"
+
+    assert await RSSAdapter(http, _AllowAllRobots(), context).discover_urls(source) == []
+    assert context.section(FEED_SECTION)["url"] is None
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from pipeline.db.models.enums import SourceCategory
+from pipeline.source_config import SourceConfig, SourceConfigCache
+
+
+def _source(**overrides) -> SimpleNamespace:
+    fields = dict(
+        id=uuid.uuid4(),
+        code="NBE",
+        url="https://www.nbe.gov.et",
+        source_type="website",
+        category=SourceCategory.finance,
+        default_language="en",
+        selectors={"cms": "wordpress_elementor", "listing_paths": ["/news/"]},
+        crawl_delay_ms=2000,
+        max_concurrent_requests=2,
+        request_timeout_ms=60000,
+        is_active=True,
+    )
+    fields.update(overrides)
+    return SimpleNamespace(**fields)
+
+
+def test_snapshot_is_frozen_and_detached_from_the_row():
+    source = _source()
+    config = SourceConfig.from_source(source)
+
+    assert config.category == "finance"
+    assert config.host == "nbe.gov.et"
+    source.selectors["listing_paths"].append("/press/")
+    assert config.selectors["listing_paths"] == ("/news/",)
+    with pytest.raises(TypeError):
+        config.selectors["cms"] = "liferay"
+    with pytest.raises(AttributeError):
+        config.selectors["listing_paths"].append("/press/")
+    with pytest.raises(AttributeError):
+        config.url = "https://example.com"
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [{"url": "nbe.gov.et"}, {"selectors": ["cms"]}, {"max_concurrent_requests": 0}],
+)
+def test_snapshot_rejects_invalid_config(overrides):
+    with pytest.raises(ValueError):
+        SourceConfig.from_source(_source(**overrides))
+
+
+def test_cache_serves_snapshots_until_invalidated():
+    cache = SourceConfigCache()
+    source = _source()
+    config = cache.put(source)
+
+    assert cache._fresh(source.id) is config
+    cache.invalidate(source.id)
+    assert cache._fresh(source.id) is None
+
+    expired = SourceConfigCache(ttl_s=0.0)
+    expired.put(source)
+    assert expired._fresh(source.id) is None
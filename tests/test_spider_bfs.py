@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from pipeline.spider.bfs import BfsBudget, BfsDiscovery
+
+
+class _Response:
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+
+class _FakeHttp:
+    def __init__(self, pages: dict[str, str]) -> None:
+        self._pages = pages
+        self.fetched: list[str] = []
+        self.in_flight = 0
+        self.peak = 0
+
+    async def get(self, url: str) -> _Response:
+        self.fetched.append(url)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return _Response(self._pages.get(url, ""))
+
+
+class _AllowAllRobots:
+    async def can_fetch(self, _url: str) -> bool:
+        return True
+
+
+def _links(*hrefs: str) -> str:
+    return "".join(f'<a href="{href}">x</a>' for href in hrefs)
+
+
+@pytest.mark.anyio
+async def test_bfs_fetches_alias_hosts_once_and_respects_depth():
+    pages = {
+        "https://www.mor.gov.et/": _links("/en/news", "https://mor.gov.et/documents/list"),
+        "https://www.mor.gov.et/en/news": _links("/en/news/deep"),
+        "https://mor.gov.et/documents/list": _links("/documents/1/a.pdf", "/en/news"),
+        "https://www.mor.gov.et/en/news/deep": _links("/en/news/deeper"),
+    }
+    http = _FakeHttp(pages)
+    crawler = BfsDiscovery(
+        http,
+        _AllowAllRobots(),
+        allowed_hosts={"mor.gov.et"},
+        budget=BfsBudget(max_depth=1),
+    )
+
+    urls = await crawler.crawl(["https://www.mor.gov.et/", "https://mor.gov.et/"])
+
+    # Seed aliases collapse to one fetch; depth-1 documents page goes before /en/news.
+    assert http.fetched == [
+        "https://www.mor.gov.et/",
+        "https://mor.gov.et/documents/list",
+        "https://www.mor.gov.et/en/news",
+    ]
+    assert "https://mor.gov.et/documents/1/a.pdf" in urls
+    assert "https://www.mor.gov.et/en/news/deep" in urls
+    assert "https://www.mor.gov.et/en/news/deeper" not in urls
+
+
+@pytest.mark.anyio
+async def test_bfs_runs_fetches_concurrently_within_page_budget():
+    pages = {"https://www.mor.gov.et/": _links(*(f"/en/p{i}" for i in range(10)))}
+    http = _FakeHttp(pages)
+    crawler = BfsDiscovery(
+        http,
+        _AllowAllRobots(),
+        allowed_hosts={"mor.gov.et"},
+        budget=BfsBudget(max_pages=5),
+        workers=3,
+    )
+
+    await crawler.crawl(["https://www.mor.gov.et/"])
+
+    assert len(http.fetched) == 5
+    assert http.peak == 3
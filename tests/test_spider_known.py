@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from pipeline.spider.known import KnownUrlIndex
+from pipeline.utils.url_normalizer import normalize_url, url_hash
+
+
+def _hash(url: str) -> str:
+    return url_hash(normalize_url(url))
+
+
+def test_known_index_has_no_false_negatives_and_few_false_positives():
+    known_urls = [f"https://mofed.gov.et/news/{i}/" for i in range(5000)]
+    index = KnownUrlIndex(_hash(url) for url in known_urls)
+
+    assert all(url in index for url in known_urls)
+    assert "https://MOFED.gov.et/news/7" in index  # normalized before lookup
+
+    unknown = [f"https://mofed.gov.et/other/{i}/" for i in range(20000)]
+    false_positives = sum(url in index for url in unknown)
+    assert false_positives < 100  # ~0.1% target, generous margin
+
+    index.add("https://mofed.gov.et/other/1/")
+    assert "https://mofed.gov.et/other/1/" in index
+
+
+def test_known_index_round_trips_through_a_mapped_file(tmp_path):
+    path = tmp_path / "known" / "source.bloom"
+    index = KnownUrlIndex(
+        [_hash("https://mor.gov.et/a")], loaded_through=datetime(2024, 5, 1, tzinfo=timezone.utc)
+    )
+    index.save(path)
+
+    reopened = KnownUrlIndex._open(path)
+    assert reopened is not None
+    assert "https://mor.gov.et/a" in reopened
+    assert "https://mor.gov.et/b" not in reopened
+    assert reopened.loaded_through == index.loaded_through
+    assert len(reopened) == 1
+
+    # Copy-on-write: additions stay private until saved again.
+    reopened.add("https://mor.gov.et/b")
+    assert "https://mor.gov.et/b" not in KnownUrlIndex._open(path)
+
+
+def test_known_index_ignores_a_corrupt_file(tmp_path):
+    path = tmp_path / "broken.bloom"
+    path.write_bytes(b"not a filter")
+    assert KnownUrlIndex._open(path) is None
+    assert KnownUrlIndex._open(tmp_path / "missing.bloom") is None
+
+
+class _Rows:
+    def __init__(self, rows: list) -> None:
+        self._rows = rows
+
+    def scalars(self) -> list:
+        return [row[0] for row in self._rows]
+
+    def all(self) -> list:
+        return self._rows
+
+
+class _FakeSession:
+    """``discovered_urls`` of one source as ``(url_hash, discovered_at)`` rows."""
+
+    def __init__(self, rows: list[tuple[str, datetime]]) -> None:
+        self.rows = rows
+        self.full_loads = 0
+
+    def _bound(self, stmt) -> datetime | None:
+        params = stmt.compile(dialect=postgresql.dialect()).params
+        return next((v for v in params.values() if isinstance(v, datetime)), None)
+
+    async def scalar(self, stmt):
+        sql, bound = str(stmt), self._bound(stmt)
+        if "count(" in sql:
+            return sum(1 for _, at in self.rows if at <= bound)
+        return max((at for _, at in self.rows), default=None)
+
+    async def execute(self, stmt):
+        bound = self._bound(stmt)
+        if bound is None:
+            self.full_loads += 1
+            return _Rows(self.rows)
+        return _Rows([row for row in self.rows if row[1] >= bound])
+
+
+def _row(url: str, day: int) -> tuple[str, datetime]:
+    return _hash(url), datetime(2024, 5, day, tzinfo=timezone.utc)
+
+
+@pytest.mark.anyio
+async def test_known_index_file_from_another_database_is_rebuilt(tmp_path):
+    path = tmp_path / "source.bloom"
+    source_id = uuid.uuid4()
+    session = _FakeSession([_row("https://mor.gov.et/a", 1), _row("https://mor.gov.et/b", 2)])
+    (await KnownUrlIndex.load(session, source_id, path=path)).save(path)
+
+    # Same database, one more row: the file is topped up, not rebuilt.
+    session.rows.append(_row("https://mor.gov.et/c", 3))
+    index = await KnownUrlIndex.load(session, source_id, path=path)
+    assert session.full_loads == 1
+    assert "https://mor.gov.et/c" in index and index.rows == 3
+    index.save(path)
+
+    # Database reset: fewer rows than the file covered, so its hits can't be trusted.
+    session.rows = [_row("https://mor.gov.et/z", 4)]
+    index = await KnownUrlIndex.load(session, source_id, path=path)
+    assert session.full_loads == 2
+    assert "https://mor.gov.et/a" not in index
+    assert "https://mor.gov.et/z" in index
+
+
+@pytest.mark.anyio
+async def test_known_index_without_persistence_is_shared_within_the_process():
+    source_id = uuid.uuid4()
+    session = _FakeSession([_row("https://mor.gov.et/a", 1)])
+    first = await KnownUrlIndex.load(session, source_id)
+
+    session.rows.append(_row("https://mor.gov.et/b", 2))
+    second = await KnownUrlIndex.load(session, source_id)
+
+    assert second is first
+    assert session.full_loads == 1
+    assert "https://mor.gov.et/b" in second
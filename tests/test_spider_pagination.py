@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import pytest
+
+from pipeline.spider.known import KnownUrlIndex
+from pipeline.spider.links import extract_links
+from pipeline.spider.pagination import ListingPaginator, next_page_url
+
+
+class _Response:
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+
+class _FakeHttp:
+    def __init__(self, pages: dict[str, str]) -> None:
+        self._pages = pages
+        self.fetched: list[str] = []
+        self.confirmed: list[str] = []
+
+    async def get_if_changed(self, url: str) -> _Response:
+        self.fetched.append(url)
+        return _Response(self._pages[url])
+
+    async def get(self, url: str) -> _Response:
+        return await self.get_if_changed(url)
+
+    def confirm(self, url: str) -> None:
+        self.confirmed.append(url)
+
+
+class _AllowAllRobots:
+    async def can_fetch(self, _url: str) -> bool:
+        return True
+
+
+BASE = "https://www.mofed.gov.et/mof-directive/circular/"
+
+
+def _page(n: int, items: range, last: bool = False) -> str:
+    links = "".join(f'<a href="/media/directive-{i}/">d{i}</a>' for i in items)
+    nav = "" if last else f'<a class="next" href="?page={n + 1}">Next</a>'
+    return f"<html><body>{links}{nav}</body></html>"
+
+
+def _pages() -> dict[str, str]:
+    return {
+        BASE: _page(1, range(0, 3)),
+        f"{BASE}?page=2": _page(2, range(3, 6)),
+        f"{BASE}?page=3": _page(3, range(6, 9), last=True),
+    }
+
+
+def _links(html: str, url: str) -> list[str]:
+    return [link for link in extract_links(html, url) if "/media/" in link]
+
+
+def test_next_page_url_prefers_links_then_page_param():
+    assert next_page_url(_page(1, range(1)), BASE, 1) == f"{BASE}?page=2"
+    assert next_page_url("<html></html>", f"{BASE}?page=4&x=1", 4, "page") == f"{BASE}?x=1&page=5"
+    assert next_page_url("<html></html>", BASE, 1) is None
+
+
+@pytest.mark.anyio
+async def test_listing_paginator_stops_at_first_page_with_nothing_new():
+    known = KnownUrlIndex()
+    for i in range(3, 9):
+        known.add(f"https://mofed.gov.et/media/directive-{i}")
+    http = _FakeHttp(_pages())
+
+    links = await ListingPaginator(http, _AllowAllRobots(), _links, known=known).crawl(BASE)
+
+    assert http.fetched == [BASE, f"{BASE}?page=2"]
+    assert http.confirmed == http.fetched
+    assert len(links) == 6
+
+
+@pytest.mark.anyio
+async def test_listing_paginator_backfill_walks_every_page():
+    known = KnownUrlIndex()
+    for i in range(9):
+        known.add(f"https://www.mofed.gov.et/media/directive-{i}/")
+    http = _FakeHttp(_pages())
+
+    paginator = ListingPaginator(http, _AllowAllRobots(), _links, known=known, backfill=True)
+    links = await paginator.crawl(BASE)
+
+    assert len(http.fetched) == 3
+    assert len(links) == 9
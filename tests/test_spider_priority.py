@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from pipeline.spider.priority import (
+    UrlSignals,
+    adapter_kind,
+    default_priority,
+    parse_page_date,
+    scorer_for,
+)
+from pipeline.utils.directive_meta import extract_directive_meta
+
+NOW = datetime(2026, 5, 10, tzinfo=timezone.utc)
+
+
+def _score(url: str, **meta) -> int:
+    directive = extract_directive_meta(url.split("nbe.gov.et", 1)[-1])
+    return default_priority(UrlSignals(url, directive, meta, "finance", NOW))
+
+
+def test_new_directives_outrank_fresh_news_which_outranks_backfill():
+    directive = _score("https://nbe.gov.et/files/fxd-04-2026/", found_by=["sitemap"])
+    fresh = _score(
+        "https://nbe.gov.et/news/rate-decision/",
+        found_by=["rss"],
+        published="Fri, 08 May 2026 10:00:00 GMT",
+    )
+    backfill = _score(
+        "https://nbe.gov.et/news/2019/annual-report/",
+        found_by=["sitemap"],
+        lastmod="2019-03-01T00:00:00+00:00",
+    )
+    assert directive > fresh > backfill
+
+
+def test_page_dates_parse_from_sitemap_wordpress_and_rss_formats():
+    expected = datetime(2026, 5, 8, 10, tzinfo=timezone.utc)
+    assert parse_page_date("2026-05-08T10:00:00Z") == expected
+    assert parse_page_date("2026-05-08T10:00:00") == expected
+    assert parse_page_date("Fri, 08 May 2026 10:00:00 GMT") == expected
+    assert parse_page_date("last week") is None
+
+
+def test_scorer_selection_and_adapter_labels():
+    assert scorer_for({}) is default_priority
+    assert scorer_for({"priority_scorer": "flat"})(UrlSignals("https://a.et/")) == 0
+    assert adapter_kind("RSSAdapter") == "rss"
+    assert adapter_kind("FIRMAAdapter") == "firma"
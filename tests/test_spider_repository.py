@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import uuid
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from pipeline.spider.known import KnownUrlIndex
+from pipeline.spider.repository import INSERT_CHUNK_ROWS, insert_discovered_urls
+from pipeline.utils.url_normalizer import normalize_url, url_hash
+
+
+class _Result:
+    def __init__(self, values: list[str]) -> None:
+        self._values = values
+
+    def scalars(self) -> _Result:
+        return self
+
+    def all(self) -> list[str]:
+        return self._values
+
+    def __iter__(self):
+        return iter(self._values)
+
+
+class _FakeSession:
+    """Records statements; rows whose hash is in ``existing`` hit the conflict.
+
+    ``found_by`` maps existing hashes to the adapters that found them.
+    """
+
+    def __init__(self, existing: set[str] = frozenset()) -> None:
+        self.existing = set(existing)
+        self.found_by: dict[str, set[str]] = {}
+        self.inserts: list[int] = []
+        self.upserted: list[str] = []
+        self.selects = 0
+
+    async def execute(self, stmt):
+        compiled = stmt.compile(dialect=postgresql.dialect())
+        params = compiled.params
+        values = list(params.values())
+        if stmt.is_insert:
+            hashes = [v for k, v in params.items() if k.startswith("url_hash")]
+            kinds = {
+                kind
+                for k, v in params.items()
+                if k.startswith("link_metadata") and isinstance(v, dict)
+                for kind in v.get("found_by", ())
+            }
+            self.inserts.append(len(hashes))
+            rows = []
+            for h in hashes:
+                if h not in self.existing:
+                    self.existing.add(h)
+                    self.found_by[h] = set(kinds)
+                    rows.append((h, True))
+                elif "DO UPDATE" in str(compiled) and not kinds <= self.found_by.get(h, set()):
+                    self.found_by[h] = self.found_by.get(h, set()) | kinds
+                    self.upserted.append(h)
+                    rows.append((h, False))
+            return _Result(rows)
+        self.selects += 1
+        candidates = next(v for v in values if isinstance(v, list))
+        # found_by filter, bound as a JSON list after the key ("found_by").
+        wanted = {k for v in values if isinstance(v, list) and v is not candidates for k in v}
+        return _Result(
+            [h for h in candidates if h in self.existing and wanted <= self.found_by.get(h, set())]
+        )
+
+
+def _hash(url: str) -> str:
+    return url_hash(normalize_url(url))
+
+
+@pytest.mark.anyio
+async def test_insert_writes_chunks_and_counts_conflicts():
+    urls = [f"https://mofed.gov.et/news/{i}/" for i in range(INSERT_CHUNK_ROWS + 5)]
+    session = _FakeSession(existing={_hash(urls[0])})
+
+    stats = await insert_discovered_urls(
+        session, uuid.uuid4(), [*urls, urls[1], "mailto:x@y.z"]
+    )
+
+    assert session.inserts == [INSERT_CHUNK_ROWS, 5]
+    assert stats.discovered == len(urls) + 2
+    assert stats.inserted == len(urls) - 1
+    assert stats.skipped == 3  # existing row, in-batch duplicate, non-http
+
+
+@pytest.mark.anyio
+async def test_insert_skips_confirmed_known_urls_without_inserting_them():
+    urls = [f"https://mor.gov.et/a/{i}" for i in range(10)]
+    known = KnownUrlIndex(_hash(url) for url in urls[:5])
+    session = _FakeSession(existing={_hash(url) for url in urls[:5]})
+
+    stats = await insert_discovered_urls(session, uuid.uuid4(), urls, known=known)
+
+    assert session.selects == 1
+    assert session.inserts == [5]
+    assert (stats.inserted, stats.skipped) == (5, 5)
+    assert all(url in known for url in urls)
+
+
+@pytest.mark.anyio
+async def test_urls_found_by_another_adapter_gain_it_in_found_by():
+    urls = [f"https://mor.gov.et/a/{i}" for i in range(4)]
+    known = KnownUrlIndex()
+    session = _FakeSession()
+    source_id = uuid.uuid4()
+    await insert_discovered_urls(session, source_id, urls[:3], known=known, found_by="sitemap")
+
+    stats = await insert_discovered_urls(session, source_id, urls, known=known, found_by="rss")
+
+    assert (stats.inserted, stats.skipped) == (1, 3)
+    assert sorted(session.upserted) == sorted(_hash(url) for url in urls[:3])
+    assert all(session.found_by[_hash(url)] == {"sitemap", "rss"} for url in urls[:3])
+
+    # Found again by the same adapter: confirmed known and skipped without an INSERT.
+    session.inserts.clear()
+    stats = await insert_discovered_urls(session, source_id, urls, known=known, found_by="rss")
+    assert session.inserts == []
+    assert (stats.inserted, stats.skipped) == (0, 4)
@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from pipeline.http.validators import ValidatorStore
+from pipeline.source_config import SourceConfig
+from pipeline.spider import service
+from pipeline.spider.adapters.base import SpiderAdapter
+from pipeline.spider.http import SpiderHttp
+from pipeline.spider.service import (
+    SpiderRunResult,
+    iter_spider_runs,
+    stream_adapters,
+)
+from pipeline.spider.state import SpiderState
+
+
+class _InFlight:
+    def __init__(self) -> None:
+        self.current = 0
+        self.peak = 0
+
+
+class _SlowAdapter(SpiderAdapter):
+    def __init__(self, urls: list[str], delay_s: float, in_flight: _InFlight) -> None:
+        self._urls = urls
+        self._delay_s = delay_s
+        self._in_flight = in_flight
+
+    async def discover_urls(self, _source) -> list[str]:
+        self._in_flight.current += 1
+        self._in_flight.peak = max(self._in_flight.peak, self._in_flight.current)
+        await asyncio.sleep(self._delay_s)
+        self._in_flight.current -= 1
+        return self._urls
+
+
+class _BrokenAdapter(SpiderAdapter):
+    async def discover_urls(self, _source) -> list[str]:
+        raise RuntimeError("listing markup changed")
+
+
+@pytest.mark.anyio
+async def test_stream_adapters_overlaps_and_isolates_failures():
+    source = SimpleNamespace(url="https://nbe.gov.et", selectors={})
+    in_flight = _InFlight()
+    adapters = [
+        _SlowAdapter(["https://nbe.gov.et/a"], 0.2, in_flight),
+        _BrokenAdapter(),
+        _SlowAdapter(["https://nbe.gov.et/b"], 0.2, in_flight),
+    ]
+    handled: list[tuple[str, list[str]]] = []
+
+    async def handle(name: str, batch: list[str]) -> None:
+        handled.append((name, batch))
+
+    outcomes, timed_out = await stream_adapters(adapters, source, handle)
+
+    assert not timed_out
+    assert in_flight.peak == 2
+    assert sorted(batch[0] for _, batch in handled) == [
+        "https://nbe.gov.et/a",
+        "https://nbe.gov.et/b",
+    ]
+    assert [o.url_count for o in outcomes] == [1, 0, 1]
+    assert outcomes[1].error == "RuntimeError: listing markup changed"
+    assert outcomes[0].error is None and outcomes[0].duration_s >= 0.2
+
+
+class _FakeSession:
+    def __init__(self, sources: dict) -> None:
+        self._sources = sources
+
+    async def get(self, _model, source_id, **_kwargs):
+        return self._sources.get(source_id)
+
+
+class _FakeConfigs:
+    async def get(self, session, source_id):
+        return await session.get(None, source_id)
+
+
+@pytest.mark.anyio
+async def test_iter_spider_runs_caps_concurrency_and_isolates_sources(monkeypatch):
+    sources = {
+        1: SimpleNamespace(code="NBE", delay=0.05),
+        2: SimpleNamespace(code="MOF", delay=0.01),
+        3: SimpleNamespace(code="MOR", delay=0.0),
+    }
+    sessions_opened: list[int] = []
+    running = 0
+    peak = 0
+
+    @asynccontextmanager
+    async def session_factory():
+        sessions_opened.append(1)
+        yield _FakeSession(sources)
+
+    async def fake_run(_session, source, **_kwargs):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(source.delay)
+        running -= 1
+        if source.code == "MOR":
+            raise RuntimeError("db down")
+        return SpiderRunResult(source.code, 1, 1, 0, {})
+
+    monkeypatch.setattr(service, "run_spider_for_source", fake_run)
+    monkeypatch.setattr(service, "get_source_configs", _FakeConfigs)
+
+    results = [
+        r async for r in iter_spider_runs([1, 2, 3], concurrency=2, session_factory=session_factory)
+    ]
+
+    assert peak == 2
+    assert len(sessions_opened) == 3
+    assert [r.source_code for r in results] == ["MOF", "MOR", "NBE"]
+    assert results[1].error == "RuntimeError: db down"
+    assert results[0].error is None
+
+
+class _StreamingAdapter:
+    def __init__(self, batches: list[list[str]], delay_s: float) -> None:
+        self._batches = batches
+        self._delay_s = delay_s
+
+    async def iter_url_batches(self, _source):
+        for batch in self._batches:
+            await asyncio.sleep(self._delay_s)
+            yield batch
+
+
+class _ListAdapter(SpiderAdapter):
+    async def discover_urls(self, _source) -> list[str]:
+        return ["https://mor.gov.et/list"]
+
+
+@pytest.mark.anyio
+async def test_stream_adapters_hands_over_batches_and_stops_at_deadline():
+    source = SimpleNamespace(url="https://mor.gov.et", selectors={})
+    handled: list[tuple[str, list[str]]] = []
+
+    async def handle(name: str, batch: list[str]) -> None:
+        handled.append((name, batch))
+
+    slow = _StreamingAdapter([[f"https://mor.gov.et/{i}"] for i in range(100)], 0.02)
+    outcomes, timed_out = await stream_adapters(
+        [slow, _ListAdapter()], source, handle, deadline_s=0.15
+    )
+
+    assert timed_out
+    assert ("_ListAdapter", ["https://mor.gov.et/list"]) in handled
+    streamed = [batch for name, batch in handled if name == "_StreamingAdapter"]
+    assert 3 <= len(streamed) < 100
+    assert outcomes[0].error == "deadline exceeded" and outcomes[0].url_count == len(streamed)
+    assert outcomes[1].error is None and outcomes[1].url_count == 1
+
+
+@pytest.mark.anyio
+async def test_stream_adapters_without_deadline_runs_to_completion():
+    source = SimpleNamespace(url="https://mor.gov.et", selectors={})
+    handled: list[str] = []
+
+    async def handle(_name: str, batch: list[str]) -> None:
+        handled.extend(batch)
+
+    batches = [["https://mor.gov.et/a"], ["https://mor.gov.et/b"]]
+    outcomes, timed_out = await stream_adapters(
+        [_StreamingAdapter(batches, 0.0)], source, handle
+    )
+
+    assert not timed_out
+    assert handled == ["https://mor.gov.et/a", "https://mor.gov.et/b"]
+    assert outcomes[0].url_count == 2
+
+
+class _StatefulAdapter(SpiderAdapter):
+    state_sections = ("watermarks",)
+
+    def __init__(self, http: SpiderHttp, state: SpiderState, url: str) -> None:
+        self._http = http
+        self._state = state
+        self._url = url
+
+    async def discover_urls(self, _source) -> list[str]:
+        self._http.validators.record(self._url, httpx.Response(200, content=b"<urlset/>"))
+        self._http.confirm(self._url)
+        self._state.section(self.state_sections[0])[self._url] = "2026-10-16"
+        return [self._url]
+
+
+class _FailingStatefulAdapter(_StatefulAdapter):
+    state_sections = ("feeds",)
+
+    async def discover_urls(self, source) -> list[str]:
+        await super().discover_urls(source)
+        raise RuntimeError("feed markup changed")
+
+
+@pytest.mark.anyio
+async def test_failed_adapter_keeps_previous_state_and_validators():
+    source = SimpleNamespace(url="https://mor.gov.et", selectors={})
+    state = SpiderState({"feeds": {"old": "2026-01-01"}})
+    baseline = {"feeds": {"old": "2026-01-01"}}
+    validators = ValidatorStore()
+    http = SpiderHttp(validators=validators)
+    good, bad = "https://mor.gov.et/sitemap.xml", "https://mor.gov.et/feed/"
+    adapters = [_StatefulAdapter(http, state, good), _FailingStatefulAdapter(http, state, bad)]
+
+    async def handle(_name: str, _batch: list[str]) -> None:
+        pass
+
+    outcomes, _ = await stream_adapters(adapters, source, handle)
+    failed = {o.name for o in outcomes if o.error}
+    service._roll_back_sections(state, baseline, adapters, failed)
+    validators.commit(failed_owners=failed)
+
+    assert failed == {"_FailingStatefulAdapter"}
+    assert state.section("watermarks") == {good: "2026-10-16"}
+    assert state.section("feeds") == {"old": "2026-01-01"}
+    assert validators.is_unchanged(good, httpx.Response(200, content=b"<urlset/>"))
+    assert not validators.is_unchanged(bad, httpx.Response(200, content=b"<urlset/>"))
+
+
+def test_selectors_digest_reads_frozen_nested_selectors():
+    plain = {"cms": "liferay", "bfs": {"max_pages": 60}, "listing_paths": ["/news/"]}
+    config = SourceConfig.from_source(
+        SimpleNamespace(
+            id=None,
+            code="MOR",
+            url="https://www.mor.gov.et",
+            source_type="website",
+            category="tax",
+            default_language="en",
+            selectors=plain,
+            crawl_delay_ms=0,
+            max_concurrent_requests=1,
+            request_timeout_ms=1000,
+            is_active=True,
+        )
+    )
+
+    assert service._selectors_digest(config.selectors) == service._selectors_digest(plain)
+    changed = {**plain, "bfs": {"max_pages": 80}}
+    assert service._selectors_digest(changed) != service._selectors_digest(plain)
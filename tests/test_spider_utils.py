@@ -1,7 +1,26 @@
 """Unit tests for spider URL utilities."""
 
+from urllib.parse import urljoin, urlparse
+
+import pytest
+
+from pipeline.spider.links import (
+    CONTAINS_SELECTORS,
+    UrlPatternSet,
+    compile_patterns,
+    extract_link_records,
+    extract_links,
+    pattern_to_regex,
+    url_path,
+)
 from pipeline.utils.directive_meta import extract_directive_meta
-from pipeline.utils.url_normalizer import normalize_url, url_hash
+from pipeline.utils.url_normalizer import (
+    normalize_batch,
+    normalize_batch_async,
+    normalize_url,
+    shutdown_normalize_pool,
+    url_hash,
+)
 
 
 def test_normalize_strips_utm_and_www():
@@ -59,3 +78,115 @@ def test_directive_meta_matches_many_known_slug_shapes():
     for path in paths:
         meta = extract_directive_meta(path)
         assert meta is not None, f"Expected directive metadata for {path}"
+
+
+def test_url_pattern_set_matches_per_pattern_filter():
+    patterns = ["/nbe_news/{slug}/", "/files/{slug}/"]
+    urls = [
+        "https://nbe.gov.et/nbe_news/rate-decision/",
+        "https://nbe.gov.et/NBE_NEWS/Rate-Decision",
+        "https://nbe.gov.et/files/directive-1/?download=1",
+        "https://nbe.gov.et/nbe_news/a/b/",
+        "https://nbe.gov.et/about/",
+        "https://nbe.gov.et/x;p/files/y/",
+    ]
+    regexes = [pattern_to_regex(p) for p in patterns]
+    expected = [u for u in urls if any(rx.search(urlparse(u).path) for rx in regexes)]
+
+    pattern_set = compile_patterns(tuple(patterns))
+    assert pattern_set.filter(urls) == expected
+    assert compile_patterns(tuple(patterns)) is pattern_set
+    assert not compile_patterns(("",)) and compile_patterns(("",)).filter(urls) == urls
+
+
+def test_url_pattern_set_from_selectors_adds_pdf_contains_pattern():
+    selectors = {"article_url_pattern": "/blog/{slug}/", "pdf_path_pattern": "/media/filer_public/"}
+    pattern_set = UrlPatternSet.from_selectors(selectors, contains_keys=CONTAINS_SELECTORS)
+    assert pattern_set.matches("https://mofed.gov.et/media/filer_public/ab/cd/x.pdf")
+    assert pattern_set.matches("https://mofed.gov.et/blog/news-item/")
+    assert not pattern_set.matches("https://mofed.gov.et/about/")
+    # Sitemap and WordPress filters keep to the article/directive patterns.
+    assert not UrlPatternSet.from_selectors(selectors).matches(
+        "https://mofed.gov.et/media/filer_public/ab/cd/x.pdf"
+    )
+
+
+def test_url_path_matches_urlparse():
+    for url in (
+        "https://a.gov.et/x/y?q=1#f",
+        "https://a.gov.et",
+        "https://a.gov.et?x=/y",
+        "http://a.gov.et/b;p?q",
+        "https://[::1]/x",
+        "/relative/path",
+        "HTTPS://A.GOV.ET/Y/",
+        "a b://h/p",
+        "news/",
+        "://h/p",
+    ):
+        assert url_path(url) == urlparse(url).path
+
+
+def test_extract_link_records_capture_anchor_text_and_nearby_date():
+    html = """<ul>
+      <li><span class="date">06/05/2024</span> <a href="/blog/circular-1/">Circular
+          No. 1</a></li>
+      <li><time datetime="2024-05-07">May 7</time><a href="/blog/circular-2/">Two</a></li>
+      <li><a href="/blog/circular-1/">duplicate</a><a href="mailto:x@mofed.gov.et">mail</a></li>
+    </ul>"""
+
+    records = extract_link_records(html, "https://www.mofed.gov.et/blog/")
+
+    assert [(r.url, r.text, r.date_text) for r in records] == [
+        ("https://www.mofed.gov.et/blog/circular-1/", "Circular No. 1", "06/05/2024"),
+        ("https://www.mofed.gov.et/blog/circular-2/", "Two", "2024-05-07"),
+    ]
+    assert extract_links(html, "https://www.mofed.gov.et/blog/") == [r.url for r in records]
+
+
+def test_nearby_date_does_not_borrow_a_sibling_items_date():
+    filler = "Ministry of Finance announcement. " * 20
+    html = f"""<ul>
+      <li><div><a href="/blog/undated/">Undated</a></div></li>
+      <li><p>{filler}</p><time datetime="2024-05-07">May 7</time></li>
+    </ul>"""
+
+    [record] = extract_link_records(html, "https://mofed.gov.et/blog/")
+
+    assert record.date_text is None
+
+
+def test_extract_links_resolves_empty_query_and_fragment_like_urljoin():
+    base = "https://mofed.gov.et/blog/"
+    hrefs = ["/x?", "/y#", "/z?#top", "/w?q=1#"]
+    html = "".join(f'<a href="{href}">link</a>' for href in hrefs)
+
+    assert extract_links(html, base) == [urljoin(base, href) for href in hrefs]
+
+
+BATCH_URLS = [
+    "https://www.Example.com/path/?utm_source=x&id=1",
+    "http://example.com/a;params",
+    "https://mofed.gov.et/%E1%8B%9C%E1%8A%93/",
+    "https://mofed.gov.et/a%20b/",
+    "https://nbe.gov.et/files/fxd-04-2026/",
+    "https://example.com/?",
+    "https://example.com/?ref=1&fbclid=2",
+    "  ",
+]
+
+
+def test_normalize_batch_matches_normalize_url():
+    for raw, (normalized, hash_value, directive) in zip(BATCH_URLS, normalize_batch(BATCH_URLS)):
+        assert normalized == normalize_url(raw)
+        assert hash_value == (url_hash(normalized) if normalized else "")
+        assert directive == (extract_directive_meta(urlparse(raw).path) if normalized else None)
+
+
+@pytest.mark.anyio
+async def test_normalize_batch_async_offloads_large_batches():
+    urls = BATCH_URLS * 3
+    try:
+        assert await normalize_batch_async(urls, threshold=1) == normalize_batch(urls)
+    finally:
+        shutdown_normalize_pool()
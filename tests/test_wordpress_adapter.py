@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+import pytest
+
+from pipeline.spider.adapters.wordpress import WP_MAX_PAGES, WP_TIE_SUFFIX, WordPressAdapter
+from pipeline.spider.context import SpiderContext
+from pipeline.spider.state import SpiderState
+
+
+def _post(i: int, modified: str) -> dict:
+    return {"link": f"https://nbe.gov.et/nbe_news/post-{i}/", "modified": modified, "date": modified}
+
+
+class _FakeWpHttp:
+    def __init__(self, pages: list[list[dict]]) -> None:
+        self.pages = pages
+        self.requested: list[dict[str, list[str]]] = []
+        self.in_flight = 0
+        self.peak = 0
+
+    async def get_if_changed(self, url: str) -> httpx.Response:
+        query = parse_qs(urlparse(url).query)
+        self.requested.append(query)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        page = int(query["page"][0])
+        return httpx.Response(
+            200,
+            json=self.pages[page - 1],
+            headers={"X-WP-TotalPages": str(len(self.pages))},
+        )
+
+    def confirm(self, url: str) -> None:
+        pass
+
+    def annotate(self, url: str, **values) -> None:
+        pass
+
+    def annotation(self, url: str, key: str, default=None):
+        return default
+
+
+class _RecordingRobots:
+    def __init__(self) -> None:
+        self.batches: list[list[str]] = []
+
+    async def can_fetch(self, _url: str) -> bool:
+        return True
+
+    async def filter_allowed(self, urls):
+        self.batches.append(list(urls))
+        return list(urls)
+
+
+@pytest.mark.anyio
+async def test_wp_api_fetches_trimmed_pages_concurrently_and_advances_watermark():
+    pages = [
+        [_post(i, f"2024-05-0{1 + i % 3}T10:00:00") for i in range(100)],
+        [_post(100 + i, "2024-04-01T10:00:00") for i in range(100)],
+        [_post(200, "2024-05-09T08:30:00")],
+    ]
+    http = _FakeWpHttp(pages)
+    robots = _RecordingRobots()
+    context = SpiderContext(SpiderState())
+    source = SimpleNamespace(url="https://nbe.gov.et", selectors={"wp_post_type": "nbe_news"})
+
+    urls = await WordPressAdapter(http, robots, context).discover_urls(source)
+
+    assert len(urls) == 201
+    assert all(q["_fields"] == ["link,modified,date"] for q in http.requested)
+    assert "modified_after" not in http.requested[0]
+    assert http.peak == 2  # pages 2 and 3 together
+    assert len(robots.batches) == 1
+    assert context.section("wp_modified") == {
+        "https://nbe.gov.et/wp-json/wp/v2/nbe_news": "2024-05-09T08:30:00"
+    }
+    assert context.link_metadata["https://nbe.gov.et/nbe_news/post-200/"]["modified"] == (
+        "2024-05-09T08:30:00"
+    )
+
+    http.pages = [[]]
+    http.requested.clear()
+    assert await WordPressAdapter(http, robots, context).discover_urls(source) == []
+    assert http.requested[0]["modified_after"] == ["2024-05-09T08:30:00"]
+    assert http.requested[0]["orderby"] == ["modified"]
+    assert http.requested[0]["order"] == ["asc"]
+
+
+@pytest.mark.anyio
+async def test_wp_api_truncated_backlog_keeps_the_watermark_behind_unread_pages():
+    # Oldest change first; 25 pages pending, only WP_MAX_PAGES are read this run.
+    pages = [
+        [_post(p * 100 + i, f"2024-05-{1 + p:02d}T10:00:00") for i in range(100)]
+        for p in range(25)
+    ]
+    http = _FakeWpHttp(pages)
+    context = SpiderContext(SpiderState())
+    source = SimpleNamespace(url="https://nbe.gov.et", selectors={"wp_post_type": "nbe_news"})
+
+    urls = await WordPressAdapter(http, _RecordingRobots(), context).discover_urls(source)
+
+    assert len(urls) == WP_MAX_PAGES * 100
+    # Page 20's timestamp may continue on page 21, so the next run starts before it.
+    assert context.section("wp_modified") == {
+        "https://nbe.gov.et/wp-json/wp/v2/nbe_news": f"2024-05-{WP_MAX_PAGES - 1:02d}T10:00:00"
+    }
+
+
+@pytest.mark.anyio
+async def test_wp_api_bulk_import_on_one_timestamp_still_moves_forward():
+    # 25 full pages all modified in the same second, as after a bulk import.
+    stamp = "2024-06-01T00:00:00"
+    pages = [[_post(p * 100 + i, stamp) for i in range(100)] for p in range(25)]
+    http = _FakeWpHttp(pages)
+    context = SpiderContext(SpiderState())
+    source = SimpleNamespace(url="https://nbe.gov.et", selectors={"wp_post_type": "nbe_news"})
+    endpoint = "https://nbe.gov.et/wp-json/wp/v2/nbe_news"
+    seen: set[str] = set()
+
+    seen.update(await WordPressAdapter(http, _RecordingRobots(), context).discover_urls(source))
+    assert context.section("wp_modified") == {
+        endpoint + WP_TIE_SUFFIX: {"modified": stamp, "page": 1}
+    }
+
+    # The next runs walk that one timestamp in id order until it is exhausted.
+    for _ in range(2):
+        http.requested.clear()
+        seen.update(
+            await WordPressAdapter(http, _RecordingRobots(), context).discover_urls(source)
+        )
+        first = http.requested[0]
+        assert first["orderby"] == ["id"]
+        assert first["modified_after"] == ["2024-05-31T23:59:59"]
+        assert first["modified_before"] == ["2024-06-01T00:00:01"]
+
+    assert http.requested[0]["page"] == [str(WP_MAX_PAGES + 1)]  # the last run resumed
+    assert len(seen) == 25 * 100
+    assert context.section("wp_modified") == {endpoint: stamp}